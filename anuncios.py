@@ -0,0 +1,187 @@
+"""Ranking de anúncios: onde comprar supera alugar pela maior margem.
+
+Um anúncio traz o preço pedido, o aluguel pedido e o bairro. Cada anúncio
+vira um cenário do simulador (preço → ``valor_imovel``, aluguel / preço →
+``percentual_aluguel``; os demais parâmetros vêm dos padrões do simulador
+ou de colunas com o nome do parâmetro) e é avaliado pela forma fechada de
+``motor.valores_finais``, cujo custo não depende do prazo.
+
+O arquivo é lido em blocos e, para cada critério de ``CRITERIOS``, apenas os
+``quantidade`` melhores anúncios vistos até o momento são guardados em um
+heap de mínimo. A cada bloco, ``np.argpartition`` separa os poucos
+candidatos que podem entrar no ranking, e só eles passam pelo heap; as
+margens do bloco são descartadas em seguida. A memória depende do tamanho do
+bloco e de ``quantidade``, não do tamanho do arquivo.
+"""
+
+import heapq
+
+import numpy as np
+
+import motor
+
+# Colunas do CSV com o preço, o aluguel mensal pedido e o bairro
+COLUNAS_ANUNCIO = {'preco': 'preco', 'aluguel': 'aluguel', 'bairro': 'bairro'}
+
+# Critérios de ranking: (estratégia de compra, estratégia comparada)
+CRITERIOS = {
+    'compra_vista': ('compra_vista', 'aluguel'),
+    'compra_financiada': ('compra_financiada', 'aluguel'),
+}
+
+TAMANHO_BLOCO = 65536
+
+
+def ler_anuncios_csv(caminho, colunas=COLUNAS_ANUNCIO, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê um CSV de anúncios em blocos de ``tamanho_bloco`` linhas.
+
+    Devolve um gerador de dicionários de arrays com ``'preco'``,
+    ``'aluguel'``, ``'bairro'`` e as colunas presentes com nomes de
+    parâmetros do simulador. Só as colunas usadas são lidas.
+    """
+    import pandas as pd
+
+    parametros = motor.PARAMETROS + motor.PARAMETROS_CUSTOS
+    cabecalho = pd.read_csv(caminho, nrows=0).columns
+    renomear = {coluna: nome for nome, coluna in colunas.items() if coluna in cabecalho}
+    usadas = list(renomear) + [nome for nome in parametros if nome in cabecalho]
+    leitor = pd.read_csv(caminho, usecols=usadas, chunksize=tamanho_bloco,
+                         dtype={colunas['bairro']: str} if colunas['bairro'] in cabecalho else None)
+    with leitor:
+        for bloco in leitor:
+            bloco = bloco.rename(columns=renomear)
+            yield {coluna: bloco[coluna].to_numpy() for coluna in bloco.columns}
+
+
+def parametros_anuncios(bloco, padroes=None):
+    """Parâmetros de ``motor.valores_finais`` para um bloco de anúncios."""
+    parametros = dict(padroes or {})
+    for nome in motor.PARAMETROS + motor.PARAMETROS_CUSTOS:
+        if nome in bloco:
+            valores = np.asarray(bloco[nome], dtype=float)
+            padrao = parametros.get(nome, 0.0)
+            parametros[nome] = np.where(np.isnan(valores), padrao, valores)
+    preco = np.asarray(bloco['preco'], dtype=float)
+    parametros['valor_imovel'] = preco
+    with np.errstate(divide='ignore', invalid='ignore'):
+        parametros['percentual_aluguel'] = np.asarray(bloco['aluguel'], dtype=float) / preco
+    return parametros
+
+
+def margens(parametros, prazo_simulacao, investimento_inicial='entrada',
+            criterios=CRITERIOS, relativa=False):
+    """Margem de cada critério por anúncio: patrimônio final da compra menos o da alternativa.
+
+    Com ``relativa``, a margem é dividida pelo preço do anúncio. Anúncios
+    sem preço ou aluguel válidos têm margem ``NaN``.
+    """
+    preco = np.asarray(parametros['valor_imovel'], dtype=float)
+    validos = (preco > 0) & np.isfinite(parametros['percentual_aluguel'])
+    # Anúncios inválidos são simulados com valores neutros e mascarados no fim
+    finais = motor.patrimonios_finais(
+        dict(parametros, valor_imovel=np.where(validos, preco, 1.0),
+             percentual_aluguel=np.where(validos, parametros['percentual_aluguel'], 0.0)),
+        prazo_simulacao, investimento_inicial)
+    resultado = {}
+    for criterio, (compra, alternativa) in criterios.items():
+        margem = finais[compra] - finais[alternativa]
+        if relativa:
+            margem = margem / np.where(validos, preco, 1.0)
+        resultado[criterio] = np.where(validos, margem, np.nan)
+    return resultado
+
+
+class MelhoresK:
+    """Os ``quantidade`` itens de maior pontuação vistos, em um heap de mínimo."""
+
+    def __init__(self, quantidade):
+        self.quantidade = quantidade
+        self._heap = []
+        self._vistos = 0
+
+    @property
+    def piso(self):
+        """Menor pontuação guardada, ou ``-inf`` enquanto o heap não está cheio."""
+        return self._heap[0][0] if len(self._heap) == self.quantidade else -np.inf
+
+    def adicionar_bloco(self, pontuacoes, registro):
+        """Oferece um bloco de pontuações; ``registro(i)`` monta o item da posição ``i``.
+
+        Pontuações ``NaN`` são ignoradas. ``registro`` só é chamado para os
+        candidatos que entram no heap.
+        """
+        pontuacoes = np.asarray(pontuacoes, dtype=float)
+        ordem_bloco = self._vistos
+        self._vistos += len(pontuacoes)
+        if self.quantidade <= 0:
+            return
+
+        candidatos = np.flatnonzero(pontuacoes > self.piso)
+        if len(candidatos) > self.quantidade:
+            melhores = np.argpartition(-pontuacoes[candidatos], self.quantidade - 1)
+            candidatos = candidatos[melhores[:self.quantidade]]
+        for indice in candidatos[np.argsort(-pontuacoes[candidatos], kind='stable')]:
+            # A ordem de chegada desempata pontuações iguais sem comparar os registros
+            item = (float(pontuacoes[indice]), -(ordem_bloco + int(indice)))
+            if len(self._heap) < self.quantidade:
+                heapq.heappush(self._heap, (*item, registro(indice)))
+            elif item > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, (*item, registro(indice)))
+            else:
+                break
+
+    def itens(self):
+        """Itens guardados, da maior para a menor pontuação."""
+        return [item for *_, item in sorted(self._heap, key=lambda entrada: entrada[:2], reverse=True)]
+
+
+def ranquear_anuncios(blocos, prazo_simulacao, padroes=None, quantidade=10,
+                      investimento_inicial='entrada', criterios=CRITERIOS, relativa=False):
+    """Os ``quantidade`` anúncios de maior margem em cada critério.
+
+    Args:
+        blocos: iterável de blocos como os de ``ler_anuncios_csv``.
+        prazo_simulacao: horizonte comum, em anos.
+        padroes: parâmetros do simulador para o que os anúncios não trazem
+            (por exemplo, ``SimuladorImovel().obter_parametros()``).
+        quantidade: tamanho de cada ranking.
+        investimento_inicial: como em ``motor.valores_finais``.
+        criterios: dicionário ``{nome: (compra, alternativa)}``.
+        relativa: ordena pela margem dividida pelo preço.
+
+    Returns:
+        Dicionário com ``'rankings'`` (por critério, lista de dicionários com
+        a ``'linha'`` do anúncio no arquivo, contada a partir de zero, o
+        bairro, o preço, o aluguel e a ``'margem'``, da maior para a menor),
+        o total de ``'anuncios'`` lidos e os ``'descartados'`` por preço ou
+        aluguel inválidos.
+    """
+    selecoes = {criterio: MelhoresK(quantidade) for criterio in criterios}
+    total = descartados = 0
+
+    for bloco in blocos:
+        parametros = parametros_anuncios(bloco, padroes)
+        margens_bloco = margens(parametros, prazo_simulacao, investimento_inicial,
+                                criterios, relativa)
+        preco, aluguel = bloco['preco'], bloco['aluguel']
+        bairro = bloco.get('bairro')
+
+        for criterio, margem in margens_bloco.items():
+            def registro(indice, margem=margem, inicio=total):
+                return {
+                    'linha': inicio + int(indice),
+                    'bairro': None if bairro is None else bairro[indice],
+                    'preco': float(preco[indice]),
+                    'aluguel': float(aluguel[indice]),
+                    'margem': float(margem[indice]),
+                }
+            selecoes[criterio].adicionar_bloco(margem, registro)
+
+        total += len(preco)
+        descartados += int(np.count_nonzero(np.isnan(next(iter(margens_bloco.values())))))
+
+    return {
+        'rankings': {criterio: selecao.itens() for criterio, selecao in selecoes.items()},
+        'anuncios': total,
+        'descartados': descartados,
+    }
@@ -1,529 +1,142 @@
+"""Interface Streamlit do Simulador de Opções Imobiliárias.
+
+Bibliotecas pesadas (pandas e matplotlib) são importadas somente no primeiro
+uso, assim como os módulos do projeto que dependem do NumPy, para reduzir o
+tempo de inicialização do processo e da primeira página.
+"""
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import locale
-from datetime import datetime
-
-# Configurar localização para formatação de moeda em português brasileiro
-try:
-    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'Portuguese_Brazil.1252')
-    except:
-        pass  # Fallback para configuração padrão
-
-# Classe SimuladorImovel
-class SimuladorImovel:
-    """Classe principal do simulador de opções imobiliárias."""
-    
-    def __init__(self):
-        """Inicializa o simulador com valores padrão."""
-        # Parâmetros padrão
-        self.valor_imovel = 500000.0
-        self.percentual_aluguel = 0.004  # 0.4% do valor do imóvel por mês
-        self.taxa_juros_investimento = 0.08  # 8% ao ano
-        self.taxa_juros_financiamento = 0.10  # 10% ao ano
-        self.taxa_valorizacao_imovel = 0.05  # 5% ao ano
-        self.percentual_financiamento = 0.50  # 50% financiado
-        self.prazo_financiamento = 20  # 20 anos
-        self.prazo_simulacao = 30  # 30 anos para simulação completa
-        
-        # Resultados
-        self.resultados = {}
-        
-    def definir_parametros(self, valor_imovel=None, percentual_aluguel=None, 
-                          taxa_juros_investimento=None, taxa_juros_financiamento=None,
-                          taxa_valorizacao_imovel=None, percentual_financiamento=None,
-                          prazo_financiamento=None, prazo_simulacao=None):
-        """Define os parâmetros da simulação."""
-        if valor_imovel is not None:
-            self.valor_imovel = valor_imovel
-        if percentual_aluguel is not None:
-            self.percentual_aluguel = percentual_aluguel
-        if taxa_juros_investimento is not None:
-            self.taxa_juros_investimento = taxa_juros_investimento
-        if taxa_juros_financiamento is not None:
-            self.taxa_juros_financiamento = taxa_juros_financiamento
-        if taxa_valorizacao_imovel is not None:
-            self.taxa_valorizacao_imovel = taxa_valorizacao_imovel
-        if percentual_financiamento is not None:
-            self.percentual_financiamento = percentual_financiamento
-        if prazo_financiamento is not None:
-            self.prazo_financiamento = prazo_financiamento
-        if prazo_simulacao is not None:
-            self.prazo_simulacao = prazo_simulacao
-    
-    def calcular_aluguel(self):
-        """Calcula a evolução patrimonial na opção de aluguel."""
-        # Inicialização de variáveis
-        valor_aluguel_mensal = self.valor_imovel * self.percentual_aluguel
-        taxa_juros_mensal = (1 + self.taxa_juros_investimento) ** (1/12) - 1
-        taxa_valorizacao_mensal = (1 + self.taxa_valorizacao_imovel) ** (1/12) - 1
-        
-        # Criação do DataFrame para armazenar os resultados
-        meses = self.prazo_simulacao * 12
-        df = pd.DataFrame(index=range(meses + 1))
-        
-        # Valores iniciais
-        df.loc[0, 'Mês'] = 0
-        df.loc[0, 'Patrimônio'] = self.valor_imovel  # Começa com o valor equivalente ao imóvel
-        df.loc[0, 'Investimento'] = self.valor_imovel
-        df.loc[0, 'Aluguel Mensal'] = valor_aluguel_mensal
-        df.loc[0, 'Aluguel Acumulado'] = 0
-        df.loc[0, 'Valor Imóvel'] = self.valor_imovel
-        
-        # Cálculo mês a mês
-        for mes in range(1, meses + 1):
-            # Atualização do valor do imóvel
-            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
-            
-            # Atualização do valor do aluguel (acompanha a valorização do imóvel)
-            valor_aluguel_atual = valor_imovel_atual * self.percentual_aluguel
-            
-            # Investimento cresce com juros e é reduzido pelo aluguel
-            investimento_anterior = df.loc[mes-1, 'Investimento']
-            investimento_atual = investimento_anterior * (1 + taxa_juros_mensal) - valor_aluguel_atual
-            
-            # Aluguel acumulado
-            aluguel_acumulado = df.loc[mes-1, 'Aluguel Acumulado'] + valor_aluguel_atual
-            
-            # Registro dos valores
-            df.loc[mes, 'Mês'] = mes
-            df.loc[mes, 'Patrimônio'] = investimento_atual
-            df.loc[mes, 'Investimento'] = investimento_atual
-            df.loc[mes, 'Aluguel Mensal'] = valor_aluguel_atual
-            df.loc[mes, 'Aluguel Acumulado'] = aluguel_acumulado
-            df.loc[mes, 'Valor Imóvel'] = valor_imovel_atual
-        
-        self.resultados['aluguel'] = df
-        return df
-    
-    def calcular_compra_vista(self):
-        """Calcula a evolução patrimonial na opção de compra à vista."""
-        # Inicialização de variáveis
-        taxa_valorizacao_mensal = (1 + self.taxa_valorizacao_imovel) ** (1/12) - 1
-        
-        # Criação do DataFrame para armazenar os resultados
-        meses = self.prazo_simulacao * 12
-        df = pd.DataFrame(index=range(meses + 1))
-        
-        # Valores iniciais
-        df.loc[0, 'Mês'] = 0
-        df.loc[0, 'Patrimônio'] = self.valor_imovel
-        df.loc[0, 'Valor Imóvel'] = self.valor_imovel
-        df.loc[0, 'Investimento'] = 0
-        
-        # Cálculo mês a mês
-        for mes in range(1, meses + 1):
-            # Atualização do valor do imóvel
-            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
-            
-            # Registro dos valores
-            df.loc[mes, 'Mês'] = mes
-            df.loc[mes, 'Patrimônio'] = valor_imovel_atual
-            df.loc[mes, 'Valor Imóvel'] = valor_imovel_atual
-            df.loc[mes, 'Investimento'] = 0
-        
-        self.resultados['compra_vista'] = df
-        return df
-    
-    def calcular_compra_financiada(self):
-        """Calcula a evolução patrimonial na opção de compra financiada."""
-        # Inicialização de variáveis
-        valor_financiado = self.valor_imovel * self.percentual_financiamento
-        valor_entrada = self.valor_imovel - valor_financiado
-        
-        taxa_juros_mensal = (1 + self.taxa_juros_financiamento) ** (1/12) - 1
-        taxa_juros_investimento_mensal = (1 + self.taxa_juros_investimento) ** (1/12) - 1
-        taxa_valorizacao_mensal = (1 + self.taxa_valorizacao_imovel) ** (1/12) - 1
-        
-        # Cálculo da prestação do financiamento (Sistema de Amortização Constante - SAC)
-        amortizacao_mensal = valor_financiado / (self.prazo_financiamento * 12)
-        
-        # Criação do DataFrame para armazenar os resultados
-        meses = self.prazo_simulacao * 12
-        df = pd.DataFrame(index=range(meses + 1))
-        
-        # Valores iniciais
-        df.loc[0, 'Mês'] = 0
-        df.loc[0, 'Patrimônio'] = self.valor_imovel
-        df.loc[0, 'Valor Imóvel'] = self.valor_imovel
-        df.loc[0, 'Saldo Devedor'] = valor_financiado
-        df.loc[0, 'Investimento'] = valor_entrada
-        df.loc[0, 'Prestação'] = 0
-        df.loc[0, 'Juros Pagos'] = 0
-        df.loc[0, 'Juros Acumulados'] = 0
-        
-        # Cálculo mês a mês
-        for mes in range(1, meses + 1):
-            # Atualização do valor do imóvel
-            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
-            
-            # Cálculo do saldo devedor e prestação (apenas durante o período de financiamento)
-            if mes <= self.prazo_financiamento * 12:
-                saldo_devedor_anterior = df.loc[mes-1, 'Saldo Devedor']
-                juros_mensais = saldo_devedor_anterior * taxa_juros_mensal
-                prestacao = amortizacao_mensal + juros_mensais
-                saldo_devedor_atual = saldo_devedor_anterior - amortizacao_mensal
-                juros_acumulados = df.loc[mes-1, 'Juros Acumulados'] + juros_mensais
-            else:
-                saldo_devedor_atual = 0
-                prestacao = 0
-                juros_mensais = 0
-                juros_acumulados = df.loc[mes-1, 'Juros Acumulados']
-            
-            # Atualização do investimento
-            investimento_anterior = df.loc[mes-1, 'Investimento']
-            investimento_atual = investimento_anterior * (1 + taxa_juros_investimento_mensal) - prestacao
-            
-            # Patrimônio total = valor do imóvel - saldo devedor + investimentos
-            patrimonio = valor_imovel_atual - saldo_devedor_atual + max(0, investimento_atual)
-            
-            # Registro dos valores
-            df.loc[mes, 'Mês'] = mes
-            df.loc[mes, 'Patrimônio'] = patrimonio
-            df.loc[mes, 'Valor Imóvel'] = valor_imovel_atual
-            df.loc[mes, 'Saldo Devedor'] = saldo_devedor_atual
-            df.loc[mes, 'Investimento'] = max(0, investimento_atual)
-            df.loc[mes, 'Prestação'] = prestacao
-            df.loc[mes, 'Juros Pagos'] = juros_mensais
-            df.loc[mes, 'Juros Acumulados'] = juros_acumulados
-        
-        self.resultados['compra_financiada'] = df
-        return df
-    
-    def executar_simulacao(self):
-        """Executa a simulação completa para as três opções."""
-        self.calcular_aluguel()
-        self.calcular_compra_vista()
-        self.calcular_compra_financiada()
-        return self.resultados
-    
-    def formatar_moeda(self, valor):
-        """Formata um valor como moeda brasileira."""
-        try:
-            return locale.currency(valor, grouping=True)
-        except:
-            return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
-    def analisar_riscos_beneficios(self):
-        """Analisa os riscos e benefícios de cada opção."""
-        analise = {
-            'aluguel': {
-                'beneficios': [
-                    'Maior liquidez do patrimônio',
-                    'Flexibilidade para mudança de localização',
-                    'Sem custos de manutenção e IPTU',
-                    'Sem risco de desvalorização do imóvel',
-                    'Sem necessidade de grande capital inicial'
-                ],
-                'riscos': [
-                    'Aumento do valor do aluguel acima da inflação',
-                    'Rendimento dos investimentos pode cair',
-                    'Insegurança quanto à renovação do contrato',
-                    'Limitações para personalização do imóvel',
-                    'Não formação de patrimônio imobiliário'
-                ]
-            },
-            'compra_vista': {
-                'beneficios': [
-                    'Ausência de juros e encargos financeiros',
-                    'Segurança da propriedade imediata',
-                    'Potencial de valorização do imóvel',
-                    'Liberdade para personalização do imóvel',
-                    'Redução de despesas mensais fixas'
-                ],
-                'riscos': [
-                    'Imobilização de capital significativo',
-                    'Baixa liquidez do patrimônio',
-                    'Risco de desvalorização do imóvel',
-                    'Custos de manutenção, IPTU e condomínio',
-                    'Custo de oportunidade do capital não investido'
-                ]
-            },
-            'compra_financiada': {
-                'beneficios': [
-                    'Preservação de parte do capital para investimentos',
-                    'Seguro patrimonial e de vida incluído no financiamento',
-                    'Possibilidade de renegociação da dívida com queda nos juros',
-                    'Opção de quitação antecipada',
-                    'Juros pagos elevam o valor de aquisição, reduzindo IR sobre ganho de capital',
-                    'Valorização do imóvel com queda nos juros'
-                ],
-                'riscos': [
-                    'Custo total elevado devido aos juros do financiamento',
-                    'Comprometimento da renda por longo período',
-                    'Risco de inadimplência em caso de perda de renda',
-                    'Possível desvalorização do imóvel',
-                    'Rendimento dos investimentos pode ficar abaixo do custo do financiamento'
-                ]
-            }
-        }
-        
-        return analise
-
-# Função para formatar moeda
-def formatar_moeda(valor):
-    try:
-        return locale.currency(valor, grouping=True)
-    except:
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-# Função para formatar percentual
-def formatar_percentual(valor):
-    return f"{valor*100:.2f}%"
-
-# Configuração da página
-st.set_page_config(
-    page_title="Simulador de Opções Imobiliárias",
-    page_icon="🏠",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Título principal
-st.title("🏠 Simulador de Opções Imobiliárias")
-
-st.markdown("""
-Este simulador compara três alternativas para aquisição de imóvel:
-1. **Aluguel**: Alugar o imóvel e investir o valor equivalente à compra
-2. **Compra à Vista**: Adquirir o imóvel com pagamento integral
-3. **Compra Financiada**: Adquirir o imóvel com entrada parcial e financiamento
-""")
-
-# Criar abas
-tab1, tab2, tab3 = st.tabs(["Simulador", "Resultados Detalhados", "Riscos e Benefícios"])
-
-with tab1:
-    # Sidebar para parâmetros de entrada
-    st.sidebar.header("Parâmetros da Simulação")
-    
-    # Criar instância do simulador
-    simulador = SimuladorImovel()
-    
-    # Parâmetros do imóvel
-    st.sidebar.subheader("Imóvel")
-    valor_imovel = st.sidebar.number_input(
-        "Valor do Imóvel (R$)",
-        min_value=100000.0,
-        max_value=10000000.0,
-        value=simulador.valor_imovel,
-        step=50000.0,
-        format="%.2f"
-    )
-    
-    percentual_aluguel = st.sidebar.slider(
-        "Aluguel Mensal (% do valor do imóvel)",
-        min_value=0.1,
-        max_value=1.0,
-        value=simulador.percentual_aluguel * 100,
-        step=0.05,
-        format="%.2f%%"
-    ) / 100
-    
-    taxa_valorizacao_imovel = st.sidebar.slider(
-        "Valorização Anual do Imóvel (%)",
-        min_value=0.0,
-        max_value=15.0,
-        value=simulador.taxa_valorizacao_imovel * 100,
-        step=0.5,
-        format="%.2f%%"
-    ) / 100
-    
-    # Parâmetros financeiros
-    st.sidebar.subheader("Investimentos")
-    taxa_juros_investimento = st.sidebar.slider(
-        "Rendimento Anual dos Investimentos (% livre de IR)",
-        min_value=0.0,
-        max_value=15.0,
-        value=simulador.taxa_juros_investimento * 100,
-        step=0.5,
-        format="%.2f%%"
-    ) / 100
-    
-    # Parâmetros do financiamento
-    st.sidebar.subheader("Financiamento")
-    percentual_financiamento = st.sidebar.slider(
-        "Percentual Financiado (%)",
-        min_value=10.0,
-        max_value=90.0,
-        value=simulador.percentual_financiamento * 100,
-        step=5.0,
-        format="%.1f%%"
-    ) / 100
-    
-    taxa_juros_financiamento = st.sidebar.slider(
-        "Taxa de Juros Anual do Financiamento (%)",
-        min_value=5.0,
-        max_value=20.0,
-        value=simulador.taxa_juros_financiamento * 100,
-        step=0.5,
-        format="%.2f%%"
-    ) / 100
-    
-    prazo_financiamento = st.sidebar.slider(
-        "Prazo do Financiamento (anos)",
-        min_value=5,
-        max_value=35,
-        value=simulador.prazo_financiamento,
-        step=1
-    )
-    
-    # Parâmetros da simulação
-    st.sidebar.subheader("Simulação")
-    prazo_simulacao = st.sidebar.slider(
-        "Prazo da Simulação (anos)",
-        min_value=5,
-        max_value=50,
-        value=simulador.prazo_simulacao,
-        step=5
-    )
-    
-    # Atualizar parâmetros do simulador
-    simulador.definir_parametros(
-        valor_imovel=valor_imovel,
-        percentual_aluguel=percentual_aluguel,
-        taxa_juros_investimento=taxa_juros_investimento,
-        taxa_juros_financiamento=taxa_juros_financiamento,
-        taxa_valorizacao_imovel=taxa_valorizacao_imovel,
-        percentual_financiamento=percentual_financiamento,
-        prazo_financiamento=prazo_financiamento,
-        prazo_simulacao=prazo_simulacao
+
+from simulador import DOMINIOS, SimuladorImovel, formatar_moeda, formatar_percentual
+
+
+MODOS_GRAFICO = ["Interativo (navegador)", "Imagem estática"]
+
+# Intervalo mínimo, em segundos, entre atualizações do gráfico parcial
+# enquanto a simulação avança
+INTERVALO_PROGRESSO = 0.25
+
+
+def controle_parametro(simulador, nome, numerico=False, **opcoes):
+    """Controle da barra lateral do parâmetro ``nome``, montado a partir de ``DOMINIOS``.
+
+    Parte do valor atual do simulador e devolve o escolhido na unidade do
+    simulador. ``numerico`` troca o controle deslizante por uma caixa de
+    número; ``opcoes`` vão para o controle (por exemplo, ``help``).
+    """
+    dominio = DOMINIOS[nome]
+    if 'formato' in dominio:
+        opcoes['format'] = dominio['formato']
+    controle = st.sidebar.number_input if numerico else st.sidebar.slider
+    valor = controle(
+        dominio['rotulo'],
+        min_value=dominio['minimo'],
+        max_value=dominio['maximo'],
+        value=getattr(simulador, nome) * dominio['escala'],
+        step=dominio['passo'],
+        **opcoes
     )
-    
-    # Executar simulação
-    resultados = simulador.executar_simulacao()
-    
-    # Exibir resumo dos parâmetros
-    st.subheader("Resumo dos Parâmetros")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("Valor do Imóvel", formatar_moeda(valor_imovel))
-        st.metric("Aluguel Mensal", formatar_moeda(valor_imovel * percentual_aluguel))
-    
-    with col2:
-        st.metric("Rendimento Investimentos", formatar_percentual(taxa_juros_investimento))
-        st.metric("Valorização do Imóvel", formatar_percentual(taxa_valorizacao_imovel))
-    
-    with col3:
-        st.metric("Valor Financiado", formatar_moeda(valor_imovel * percentual_financiamento))
-        st.metric("Juros do Financiamento", formatar_percentual(taxa_juros_financiamento))
-    
-    # Exibir gráfico de evolução patrimonial
-    st.subheader("Evolução Patrimonial")
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Formatador para exibir valores em reais
-    def formatar_eixo_y(valor, pos):
-        if valor >= 1e6:
-            return f'R$ {valor/1e6:.1f}M'
+    # Prazos (escala 1) continuam inteiros
+    return valor / dominio['escala'] if dominio['escala'] != 1 else valor
+
+
+def exibir_grafico(series, titulo, rotulo_y, modo, marcos=()):
+    """Exibe as séries no modo escolhido na barra lateral.
+    
+    O modo interativo envia ao navegador séries reduzidas no servidor, com
+    valores exatos ao passar o mouse; o modo estático envia uma imagem PNG.
+    ``marcos`` opcionais, lista de ``(anos, texto)``, são anotados como
+    linhas verticais.
+    """
+    import graficos
+    
+    if modo == MODOS_GRAFICO[0]:
+        st.markdown(f"**{titulo}**")
+        dados = graficos.dados_interativos(series)
+        if marcos:
+            st.altair_chart(graficos.grafico_interativo(dados, rotulo_y, marcos),
+                            use_container_width=True)
         else:
-            return f'R$ {valor/1e3:.0f}K'
-    
-    formatter = plt.FuncFormatter(formatar_eixo_y)
-    
-    # Plotar os dados
-    ax.plot(resultados['aluguel']['Mês'] / 12, 
-             resultados['aluguel']['Patrimônio'], 
-             label='Aluguel', linewidth=2)
-    
-    ax.plot(resultados['compra_vista']['Mês'] / 12, 
-             resultados['compra_vista']['Patrimônio'], 
-             label='Compra à Vista', linewidth=2)
-    
-    ax.plot(resultados['compra_financiada']['Mês'] / 12, 
-             resultados['compra_financiada']['Patrimônio'], 
-             label='Compra Financiada', linewidth=2)
-    
-    # Configurações do gráfico
-    ax.set_xlabel('Anos')
-    ax.set_ylabel('Patrimônio Total')
-    ax.set_title('Comparação da Evolução Patrimonial')
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
-    ax.yaxis.set_major_formatter(formatter)
-    
-    st.pyplot(fig)
-    
-    # Exibir tabela comparativa
-    st.subheader("Comparação dos Resultados")
-    
-    # Extrair resultados finais
-    resultado_aluguel = resultados['aluguel'].iloc[-1]
-    resultado_compra_vista = resultados['compra_vista'].iloc[-1]
-    resultado_compra_financiada = resultados['compra_financiada'].iloc[-1]
-    
-    # Criar DataFrame comparativo
-    comparacao = pd.DataFrame({
-        'Métrica': [
-            'Patrimônio Final',
-            'Valor Final do Imóvel',
-            'Investimento Final',
-            'Aluguel Total Pago',
-            'Juros Totais Pagos',
-            'Retorno sobre Investimento (%)'
-        ],
-        'Aluguel': [
-            formatar_moeda(resultado_aluguel['Patrimônio']),
-            formatar_moeda(resultado_aluguel['Valor Imóvel']),
-            formatar_moeda(resultado_aluguel['Investimento']),
-            formatar_moeda(resultado_aluguel['Aluguel Acumulado']),
-            'N/A',
-            f"{(resultado_aluguel['Patrimônio'] / valor_imovel - 1) * 100:.2f}%"
-        ],
-        'Compra à Vista': [
-            formatar_moeda(resultado_compra_vista['Patrimônio']),
-            formatar_moeda(resultado_compra_vista['Valor Imóvel']),
-            'N/A',
-            'N/A',
-            'N/A',
-            f"{(resultado_compra_vista['Patrimônio'] / valor_imovel - 1) * 100:.2f}%"
-        ],
-        'Compra Financiada': [
-            formatar_moeda(resultado_compra_financiada['Patrimônio']),
-            formatar_moeda(resultado_compra_financiada['Valor Imóvel']),
-            formatar_moeda(resultado_compra_financiada['Investimento']),
-            'N/A',
-            formatar_moeda(resultado_compra_financiada['Juros Acumulados']),
-            f"{(resultado_compra_financiada['Patrimônio'] / valor_imovel - 1) * 100:.2f}%"
-        ]
-    })
-    
-    st.table(comparacao)
-    
-    # Conclusão
-    st.subheader("Conclusão")
-    
-    # Determinar a melhor opção com base no patrimônio final
-    patrimonio_aluguel = resultado_aluguel['Patrimônio']
-    patrimonio_compra_vista = resultado_compra_vista['Patrimônio']
-    patrimonio_compra_financiada = resultado_compra_financiada['Patrimônio']
-    
-    patrimonios = {
-        "Aluguel": patrimonio_aluguel,
-        "Compra à Vista": patrimonio_compra_vista,
-        "Compra Financiada": patrimonio_compra_financiada
+            st.line_chart(
+                dados,
+                x='Anos',
+                y='Valor',
+                color='Série',
+                x_label='Anos',
+                y_label=rotulo_y
+            )
+    else:
+        st.image(graficos.imagem_png(series, titulo, rotulo_y, marcos=marcos),
+                 use_container_width=True)
+
+
+def montar_series_patrimonio(resultados):
+    """Séries de patrimônio das três opções no formato de ``exibir_grafico``."""
+    return {
+        'Aluguel': (resultados['aluguel']['Mês'] / 12, resultados['aluguel']['Patrimônio']),
+        'Compra à Vista': (resultados['compra_vista']['Mês'] / 12,
+                           resultados['compra_vista']['Patrimônio']),
+        'Compra Financiada': (resultados['compra_financiada']['Mês'] / 12,
+                              resultados['compra_financiada']['Patrimônio']),
     }
-    
-    melhor_opcao = max(patrimonios, key=patrimonios.get)
-    
-    st.markdown(f"""
-    Com base nos parâmetros informados, a opção com maior patrimônio final após {prazo_simulacao} anos é:
-    
-    ### {melhor_opcao}
-    
-    Com um patrimônio final de {formatar_moeda(patrimonios[melhor_opcao])}.
-    
-    > **Nota:** Esta conclusão considera apenas o aspecto financeiro. Fatores pessoais como segurança, flexibilidade e preferências individuais também devem ser considerados na decisão final.
-    """)
 
-with tab2:
-    st.header("Resultados Detalhados")
+
+def simular_progressivamente(simulador, espaco):
+    """Executa a simulação ano a ano, mostrando em ``espaco`` o gráfico parcial.
+    
+    O primeiro ano aparece assim que é calculado; depois, o gráfico parcial é
+    atualizado no máximo a cada ``INTERVALO_PROGRESSO`` segundos, de modo que
+    simulações rápidas não pagam por redesenhos. Retorna os resultados
+    completos, como ``executar_simulacao``.
+    """
+    import time
+    
+    import graficos
+    import pandas as pd
+    
+    blocos = {}
+    ultima_atualizacao = None
+    for bloco in simulador.iterar_simulacao(meses_por_bloco=12):
+        for estrategia, df in bloco.items():
+            blocos.setdefault(estrategia, []).append(df)
+        if ultima_atualizacao is None or time.perf_counter() - ultima_atualizacao >= INTERVALO_PROGRESSO:
+            parciais = {estrategia: pd.concat(dfs, ignore_index=True) for estrategia, dfs in blocos.items()}
+            anos = parciais['aluguel']['Mês'].iloc[-1] / 12
+            with espaco.container():
+                st.caption(f"Simulando: {anos:g} de {simulador.prazo_simulacao:g} anos")
+                st.line_chart(graficos.dados_interativos(montar_series_patrimonio(parciais)),
+                              x='Anos', y='Valor', color='Série')
+            ultima_atualizacao = time.perf_counter()
+    return {estrategia: pd.concat(dfs, ignore_index=True) for estrategia, dfs in blocos.items()}
+
+
+def montar_marcos_cruzamento(resultados):
+    """Meses em que uma opção passa outra, como ``(anos, texto)`` para ``exibir_grafico``."""
+    import cruzamentos
+    
+    nomes = {'aluguel': 'Aluguel', 'compra_vista': 'Compra à Vista',
+             'compra_financiada': 'Compra Financiada'}
+    analise = cruzamentos.analisar(resultados)
+    # As tabelas do simulador podem ter uma linha por ano: a posição do
+    # cruzamento é convertida pelo mês de cada linha
+    meses = list(resultados['aluguel']['Mês'])
+    marcos = []
+    for a, b in cruzamentos.PARES:
+        sinais = analise[(a, b)]['sinais'][0]
+        for posicao in cruzamentos.meses_cruzamento(sinais)[0]:
+            frente, atras = (a, b) if sinais[posicao] > 0 else (b, a)
+            marcos.append((meses[posicao] / 12, f"{nomes[frente]} passa {nomes[atras]}"))
+    return sorted(marcos)
+
+
+# As seções abaixo são fragmentos: interagir com seus controles reexecuta apenas
+# a própria seção, usando os resultados da última execução completa guardados
+# em st.session_state, sem reler a barra lateral nem refazer a simulação.
+
+@st.fragment
+def secao_detalhes():
+    """Tabela anual da opção escolhida na aba de resultados detalhados."""
+    resultados = st.session_state['resultados']
     
     opcao = st.selectbox(
         "Selecione a opção para ver detalhes:",
@@ -540,6 +153,8 @@ with tab2:
         
         # Selecionar colunas relevantes
         colunas = ['Ano', 'Patrimônio', 'Investimento', 'Aluguel Mensal', 'Aluguel Acumulado', 'Valor Imóvel']
+        if df['Custos Mensais'].any():
+            colunas.append('Custos Mensais')
         
         # Formatar valores monetários
         df_formatado = df_anual[colunas].copy()
@@ -558,6 +173,8 @@ with tab2:
         
         # Selecionar colunas relevantes
         colunas = ['Ano', 'Patrimônio', 'Valor Imóvel']
+        if df['Custos Mensais'].any():
+            colunas.append('Custos Mensais')
         
         # Formatar valores monetários
         df_formatado = df_anual[colunas].copy()
@@ -576,6 +193,8 @@ with tab2:
         
         # Selecionar colunas relevantes
         colunas = ['Ano', 'Patrimônio', 'Valor Imóvel', 'Saldo Devedor', 'Investimento', 'Prestação', 'Juros Acumulados']
+        if df['Custos Mensais'].any():
+            colunas.append('Custos Mensais')
         
         # Formatar valores monetários
         df_formatado = df_anual[colunas].copy()
@@ -583,6 +202,13 @@ with tab2:
             df_formatado[col] = df_formatado[col].apply(formatar_moeda)
         
         st.dataframe(df_formatado)
+
+
+@st.fragment
+def secao_graficos_adicionais():
+    """Gráfico escolhido na aba de resultados detalhados."""
+    resultados = st.session_state['resultados']
+    modo_grafico = st.session_state['modo_grafico']
     
     # Gráficos adicionais
     st.subheader("Gráficos Adicionais")
@@ -593,67 +219,32 @@ with tab2:
     )
     
     if grafico_opcao == "Comparação de Patrimônio":
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        ax.plot(resultados['aluguel']['Mês'] / 12, 
-                 resultados['aluguel']['Patrimônio'], 
-                 label='Aluguel', linewidth=2)
-        
-        ax.plot(resultados['compra_vista']['Mês'] / 12, 
-                 resultados['compra_vista']['Patrimônio'], 
-                 label='Compra à Vista', linewidth=2)
-        
-        ax.plot(resultados['compra_financiada']['Mês'] / 12, 
-                 resultados['compra_financiada']['Patrimônio'], 
-                 label='Compra Financiada', linewidth=2)
-        
-        ax.set_xlabel('Anos')
-        ax.set_ylabel('Patrimônio Total')
-        ax.set_title('Comparação da Evolução Patrimonial')
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(formatar_eixo_y))
-        
-        st.pyplot(fig)
+        exibir_grafico(montar_series_patrimonio(resultados), 'Comparação da Evolução Patrimonial',
+                       'Patrimônio Total', modo_grafico, montar_marcos_cruzamento(resultados))
         
     elif grafico_opcao == "Evolução do Valor do Imóvel":
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        ax.plot(resultados['aluguel']['Mês'] / 12, 
-                 resultados['aluguel']['Valor Imóvel'], 
-                 label='Valor do Imóvel', linewidth=2)
-        
-        ax.set_xlabel('Anos')
-        ax.set_ylabel('Valor do Imóvel')
-        ax.set_title('Evolução do Valor do Imóvel')
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(formatar_eixo_y))
-        
-        st.pyplot(fig)
+        exibir_grafico(
+            {'Valor do Imóvel': (resultados['aluguel']['Mês'] / 12,
+                                 resultados['aluguel']['Valor Imóvel'])},
+            'Evolução do Valor do Imóvel', 'Valor do Imóvel', modo_grafico
+        )
         
     else:  # Comparação de Investimentos
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        ax.plot(resultados['aluguel']['Mês'] / 12, 
-                 resultados['aluguel']['Investimento'], 
-                 label='Investimento (Aluguel)', linewidth=2)
-        
-        ax.plot(resultados['compra_financiada']['Mês'] / 12, 
-                 resultados['compra_financiada']['Investimento'], 
-                 label='Investimento (Financiamento)', linewidth=2)
-        
-        ax.set_xlabel('Anos')
-        ax.set_ylabel('Valor do Investimento')
-        ax.set_title('Comparação dos Investimentos')
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(formatar_eixo_y))
-        
-        st.pyplot(fig)
+        exibir_grafico(
+            {
+                'Investimento (Aluguel)': (resultados['aluguel']['Mês'] / 12,
+                                           resultados['aluguel']['Investimento']),
+                'Investimento (Financiamento)': (resultados['compra_financiada']['Mês'] / 12,
+                                                 resultados['compra_financiada']['Investimento']),
+            },
+            'Comparação dos Investimentos', 'Valor do Investimento', modo_grafico
+        )
+
 
-with tab3:
-    st.header("Análise de Riscos e Benefícios")
+@st.fragment
+def secao_riscos_beneficios():
+    """Riscos e benefícios da opção escolhida e comparação geral."""
+    simulador = st.session_state['simulador']
     
     # Obter análise de riscos e benefícios
     analise = simulador.analisar_riscos_beneficios()
@@ -691,17 +282,19 @@ with tab3:
     # Exibir comparação geral
     st.subheader("Comparação Geral de Riscos e Benefícios")
     
-    # Criar tabela comparativa
+    # Criar tabela comparativa (as listas podem ter tamanhos diferentes)
+    import pandas as pd
+    
     beneficios_df = pd.DataFrame({
-        'Aluguel': analise['aluguel']['beneficios'],
-        'Compra à Vista': analise['compra_vista']['beneficios'],
-        'Compra Financiada': analise['compra_financiada']['beneficios']
+        'Aluguel': pd.Series(analise['aluguel']['beneficios']),
+        'Compra à Vista': pd.Series(analise['compra_vista']['beneficios']),
+        'Compra Financiada': pd.Series(analise['compra_financiada']['beneficios'])
     })
     
     riscos_df = pd.DataFrame({
-        'Aluguel': analise['aluguel']['riscos'],
-        'Compra à Vista': analise['compra_vista']['riscos'],
-        'Compra Financiada': analise['compra_financiada']['riscos']
+        'Aluguel': pd.Series(analise['aluguel']['riscos']),
+        'Compra à Vista': pd.Series(analise['compra_vista']['riscos']),
+        'Compra Financiada': pd.Series(analise['compra_financiada']['riscos'])
     })
     
     st.markdown("### Benefícios Comparados")
@@ -709,28 +302,621 @@ with tab3:
     
     st.markdown("### Riscos Comparados")
     st.dataframe(riscos_df)
+
+
+@st.fragment
+def secao_otimizacao():
+    """Otimização do percentual e do prazo do financiamento."""
+    simulador = st.session_state['simulador']
     
-    # Considerações adicionais
-    st.subheader("Considerações Adicionais")
+    col1, col2 = st.columns(2)
     
-    st.markdown("""
-    ### Fatores que podem influenciar a decisão:
+    with col1:
+        renda_mensal = st.number_input(
+            "Renda Mensal (R$, 0 para ignorar)",
+            min_value=0.0,
+            value=0.0,
+            step=1000.0,
+            format="%.2f"
+        )
     
-    1. **Estabilidade financeira**: A compra financiada requer estabilidade de renda a longo prazo.
+    with col2:
+        comprometimento_maximo = st.slider(
+            "Comprometimento Máximo da Renda (%)",
+            min_value=10.0,
+            max_value=50.0,
+            value=30.0,
+            step=1.0,
+            format="%.0f%%"
+        ) / 100
+    
+    refinar = st.checkbox("Refinar em torno do melhor ponto (percentual e prazo contínuos)")
+    
+    from otimizador import otimizar_financiamento
+    
+    otimo = otimizar_financiamento(
+        simulador,
+        renda_mensal=renda_mensal or None,
+        comprometimento_maximo=comprometimento_maximo,
+        refinamentos=4 if refinar else 0
+    )
     
-    2. **Planos futuros**: Se há possibilidade de mudança de cidade ou país nos próximos anos, o aluguel oferece mais flexibilidade.
+    if otimo['percentual_financiamento'] is None:
+        st.warning("Nenhuma combinação respeita o comprometimento máximo da renda.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Percentual Financiado", formatar_percentual(otimo['percentual_financiamento']))
+            st.metric("Prazo do Financiamento", f"{otimo['prazo_financiamento']:.2f} anos")
+        
+        with col2:
+            st.metric("Patrimônio Final", formatar_moeda(otimo['patrimonio_final']))
+        
+        with col3:
+            st.metric("Maior Prestação", formatar_moeda(otimo['prestacao_maxima']))
+        
+        # Grade completa: linhas são percentuais, colunas são prazos
+        import pandas as pd
+        
+        grade = pd.DataFrame(
+            otimo['grade_patrimonio'],
+            index=[formatar_percentual(p) for p in otimo['percentuais']],
+            columns=[f"{int(prazo)} anos" for prazo in otimo['prazos']]
+        )
+        
+        st.subheader("Patrimônio Final por Combinação")
+        st.dataframe(grade.style.format(formatar_moeda, na_rep="inviável"))
+
+
+@st.fragment
+def secao_quitacao_antecipada():
+    """Comparação de políticas de amortização extraordinária na compra financiada."""
+    simulador = st.session_state['simulador']
     
-    3. **Mercado imobiliário local**: Em algumas regiões, o mercado pode estar supervalorizado, tornando o aluguel mais vantajoso no curto prazo.
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        aporte_anual = st.number_input(
+            "Aporte Anual para Amortização (R$)",
+            min_value=0.0,
+            value=20000.0,
+            step=5000.0,
+            format="%.2f"
+        )
     
-    4. **Taxas de juros**: Mudanças nas taxas de juros podem afetar tanto o financiamento quanto o rendimento dos investimentos.
+    with col2:
+        reserva = st.number_input(
+            "Reserva Mínima Investida (R$)",
+            min_value=0.0,
+            value=100000.0,
+            step=10000.0,
+            format="%.2f"
+        )
+    
+    import amortizacao
+    import numpy as np
+    import pandas as pd
+    
+    meses = int(round(simulador.prazo_simulacao * 12))
+    aportes = {mes: aporte_anual for mes in range(12, meses + 1, 12)}
+    politicas = {
+        'Sem amortização': amortizacao.politica(),
+        'Aporte anual, reduz prazo': amortizacao.politica(aportes=aportes, modo='prazo'),
+        'Aporte anual, reduz prestação': amortizacao.politica(aportes=aportes, modo='prestacao'),
+        'Excedente da reserva, reduz prazo': amortizacao.politica(excedente_acima=reserva, modo='prazo'),
+        'Excedente da reserva, reduz prestação': amortizacao.politica(excedente_acima=reserva,
+                                                                      modo='prestacao'),
+    }
     
-    5. **Aspectos emocionais**: O sentimento de propriedade e segurança que um imóvel próprio proporciona não pode ser quantificado financeiramente.
+    resultado = amortizacao.simular_amortizacao(
+        simulador.obter_parametros(),
+        list(politicas.values()),
+        simulador.prazo_simulacao,
+        simulador.investimento_inicial_financiada
+    )
+    
+    quitacao = resultado['Mês de Quitação'][0]
+    comparacao = pd.DataFrame({
+        'Patrimônio Final': resultado['Patrimônio'][0, :, -1],
+        'Juros Pagos': resultado['Juros Acumulados'][0, :, -1],
+        'Amortização Extra': resultado['Amortização Extra'][0].sum(axis=1),
+        'Quitação': [f"{mes / 12:.1f} anos" if np.isfinite(mes) else "após o horizonte" for mes in quitacao],
+    }, index=list(politicas))
+    
+    st.dataframe(comparacao.style.format(formatar_moeda, subset=[
+        'Patrimônio Final', 'Juros Pagos', 'Amortização Extra']))
+    
+    anos = resultado['Mês'][0, 0] / 12
+    series = {nome: (anos, resultado['Saldo Devedor'][0, indice])
+              for indice, nome in enumerate(politicas)}
+    exibir_grafico(series, "Saldo Devedor por Política", "Saldo Devedor (R$)",
+                   st.session_state['modo_grafico'])
+
+
+@st.fragment
+def secao_mapa_sensibilidade():
+    """Mapa da opção vencedora sobre a grade de dois parâmetros escolhidos."""
+    simulador = st.session_state['simulador']
+    
+    import altair as alt
+    import numpy as np
+    import pandas as pd
+    
+    import sensibilidade
+    from simulador import DOMINIOS
+    
+    nomes = list(DOMINIOS)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        parametro_x = st.selectbox(
+            "Parâmetro do eixo horizontal:",
+            nomes,
+            index=nomes.index('percentual_aluguel'),
+            format_func=lambda nome: DOMINIOS[nome]['rotulo']
+        )
     
-    6. **Custos adicionais**: Impostos, manutenção, condomínio e reformas são custos que proprietários precisam considerar.
+    with col2:
+        parametro_y = st.selectbox(
+            "Parâmetro do eixo vertical:",
+            nomes,
+            index=nomes.index('taxa_juros_investimento'),
+            format_func=lambda nome: DOMINIOS[nome]['rotulo']
+        )
+    
+    st.markdown("**Qual parâmetro mais pesa na decisão**")
+    importancia = sensibilidade.importancia_parametros(simulador)
+    st.dataframe(pd.DataFrame({
+        'Parâmetro': [DOMINIOS[item['parametro']]['rotulo'] for item in importancia],
+        'Passo': [f"{item['passo'] * DOMINIOS[item['parametro']]['escala']:g}" for item in importancia],
+        **{nome: [formatar_moeda(item['efeitos'][indice]) for item in importancia]
+           for indice, nome in enumerate(sensibilidade.NOMES_ESTRATEGIAS)},
+        'Margem da Vencedora': [formatar_moeda(item['efeito_margem']) for item in importancia],
+    }), hide_index=True)
+    st.caption("Variação do patrimônio final quando cada controle sobe um passo, pelas derivadas "
+               "exatas; a última coluna mostra quanto a vantagem da melhor opção sobre a segunda muda.")
+    
+    if parametro_x == parametro_y:
+        st.warning("Escolha dois parâmetros diferentes.")
+        return
+    
+    mapa = sensibilidade.mapa_vencedores(simulador, parametro_x, parametro_y)
+    
+    # Uma linha por célula, com os eixos na unidade exibida nos controles
+    grade_y, grade_x = np.meshgrid(
+        mapa['valores_y'] * DOMINIOS[parametro_y]['escala'],
+        mapa['valores_x'] * DOMINIOS[parametro_x]['escala'],
+        indexing='ij'
+    )
+    celulas = pd.DataFrame({
+        'x': np.round(grade_x.ravel(), 4),
+        'y': np.round(grade_y.ravel(), 4),
+        'Vencedora': np.array(sensibilidade.NOMES_ESTRATEGIAS)[mapa['vencedora'].ravel()],
+        'Margem (R$)': mapa['margem'].ravel(),
+        'Margem (%)': mapa['margem_relativa'].ravel() * 100,
+    })
+    # Células em que a vencedora termina com patrimônio zero não têm margem relativa
+    celulas['Margem Relativa'] = [f"{valor:.2f}%" if np.isfinite(valor) else "indefinida"
+                                  for valor in celulas['Margem (%)']]
+    
+    grafico = alt.Chart(celulas).mark_rect().encode(
+        x=alt.X('x:O', title=DOMINIOS[parametro_x]['rotulo'], axis=alt.Axis(labelOverlap=True)),
+        y=alt.Y('y:O', title=DOMINIOS[parametro_y]['rotulo'], sort='descending',
+                axis=alt.Axis(labelOverlap=True)),
+        color=alt.Color('Vencedora:N', scale=alt.Scale(domain=list(sensibilidade.NOMES_ESTRATEGIAS))),
+        opacity=alt.condition(
+            'isValid(datum["Margem (%)"]) && isFinite(datum["Margem (%)"])',
+            alt.Opacity('Margem (%):Q', scale=alt.Scale(domain=[0, 50], clamp=True, range=[0.25, 1])),
+            alt.value(0.25)
+        ),
+        tooltip=['x', 'y', 'Vencedora',
+                 alt.Tooltip('Margem (R$):Q', format=',.2f'),
+                 'Margem Relativa']
+    )
+    
+    st.altair_chart(grafico, use_container_width=True)
+
+
+@st.fragment
+def secao_monte_carlo():
+    """Quantis do patrimônio com valorização e rendimentos aleatórios."""
+    simulador = st.session_state['simulador']
+    
+    # Desligada por padrão: simular milhares de cenários a cada mudança na
+    # barra lateral atrasaria todas as reexecuções da página
+    if not st.toggle("Simular cenários aleatórios"):
+        return
+    
+    import estocastico
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        caminhos = st.selectbox("Número de Cenários:", [2000, 5000, 20000, 50000], index=1)
+    
+    with col2:
+        volatilidade_imovel = st.slider(
+            "Volatilidade Anual do Imóvel (%)",
+            min_value=0.0,
+            max_value=30.0,
+            value=estocastico.VOLATILIDADE_IMOVEL * 100,
+            step=1.0
+        ) / 100
+    
+    with col3:
+        volatilidade_investimento = st.slider(
+            "Volatilidade Anual dos Investimentos (%)",
+            min_value=0.0,
+            max_value=30.0,
+            value=estocastico.VOLATILIDADE_INVESTIMENTO * 100,
+            step=1.0
+        ) / 100
+    
+    # Trocar a opção exibida não refaz a simulação
+    chave = (tuple(simulador.obter_parametros().items()), simulador.prazo_simulacao,
+             simulador.investimento_inicial_financiada, caminhos,
+             volatilidade_imovel, volatilidade_investimento)
+    anterior = st.session_state.get('monte_carlo')
+    if anterior is None or anterior[0] != chave:
+        resultado = estocastico.simular_monte_carlo(
+            simulador,
+            caminhos=caminhos,
+            volatilidade_imovel=volatilidade_imovel,
+            volatilidade_investimento=volatilidade_investimento,
+            amostragem='sobol',
+            controle=True
+        )
+        st.session_state['monte_carlo'] = (chave, resultado)
+    else:
+        resultado = anterior[1]
+    
+    import pandas as pd
+    
+    nomes = {'aluguel': "Aluguel", 'compra_vista': "Compra à Vista",
+             'compra_financiada': "Compra Financiada"}
+    rotulos = [f"P{probabilidade * 100:.0f}" for probabilidade in resultado['probabilidades']]
+    finais = pd.DataFrame(
+        [resultado['quantis'][estrategia][:, -1] for estrategia in nomes],
+        index=list(nomes.values()),
+        columns=rotulos
+    )
+    finais['Chance de Maior Patrimônio'] = [
+        formatar_percentual(resultado['probabilidade_vitoria'][estrategia]) for estrategia in nomes]
+    
+    st.subheader("Patrimônio Final por Percentil")
+    st.dataframe(finais.style.format(formatar_moeda, subset=rotulos))
+    
+    opcao = st.radio("Opção exibida no gráfico:", list(nomes.values()), horizontal=True)
+    estrategia = next(codigo for codigo, nome in nomes.items() if nome == opcao)
+    anos = resultado['Mês'] / 12
+    quantis = resultado['quantis'][estrategia]
+    series = {rotulo: (anos, quantis[indice]) for indice, rotulo in enumerate(rotulos)
+              if rotulo in ('P5', 'P50', 'P95')}
+    exibir_grafico(series, f"Faixa de Patrimônio: {opcao}", "Patrimônio Total",
+                   st.session_state['modo_grafico'])
+
+
+def perfil_solicitado():
+    """Indica se esta execução deve ser medida pelo módulo ``perfil``."""
+    import os
     
-    7. **Liquidez patrimonial**: Imóveis têm baixa liquidez comparados a investimentos financeiros.
+    return os.environ.get('SIMULADOR_PERFIL') == '1' or 'perfil' in st.query_params
+
+
+def main(classe_simulador=SimuladorImovel):
+    """Monta a página do simulador usando a classe de simulação informada.
+    
+    Com ``?perfil`` no endereço ou ``SIMULADOR_PERFIL=1`` no ambiente, a
+    execução é medida e gravada em disco (ver ``perfil``).
+    """
+    if not perfil_solicitado():
+        montar_pagina(classe_simulador)
+        return
+    
+    import perfil
+    
+    with perfil.Captura() as captura:
+        montar_pagina(classe_simulador)
+    
+    simulador = st.session_state.get('simulador')
+    parametros = dict(simulador.obter_parametros(), prazo_simulacao=simulador.prazo_simulacao,
+                      classe=type(simulador).__name__) if simulador else {}
+    prefixo = captura.salvar(parametros)
+    # O parâmetro do endereço vale para uma única execução
+    st.query_params.pop('perfil', None)
+    st.caption(f"Perfil desta execução gravado em {prefixo}.*")
+
+
+def montar_pagina(classe_simulador):
+    """Monta a página do simulador usando a classe de simulação informada."""
+    # Configuração da página
+    st.set_page_config(
+        page_title="Simulador de Opções Imobiliárias",
+        page_icon="🏠",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Título principal
+    st.title("🏠 Simulador de Opções Imobiliárias")
+
+    st.markdown("""
+    Este simulador compara três alternativas para aquisição de imóvel:
+    1. **Aluguel**: Alugar o imóvel e investir o valor equivalente à compra
+    2. **Compra à Vista**: Adquirir o imóvel com pagamento integral
+    3. **Compra Financiada**: Adquirir o imóvel com entrada parcial e financiamento
     """)
 
-# Rodapé
-st.markdown("---")
-st.markdown("Simulador de Opções Imobiliárias | Desenvolvido por Manus AI | 2025")
+    # Criar abas
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Simulador", "Resultados Detalhados", "Riscos e Benefícios",
+                                                  "Otimização do Financiamento", "Mapa de Sensibilidade",
+                                                  "Cenários Aleatórios"])
+
+    with tab1:
+        # Sidebar para parâmetros de entrada
+        st.sidebar.header("Parâmetros da Simulação")
+        
+        # Criar instância do simulador
+        simulador = classe_simulador()
+        
+        # Parâmetros do imóvel
+        st.sidebar.subheader("Imóvel")
+        valor_imovel = controle_parametro(simulador, 'valor_imovel', numerico=True)
+        percentual_aluguel = controle_parametro(simulador, 'percentual_aluguel')
+        taxa_valorizacao_imovel = controle_parametro(simulador, 'taxa_valorizacao_imovel')
+        
+        # Parâmetros financeiros
+        st.sidebar.subheader("Investimentos")
+        taxa_juros_investimento = controle_parametro(simulador, 'taxa_juros_investimento')
+        
+        # Parâmetros do financiamento
+        st.sidebar.subheader("Financiamento")
+        percentual_financiamento = controle_parametro(simulador, 'percentual_financiamento')
+        taxa_juros_financiamento = controle_parametro(simulador, 'taxa_juros_financiamento')
+        prazo_financiamento = controle_parametro(simulador, 'prazo_financiamento')
+        
+        # Parâmetros da simulação
+        st.sidebar.subheader("Simulação")
+        prazo_simulacao = controle_parametro(simulador, 'prazo_simulacao')
+        
+        # Custos do proprietário e impostos
+        st.sidebar.subheader("Custos e Impostos")
+        taxa_iptu = controle_parametro(simulador, 'taxa_iptu')
+        taxa_manutencao = controle_parametro(simulador, 'taxa_manutencao')
+        percentual_condominio = controle_parametro(
+            simulador, 'percentual_condominio',
+            help="Pago por quem mora no imóvel, em todas as opções."
+        )
+        percentual_custos_aquisicao = controle_parametro(simulador, 'percentual_custos_aquisicao')
+        aliquota_ir = controle_parametro(
+            simulador, 'aliquota_ir',
+            help="Aplicado mês a mês sobre o rendimento dos investimentos."
+        )
+        
+        # Parâmetros de exibição
+        st.sidebar.subheader("Exibição")
+        modo_grafico = st.sidebar.radio(
+            "Gráficos",
+            MODOS_GRAFICO,
+            key='modo_grafico',
+            help="O modo interativo é desenhado no navegador e permite ver os valores exatos."
+        )
+        
+        # Atualizar parâmetros do simulador
+        simulador.definir_parametros(
+            valor_imovel=valor_imovel,
+            percentual_aluguel=percentual_aluguel,
+            taxa_juros_investimento=taxa_juros_investimento,
+            taxa_juros_financiamento=taxa_juros_financiamento,
+            taxa_valorizacao_imovel=taxa_valorizacao_imovel,
+            percentual_financiamento=percentual_financiamento,
+            prazo_financiamento=prazo_financiamento,
+            prazo_simulacao=prazo_simulacao,
+            taxa_iptu=taxa_iptu,
+            taxa_manutencao=taxa_manutencao,
+            percentual_condominio=percentual_condominio,
+            percentual_custos_aquisicao=percentual_custos_aquisicao,
+            aliquota_ir=aliquota_ir
+        )
+
+        # Reaproveitar os meses calculados na execução anterior: se só o prazo
+        # mudou, apenas os meses novos são simulados (ou os já calculados recortados)
+        anterior = st.session_state.get('simulador')
+        if anterior is not None:
+            simulador.horizontes = anterior.horizontes
+
+        # Exibir resumo dos parâmetros
+        st.subheader("Resumo dos Parâmetros")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Valor do Imóvel", formatar_moeda(valor_imovel))
+            st.metric("Aluguel Mensal", formatar_moeda(valor_imovel * percentual_aluguel))
+        
+        with col2:
+            st.metric("Rendimento Investimentos", formatar_percentual(taxa_juros_investimento))
+            st.metric("Valorização do Imóvel", formatar_percentual(taxa_valorizacao_imovel))
+        
+        with col3:
+            st.metric("Valor Financiado", formatar_moeda(valor_imovel * percentual_financiamento))
+            st.metric("Juros do Financiamento", formatar_percentual(taxa_juros_financiamento))
+        
+        # Exibir gráfico de evolução patrimonial
+        st.subheader("Evolução Patrimonial")
+        espaco_grafico = st.empty()
+        
+        # Consultar o cubo pré-calculado (ferramentas.construir_cubo); simular
+        # apenas se ele não existir ou se os parâmetros estiverem fora da grade,
+        # mostrando o gráfico parcial enquanto a simulação avança
+        import cubo
+        
+        resultados = cubo.resultados_simulador(simulador)
+        if resultados is None:
+            resultados = simular_progressivamente(simulador, espaco_grafico)
+        simulador.resultados = resultados
+        
+        # Guardar para os fragmentos, que não reexecutam este trecho
+        st.session_state['simulador'] = simulador
+        st.session_state['resultados'] = resultados
+        
+        marcos = montar_marcos_cruzamento(resultados)
+        with espaco_grafico.container():
+            exibir_grafico(montar_series_patrimonio(resultados), 'Comparação da Evolução Patrimonial',
+                           'Patrimônio Total', modo_grafico, marcos)
+        
+        if marcos:
+            st.caption("Cruzamentos: " + "; ".join(
+                f"{texto} no ano {anos:g}".replace('.', ',') for anos, texto in marcos))
+        
+        # Exibir tabela comparativa
+        st.subheader("Comparação dos Resultados")
+        
+        # Extrair resultados finais
+        resultado_aluguel = resultados['aluguel'].iloc[-1]
+        resultado_compra_vista = resultados['compra_vista'].iloc[-1]
+        resultado_compra_financiada = resultados['compra_financiada'].iloc[-1]
+        
+        # Fluxos de caixa de cada opção, para a TIR e o VPL
+        import rentabilidade
+        
+        parametros = simulador.obter_parametros()
+        taxa_desconto = st.number_input(
+            "Taxa de desconto do VPL (% a.a.)",
+            value=float(rentabilidade.taxa_desconto_padrao(parametros)[0]) * 100,
+            step=0.5,
+            format="%.2f",
+            help="Padrão: rendimento dos investimentos, líquido de IR."
+        ) / 100
+        rentabilidades = rentabilidade.avaliar_lote(parametros, prazo_simulacao, taxa_desconto,
+                                                    simulador.investimento_inicial_financiada)
+        taxas_retorno = {estrategia: valores['tir'][0] for estrategia, valores in rentabilidades.items()}
+        valores_presentes = {estrategia: valores['vpl'][0] for estrategia, valores in rentabilidades.items()}
+        
+        # Criar DataFrame comparativo
+        import pandas as pd
+        
+        import relatorios
+        
+        comparacao = pd.DataFrame(relatorios.tabela_comparacao(
+            {'aluguel': resultado_aluguel, 'compra_vista': resultado_compra_vista,
+             'compra_financiada': resultado_compra_financiada},
+            valor_imovel, taxas_retorno, valores_presentes
+        ))
+        
+        st.table(comparacao)
+        
+        # Conclusão
+        st.subheader("Conclusão")
+        
+        # Determinar a melhor opção com base no patrimônio final
+        patrimonio_aluguel = resultado_aluguel['Patrimônio']
+        patrimonio_compra_vista = resultado_compra_vista['Patrimônio']
+        patrimonio_compra_financiada = resultado_compra_financiada['Patrimônio']
+        
+        patrimonios = {
+            "Aluguel": patrimonio_aluguel,
+            "Compra à Vista": patrimonio_compra_vista,
+            "Compra Financiada": patrimonio_compra_financiada
+        }
+        
+        melhor_opcao = max(patrimonios, key=patrimonios.get)
+        
+        st.markdown(f"""
+        Com base nos parâmetros informados, a opção com maior patrimônio final após {prazo_simulacao} anos é:
+        
+        ### {melhor_opcao}
+        
+        Com um patrimônio final de {formatar_moeda(patrimonios[melhor_opcao])}.
+        
+        > **Nota:** Esta conclusão considera apenas o aspecto financeiro. Fatores pessoais como segurança, flexibilidade e preferências individuais também devem ser considerados na decisão final.
+        """)
+
+    with tab2:
+        st.header("Resultados Detalhados")
+        
+        secao_detalhes()
+        
+        secao_graficos_adicionais()
+
+    with tab3:
+        st.header("Análise de Riscos e Benefícios")
+        
+        secao_riscos_beneficios()
+        
+        # Considerações adicionais
+        st.subheader("Considerações Adicionais")
+        
+        st.markdown("""
+        ### Fatores que podem influenciar a decisão:
+        
+        1. **Estabilidade financeira**: A compra financiada requer estabilidade de renda a longo prazo.
+        
+        2. **Planos futuros**: Se há possibilidade de mudança de cidade ou país nos próximos anos, o aluguel oferece mais flexibilidade.
+        
+        3. **Mercado imobiliário local**: Em algumas regiões, o mercado pode estar supervalorizado, tornando o aluguel mais vantajoso no curto prazo.
+        
+        4. **Taxas de juros**: Mudanças nas taxas de juros podem afetar tanto o financiamento quanto o rendimento dos investimentos.
+        
+        5. **Aspectos emocionais**: O sentimento de propriedade e segurança que um imóvel próprio proporciona não pode ser quantificado financeiramente.
+        
+        6. **Custos adicionais**: Impostos, manutenção, condomínio e reformas são custos que proprietários precisam considerar.
+        
+        7. **Liquidez patrimonial**: Imóveis têm baixa liquidez comparados a investimentos financeiros.
+        """)
+
+    with tab4:
+        st.header("Otimização do Financiamento")
+        
+        st.markdown("""
+        Mantendo os demais parâmetros, avalia todas as combinações de percentual
+        financiado (10% a 90%) e prazo (5 a 35 anos) e indica a que resulta no
+        maior patrimônio final da compra financiada.
+        """)
+        
+        secao_otimizacao()
+        
+        st.subheader("Quitação Antecipada")
+        
+        st.markdown("""
+        Compara políticas de amortização extraordinária: um aporte anual retirado
+        dos investimentos ou o uso de tudo o que passar de uma reserva mínima,
+        reduzindo o prazo ou o valor das prestações seguintes.
+        """)
+        
+        secao_quitacao_antecipada()
+
+    with tab5:
+        st.header("Mapa de Sensibilidade")
+        
+        st.markdown("""
+        Escolha dois parâmetros para ver, em toda a faixa dos controles, qual opção
+        tem o maior patrimônio final e com que folga. Os demais parâmetros ficam
+        fixos nos valores da barra lateral. Células mais claras indicam vitórias
+        por margem pequena, em que a conclusão é mais frágil.
+        """)
+        
+        secao_mapa_sensibilidade()
+
+    with tab6:
+        st.header("Cenários Aleatórios")
+        
+        st.markdown("""
+        A valorização do imóvel e o rendimento dos investimentos variam mês a mês,
+        com as taxas da barra lateral como médias e as volatilidades escolhidas.
+        A tabela mostra percentis do patrimônio final de cada opção e a chance de
+        cada uma terminar com o maior patrimônio; o gráfico mostra a faixa entre
+        os percentis 5 e 95 ao longo do tempo.
+        """)
+        
+        secao_monte_carlo()
+
+    # Rodapé
+    st.markdown("---")
+    st.markdown("Simulador de Opções Imobiliárias | Desenvolvido por Manus AI | 2025")
+
+
+if __name__ == "__main__":
+    main()
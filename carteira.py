@@ -0,0 +1,126 @@
+"""Modo carteira: decide e agrega muitas propriedades com memória O(meses).
+
+Cada propriedade tem seus próprios parâmetros (valor do imóvel, percentual do
+aluguel, condições do financiamento...). As propriedades são lidas de um
+iterável em blocos; cada bloco é simulado com ``motor.simular_lote``, a opção
+de maior patrimônio final é escolhida por propriedade e as séries mensais são
+somadas em acumuladores. Nenhuma série por propriedade sobrevive ao bloco, de
+modo que a memória depende do número de meses e do tamanho do bloco, não do
+tamanho da carteira. Os valores por propriedade (escolha, patrimônios finais e
+meses de ultrapassagem entre as opções) podem ser repassados bloco a bloco a
+quem chamou, por exemplo para gravá-los em um CSV.
+"""
+
+import csv
+import itertools
+
+import numpy as np
+
+import cruzamentos
+import motor
+
+# Colunas agregadas mês a mês em toda a carteira
+COLUNAS_AGREGADAS = ('Patrimônio', 'Prestação', 'Juros Pagos', 'Aluguel Mensal')
+
+
+def ler_carteira_csv(caminho, padroes=None):
+    """Lê uma carteira de um CSV, uma propriedade por linha, sem carregá-la inteira.
+
+    As colunas devem ter os nomes de ``motor.PARAMETROS`` e
+    ``motor.PARAMETROS_CUSTOS``; colunas ausentes ou vazias usam ``padroes``
+    (por exemplo, ``SimuladorImovel().obter_parametros()``).
+    """
+    padroes = padroes or {}
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            propriedade = dict(padroes)
+            for nome in motor.PARAMETROS + motor.PARAMETROS_CUSTOS:
+                if linha.get(nome) not in (None, ''):
+                    propriedade[nome] = float(linha[nome])
+            yield propriedade
+
+
+def _blocos(propriedades, tamanho_bloco):
+    """Agrupa o iterável de propriedades em dicionários de arrays por bloco."""
+    iterador = iter(propriedades)
+    while True:
+        bloco = list(itertools.islice(iterador, tamanho_bloco))
+        if not bloco:
+            return
+        yield {nome: np.array([propriedade.get(nome, 0.0) for propriedade in bloco], dtype=float)
+               for nome in motor.PARAMETROS + motor.PARAMETROS_CUSTOS}
+
+
+def simular_carteira(propriedades, prazo_simulacao, investimento_inicial='entrada',
+                     tamanho_bloco=256, por_propriedade=None):
+    """Decide aluguel, compra à vista ou financiada por propriedade e agrega a carteira.
+
+    Args:
+        propriedades: iterável (pode ser um gerador) de dicionários com os
+            parâmetros de ``motor.PARAMETROS`` e, opcionalmente, os de
+            ``motor.PARAMETROS_CUSTOS`` (ausentes valem zero).
+        prazo_simulacao: horizonte comum, em anos.
+        investimento_inicial: capital inicial da compra financiada, como em
+            ``motor.calcular_compra_financiada_lote``.
+        tamanho_bloco: propriedades simuladas por vez.
+        por_propriedade: função opcional chamada a cada bloco com um
+            dicionário de arrays, uma posição por propriedade: a
+            ``'Estratégia'`` escolhida, o patrimônio final de cada opção e o
+            mês em que a primeira opção de cada par de ``cruzamentos.PARES``
+            ultrapassa a segunda e em que cada opção passa à frente das
+            outras duas, pela primeira vez (``NaN`` se não acontece).
+            Permite gravar o resultado por propriedade sem guardá-lo em
+            memória.
+
+    Returns:
+        Dicionário com ``'Mês'`` e as somas mensais de ``COLUNAS_AGREGADAS``
+        para as opções escolhidas (``'Prestação'`` e ``'Juros Pagos'`` vêm das
+        propriedades financiadas, ``'Aluguel Mensal'`` das alugadas), a
+        ``'Patrimônio por Estratégia'`` (soma do patrimônio se todas as
+        propriedades seguissem cada opção), as ``decisoes`` por estratégia e
+        o total de ``propriedades``.
+    """
+    meses = int(round(prazo_simulacao * 12))
+    agregado = {coluna: np.zeros(meses + 1) for coluna in COLUNAS_AGREGADAS}
+    por_estrategia = {estrategia: np.zeros(meses + 1) for estrategia in motor.ESTRATEGIAS}
+    decisoes = dict.fromkeys(motor.ESTRATEGIAS, 0)
+    total = 0
+
+    for bloco in _blocos(propriedades, tamanho_bloco):
+        resultado = motor.simular_lote(bloco, prazo_simulacao, investimento_inicial)
+
+        patrimonios = np.stack([resultado[estrategia]['Patrimônio']
+                                for estrategia in motor.ESTRATEGIAS])
+        escolha = np.argmax(patrimonios[:, :, -1], axis=0)
+        linhas = np.arange(len(escolha))
+
+        agregado['Patrimônio'] += patrimonios[escolha, linhas].sum(axis=0)
+        for indice, estrategia in enumerate(motor.ESTRATEGIAS):
+            por_estrategia[estrategia] += patrimonios[indice].sum(axis=0)
+            decisoes[estrategia] += int(np.count_nonzero(escolha == indice))
+
+        financiadas = escolha == motor.ESTRATEGIAS.index('compra_financiada')
+        alugadas = escolha == motor.ESTRATEGIAS.index('aluguel')
+        agregado['Prestação'] += resultado['compra_financiada']['Prestação'][financiadas].sum(axis=0)
+        agregado['Juros Pagos'] += resultado['compra_financiada']['Juros Pagos'][financiadas].sum(axis=0)
+        agregado['Aluguel Mensal'] += resultado['aluguel']['Aluguel Mensal'][alugadas].sum(axis=0)
+        total += len(escolha)
+
+        if por_propriedade is not None:
+            linhas = {'Estratégia': np.array(motor.ESTRATEGIAS)[escolha]}
+            for indice, estrategia in enumerate(motor.ESTRATEGIAS):
+                linhas[f'Patrimônio Final ({estrategia})'] = patrimonios[indice, :, -1]
+            analise = cruzamentos.analisar(resultado)
+            for a, b in cruzamentos.PARES:
+                linhas[f'Mês {a} passa {b}'] = analise[(a, b)]['ultrapassagem']
+            for estrategia, mes in analise['lideranca'].items():
+                linhas[f'Mês {estrategia} assume a liderança'] = mes
+            por_propriedade(linhas)
+
+    return {
+        'Mês': np.arange(meses + 1, dtype=float),
+        **agregado,
+        'Patrimônio por Estratégia': por_estrategia,
+        'decisoes': decisoes,
+        'propriedades': total,
+    }
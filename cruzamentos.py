@@ -0,0 +1,114 @@
+"""Meses em que uma estratégia ultrapassa outra.
+
+Além de saber quem termina à frente, interessa saber quando a compra
+financiada passa o aluguel ou quando a compra à vista passa as outras duas.
+Para um lote de ``motor.simular_lote``, as séries de ``'Patrimônio'`` de cada
+par de estratégias são comparadas mês a mês em todos os cenários de uma vez:
+o sinal da diferença é propagado sobre os empates (uma série que encosta na
+outra e volta não conta como cruzamento, e diferenças de arredondamento
+contam como empate) e cada troca de sinal marca um cruzamento no mês em que
+a nova líder fica estritamente à frente.
+
+Os meses devolvidos são posições nas séries: nos lotes do motor, que têm
+uma coluna por mês, coincidem com o mês da simulação; em séries amostradas
+(como as tabelas anuais de ``executar_simulacao``), a coluna ``'Mês'`` dá o
+mês de cada posição. ``NaN`` indica que o cruzamento não acontece no
+horizonte.
+"""
+
+import numpy as np
+
+import motor
+
+# Pares comparados: (estratégia que ultrapassa, estratégia ultrapassada)
+PARES = (
+    ('compra_financiada', 'aluguel'),
+    ('compra_vista', 'aluguel'),
+    ('compra_vista', 'compra_financiada'),
+)
+
+# Diferença relativa abaixo da qual duas séries são consideradas empatadas:
+# opções matematicamente equivalentes diferem apenas por arredondamento
+TOLERANCIA_EMPATE = 1e-9
+
+
+def _sinais_propagados(a, b):
+    """Sinal de ``a - b`` em cada mês, repetindo o último sinal não nulo nos empates."""
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    diferenca = a - b
+    empate = np.abs(diferenca) <= TOLERANCIA_EMPATE * np.maximum(np.abs(a), np.abs(b))
+    sinais = np.where(empate, 0.0, np.sign(diferenca))
+    colunas = np.arange(sinais.shape[-1])
+    ultimo_nao_nulo = np.maximum.accumulate(np.where(sinais != 0, colunas, 0), axis=-1)
+    return np.take_along_axis(sinais, ultimo_nao_nulo, axis=-1)
+
+
+def sinais_cruzamento(patrimonio_a, patrimonio_b):
+    """Cruzamentos entre duas séries, formato (cenários, meses + 1), int8.
+
+    Vale +1 no mês em que ``a`` passa à frente de ``b``, -1 no mês em que
+    ``b`` passa à frente de ``a`` e 0 nos demais. A separação inicial de
+    séries que começam empatadas não é um cruzamento.
+    """
+    sinais = _sinais_propagados(patrimonio_a, patrimonio_b)
+    cruzamentos = np.zeros(sinais.shape, dtype=np.int8)
+    trocas = (sinais[..., 1:] != sinais[..., :-1]) & (sinais[..., :-1] != 0)
+    cruzamentos[..., 1:] = np.where(trocas, sinais[..., 1:], 0)
+    return cruzamentos
+
+
+def primeiro_mes(cruzamentos, direcao=None):
+    """Primeiro mês com cruzamento (na ``direcao`` +1 ou -1, se informada) por cenário."""
+    marcados = cruzamentos != 0 if direcao is None else cruzamentos == direcao
+    return np.where(marcados.any(axis=-1), np.argmax(marcados, axis=-1), np.nan)
+
+
+def meses_cruzamento(cruzamentos):
+    """Todos os meses com cruzamento, uma lista de arrays por cenário."""
+    cenarios, meses = np.nonzero(np.atleast_2d(cruzamentos))
+    return np.split(meses, np.searchsorted(cenarios, np.arange(1, len(np.atleast_2d(cruzamentos)))))
+
+
+def mes_lideranca(patrimonios, estrategia):
+    """Primeiro mês em que ``estrategia`` passa à frente de todas as outras.
+
+    ``patrimonios`` mapeia cada estratégia para a série (cenários, meses +
+    1). Conta apenas a passagem de uma posição atrás de alguma outra para a
+    liderança isolada; liderar desde a separação inicial não é ultrapassagem.
+    """
+    propria = np.asarray(patrimonios[estrategia])
+    outras = [np.asarray(serie) for nome, serie in patrimonios.items() if nome != estrategia]
+    sinais = [_sinais_propagados(propria, outra) for outra in outras]
+    lidera = np.logical_and.reduce([sinal > 0 for sinal in sinais])
+    atras = np.logical_or.reduce([sinal < 0 for sinal in sinais])
+
+    ja_esteve_atras = np.zeros_like(atras)
+    ja_esteve_atras[..., 1:] = np.logical_or.accumulate(atras, axis=-1)[..., :-1]
+    ultrapassa = lidera & ja_esteve_atras
+    return np.where(ultrapassa.any(axis=-1), np.argmax(ultrapassa, axis=-1), np.nan)
+
+
+def analisar(resultados):
+    """Cruzamentos de todos os pares de ``PARES`` em um resultado de ``simular_lote``.
+
+    Returns:
+        Dicionário ``{(a, b): {...}}`` com os ``'sinais'`` de
+        ``sinais_cruzamento``, a ``'ultrapassagem'`` (primeiro mês em que
+        ``a`` passa ``b``), o ``'primeiro'`` cruzamento em qualquer direção e
+        a ``'quantidade'`` de cruzamentos por cenário; e, na chave
+        ``'lideranca'``, o ``mes_lideranca`` de cada estratégia.
+    """
+    patrimonios = {estrategia: np.atleast_2d(resultados[estrategia]['Patrimônio'])
+                   for estrategia in motor.ESTRATEGIAS}
+    analise = {}
+    for a, b in PARES:
+        sinais = sinais_cruzamento(patrimonios[a], patrimonios[b])
+        analise[(a, b)] = {
+            'sinais': sinais,
+            'ultrapassagem': primeiro_mes(sinais, 1),
+            'primeiro': primeiro_mes(sinais),
+            'quantidade': np.count_nonzero(sinais, axis=-1),
+        }
+    analise['lideranca'] = {estrategia: mes_lideranca(patrimonios, estrategia)
+                            for estrategia in motor.ESTRATEGIAS}
+    return analise
@@ -0,0 +1,228 @@
+"""Cubo de respostas pré-calculado sobre o domínio dos controles da interface.
+
+Todos os controles da barra lateral são discretos, e as três opções se
+fatoram em tabelas pequenas:
+
+* o valor do imóvel é apenas um fator de escala;
+* o percentual do aluguel multiplica uma soma que depende só de
+  (valorização, rendimento, mês);
+* as prestações SAC são lineares em ``k`` (mês da prestação), de modo que o
+  valor presente das prestações depende só de (rendimento, mês) por meio de
+  duas somas descontadas, combinadas com percentual, taxa e prazo do
+  financiamento no momento da consulta.
+
+O cubo cobre o modelo sem custos de propriedade nem impostos; cenários com
+esses parâmetros são tratados como fora da grade.
+
+``ferramentas.construir_cubo`` grava essas tabelas em disco a cada
+``passo_meses`` (1 por padrão: todos os meses, como a simulação; 12 guarda
+só valores anuais e finais). ``consultar`` responde a partir delas em
+microssegundos e devolve ``None`` quando os parâmetros estão fora da grade,
+para que o chamador recorra à simulação. A interface só usa cubos mensais
+(ver ``resultados_simulador``).
+"""
+
+import os
+
+import numpy as np
+
+import motor
+
+CAMINHO_CUBO = os.environ.get(
+    'SIMULADOR_CUBO',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cubo_respostas.npz')
+)
+
+# Mesmos valores permitidos pelos controles da barra lateral
+TAXAS_VALORIZACAO = np.arange(0, 31) * 0.5 / 100
+TAXAS_INVESTIMENTO = np.arange(0, 31) * 0.5 / 100
+PRAZO_MAXIMO = 50
+
+_TOLERANCIA_GRADE = 1e-9
+
+_cubo = None
+
+
+def construir(passo_meses=1, prazo_maximo=PRAZO_MAXIMO):
+    """Calcula as tabelas do cubo mês a mês e guarda um ponto a cada ``passo_meses``.
+
+    As somas são acumuladas na mesma ordem da recorrência mensal do
+    simulador. Retorna um dicionário de arrays pronto para ``salvar``.
+    """
+    meses = np.arange(prazo_maximo * 12 + 1)
+    crescimento_imovel = (1 + motor.taxa_mensal(TAXAS_VALORIZACAO)[:, None]) ** meses
+    crescimento_investimento = (1 + motor.taxa_mensal(TAXAS_INVESTIMENTO)[:, None]) ** meses
+    desconto = 1 / crescimento_investimento
+
+    def acumular(termos):
+        termos = termos.copy()
+        termos[..., 0] = 0
+        return np.cumsum(termos, axis=-1)
+
+    pontos = meses[::passo_meses]
+    return {
+        'passo_meses': np.array(passo_meses),
+        'meses': pontos,
+        'taxas_valorizacao': TAXAS_VALORIZACAO,
+        'taxas_investimento': TAXAS_INVESTIMENTO,
+        'crescimento_imovel': crescimento_imovel[:, pontos],
+        'crescimento_investimento': crescimento_investimento[:, pontos],
+        # Soma de ((1 + g) / (1 + r))^k: aluguel descontado por unidade de valor e de percentual
+        'aluguel_descontado': acumular(
+            crescimento_imovel[:, None, :] * desconto[None, :, :])[:, :, pontos],
+        # Soma de (1 + g)^k: aluguel acumulado por unidade de valor e de percentual
+        'aluguel_acumulado': acumular(crescimento_imovel)[:, pontos],
+        # Somas de v^k e de (k - 1) v^k, com v = 1 / (1 + r), para as prestações SAC
+        'desconto_0': acumular(desconto)[:, pontos],
+        'desconto_1': acumular(desconto * (meses - 1))[:, pontos],
+    }
+
+
+def salvar(tabelas, caminho=CAMINHO_CUBO):
+    """Grava as tabelas do cubo em um arquivo .npz compactado."""
+    np.savez_compressed(caminho, **tabelas)
+
+
+def carregar(caminho=CAMINHO_CUBO):
+    """Carrega o cubo do disco uma única vez por processo; ``None`` se não existir."""
+    global _cubo
+    if _cubo is None and os.path.exists(caminho):
+        with np.load(caminho) as arquivo:
+            _cubo = {nome: arquivo[nome] for nome in arquivo.files}
+    return _cubo
+
+
+def _indice_grade(valores, grade):
+    """Índices de ``valores`` em ``grade`` ou ``None`` se algum estiver fora dela."""
+    passo = grade[1] - grade[0]
+    indices = np.rint((valores - grade[0]) / passo).astype(int)
+    if np.any(indices < 0) or np.any(indices >= len(grade)):
+        return None
+    if np.any(np.abs(grade[indices] - valores) > _TOLERANCIA_GRADE):
+        return None
+    return indices
+
+
+def consultar(parametros, prazo_simulacao, investimento_inicial='entrada', cubo=None):
+    """Responde a um lote de cenários a partir do cubo.
+
+    Recebe os mesmos argumentos de ``motor.simular_lote`` e devolve as mesmas
+    colunas, mas apenas nos meses guardados no cubo (a cada ``passo_meses``,
+    terminando no último mês da simulação). Retorna ``None`` se o cubo não
+    existir ou se algum cenário estiver fora da grade.
+    """
+    cubo = cubo if cubo is not None else carregar()
+    if cubo is None:
+        return None
+
+    passo = int(cubo['passo_meses'])
+    meses_totais = int(round(prazo_simulacao * 12))
+    if meses_totais % passo or meses_totais > cubo['meses'][-1]:
+        return None
+
+    p = motor.preparar_parametros(parametros)
+    if any(np.any(p[nome]) for nome in motor.PARAMETROS_CUSTOS):
+        return None  # o cubo cobre apenas o modelo sem custos e impostos
+    meses_financiamento = np.round(p['prazo_financiamento'] * 12)
+    if np.any(meses_financiamento % passo) or np.any(meses_financiamento <= 0):
+        return None
+
+    ig = _indice_grade(p['taxa_valorizacao_imovel'][:, 0], cubo['taxas_valorizacao'])
+    ir = _indice_grade(p['taxa_juros_investimento'][:, 0], cubo['taxas_investimento'])
+    if ig is None or ir is None:
+        return None
+
+    colunas = np.arange(meses_totais // passo + 1)
+    mes = cubo['meses'][colunas].astype(float)
+    ig, ir = ig[:, None], ir[:, None]
+
+    valor = p['valor_imovel']
+    valor_imovel = valor * cubo['crescimento_imovel'][ig, colunas]
+    crescimento = cubo['crescimento_investimento'][ir, colunas]
+
+    # Aluguel
+    percentual_aluguel = p['percentual_aluguel']
+    investimento_aluguel = valor * crescimento * (
+        1 - percentual_aluguel * cubo['aluguel_descontado'][ig, ir, colunas])
+    investimento_aluguel[:, 0] = valor[:, 0]
+    aluguel = {
+        'Mês': np.broadcast_to(mes, valor_imovel.shape),
+        'Patrimônio': investimento_aluguel,
+        'Investimento': investimento_aluguel,
+        'Aluguel Mensal': valor_imovel * percentual_aluguel,
+        'Aluguel Acumulado': valor * percentual_aluguel * cubo['aluguel_acumulado'][ig, colunas],
+        'Custos Mensais': np.zeros_like(valor_imovel),
+        'Valor Imóvel': valor_imovel,
+    }
+
+    # Compra à vista
+    compra_vista = {
+        'Mês': np.broadcast_to(mes, valor_imovel.shape),
+        'Patrimônio': valor_imovel,
+        'Valor Imóvel': valor_imovel,
+        'Investimento': np.zeros_like(valor_imovel),
+        'Custos Mensais': np.zeros_like(valor_imovel),
+    }
+
+    # Compra financiada
+    valor_financiado = valor * p['percentual_financiamento']
+    amortizacao = valor_financiado / meses_financiamento
+    juros_mensal = motor.taxa_mensal(p['taxa_juros_financiamento'])
+    em_financiamento = (mes >= 1) & (mes <= meses_financiamento)
+    meses_pagos = np.minimum(mes, meses_financiamento)
+    coluna_paga = (meses_pagos // passo).astype(int)
+
+    saldo_devedor = np.where(mes < meses_financiamento, valor_financiado - amortizacao * mes, 0.0)
+    juros = np.where(em_financiamento,
+                     (valor_financiado - amortizacao * (mes - 1)) * juros_mensal, 0.0)
+    prestacao = np.where(em_financiamento, amortizacao + juros, 0.0)
+    juros_acumulados = valor_financiado * juros_mensal * (
+        meses_pagos - meses_pagos * (meses_pagos - 1) / (2 * meses_financiamento))
+
+    if investimento_inicial == 'financiado':
+        inicial = valor_financiado
+    else:
+        inicial = valor - valor_financiado
+    prestacoes_descontadas = valor_financiado * (
+        (1 / meses_financiamento + juros_mensal) * cubo['desconto_0'][ir, coluna_paga]
+        - juros_mensal / meses_financiamento * cubo['desconto_1'][ir, coluna_paga])
+    investimento_financiada = np.maximum(crescimento * (inicial - prestacoes_descontadas), 0.0)
+    investimento_financiada[:, :1] = inicial
+
+    patrimonio_financiada = valor_imovel - saldo_devedor + investimento_financiada
+    patrimonio_financiada[:, 0] = valor[:, 0]
+
+    compra_financiada = {
+        'Mês': np.broadcast_to(mes, valor_imovel.shape),
+        'Patrimônio': patrimonio_financiada,
+        'Valor Imóvel': valor_imovel,
+        'Saldo Devedor': saldo_devedor,
+        'Investimento': investimento_financiada,
+        'Prestação': prestacao,
+        'Juros Pagos': juros,
+        'Juros Acumulados': juros_acumulados,
+        'Custos Mensais': np.zeros_like(valor_imovel),
+    }
+
+    return {
+        'aluguel': aluguel,
+        'compra_vista': compra_vista,
+        'compra_financiada': compra_financiada,
+    }
+
+
+def resultados_simulador(simulador):
+    """Resultados do simulador como DataFrames a partir do cubo, ou ``None``.
+
+    Só responde com um cubo mensal (``passo_meses=1``), igual à simulação mês
+    a mês; com pontos mais espaçados, as tabelas e os gráficos da interface
+    mudariam de resolução conforme o cubo existisse ou não.
+    """
+    cubo = carregar()
+    if cubo is None or int(cubo['passo_meses']) != 1:
+        return None
+    lote = consultar(simulador.obter_parametros(), simulador.prazo_simulacao,
+                     simulador.investimento_inicial_financiada, cubo=cubo)
+    if lote is None:
+        return None
+    return {estrategia: motor.para_dataframe(colunas) for estrategia, colunas in lote.items()}
@@ -0,0 +1,269 @@
+"""Números duais para diferenciação automática em modo direto sobre arrays do NumPy.
+
+Um ``Dual`` carrega um array de valores e, para cada uma de ``k`` direções,
+o array das derivadas desses valores: ``derivadas`` tem formato ``(k,) +
+formato dos valores``. As operações aritméticas, as ufuncs usadas pelo motor
+(``exp``, ``expm1``, ``log1p``, potências, ``maximum``...) e as funções
+``np.where``, ``np.broadcast_arrays``, ``np.atleast_1d`` e ``np.round``
+propagam valores e derivadas de uma só vez, de modo que código escrito para
+arrays comuns calcula também as derivadas exatas em relação a todas as
+direções semeadas (ver ``semear``).
+
+Nas funções definidas por partes, a derivada é a do ramo escolhido:
+``np.maximum(x, 0)`` tem derivada zero onde o corte atua, e ``np.round``
+(prazos em meses) tem derivada zero.
+"""
+
+import numpy as np
+
+
+def _partes(valor):
+    """(valores, derivadas ou None) de um Dual ou de um array comum."""
+    if isinstance(valor, Dual):
+        return valor.valor, valor.derivadas
+    return np.asarray(valor, dtype=float), None
+
+
+def _alinhar(derivadas, dimensoes):
+    """Insere eixos nas derivadas para difundi-las contra valores com ``dimensoes`` eixos."""
+    faltam = dimensoes - (derivadas.ndim - 1)
+    if faltam <= 0:
+        return derivadas
+    return derivadas.reshape(derivadas.shape[:1] + (1,) * faltam + derivadas.shape[1:])
+
+
+def _combinar(valor, *termos):
+    """Dual com ``valor`` e a soma dos termos ``(fator, derivadas)`` não nulos."""
+    derivadas = None
+    for fator, parcial in termos:
+        if parcial is None:
+            continue
+        termo = _alinhar(parcial, valor.ndim) * fator
+        derivadas = termo if derivadas is None else derivadas + termo
+    if derivadas is None:
+        return valor
+    return Dual(valor, derivadas)
+
+
+def _unaria(funcao, derivada):
+    def regra(x):
+        v, d = _partes(x)
+        return _combinar(funcao(v), (derivada(v), d))
+    return regra
+
+
+def _binaria(regra):
+    def aplicar(a, b):
+        return regra(*_partes(a), *_partes(b))
+    return aplicar
+
+
+@_binaria
+def _potencia(va, da, vb, db):
+    valor = va ** vb
+    termo_base = (vb * va ** (vb - 1), da)
+    if db is None:
+        return _combinar(valor, termo_base)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        termo_expoente = (valor * np.log(va), db)
+    return _combinar(valor, termo_base, termo_expoente)
+
+
+def _escolha(condicao, a, b):
+    """Valores e derivadas de ``a`` onde ``condicao``, de ``b`` nos demais."""
+    va, da = _partes(a)
+    vb, db = _partes(b)
+    valor = np.where(condicao, va, vb)
+    if da is None and db is None:
+        return valor
+    direcoes = (da if da is not None else db).shape[0]
+    nulas = np.zeros((direcoes,) + (1,) * valor.ndim)
+    da = nulas if da is None else _alinhar(da, valor.ndim)
+    db = nulas if db is None else _alinhar(db, valor.ndim)
+    return Dual(valor, np.where(condicao, da, db))
+
+
+def _comparacao(ufunc):
+    def regra(a, b):
+        return ufunc(_partes(a)[0], _partes(b)[0])
+    return regra
+
+
+_REGRAS = {
+    np.add: _binaria(lambda va, da, vb, db: _combinar(va + vb, (1.0, da), (1.0, db))),
+    np.subtract: _binaria(lambda va, da, vb, db: _combinar(va - vb, (1.0, da), (-1.0, db))),
+    np.multiply: _binaria(lambda va, da, vb, db: _combinar(va * vb, (vb, da), (va, db))),
+    np.true_divide: _binaria(lambda va, da, vb, db: _combinar(va / vb, (1 / vb, da), (-va / vb ** 2, db))),
+    np.power: _potencia,
+    np.maximum: lambda a, b: _escolha(_partes(a)[0] >= _partes(b)[0], a, b),
+    np.minimum: lambda a, b: _escolha(_partes(a)[0] <= _partes(b)[0], a, b),
+    np.negative: _unaria(np.negative, lambda v: -1.0),
+    np.positive: _unaria(np.positive, lambda v: 1.0),
+    np.absolute: _unaria(np.absolute, np.sign),
+    np.exp: _unaria(np.exp, np.exp),
+    np.expm1: _unaria(np.expm1, np.exp),
+    np.log: _unaria(np.log, lambda v: 1 / v),
+    np.log1p: _unaria(np.log1p, lambda v: 1 / (1 + v)),
+    np.sqrt: _unaria(np.sqrt, lambda v: 0.5 / np.sqrt(v)),
+    np.rint: lambda x: np.rint(_partes(x)[0]),
+}
+for _ufunc in (np.equal, np.not_equal, np.less, np.less_equal, np.greater, np.greater_equal):
+    _REGRAS[_ufunc] = _comparacao(_ufunc)
+
+
+def _broadcast_arrays(*arrays):
+    formato = np.broadcast_shapes(*(_partes(array)[0].shape for array in arrays))
+    resultado = []
+    for array in arrays:
+        valor, derivadas = _partes(array)
+        valor = np.broadcast_to(valor, formato)
+        if derivadas is None:
+            resultado.append(valor)
+        else:
+            derivadas = _alinhar(derivadas, len(formato))
+            resultado.append(Dual(valor, np.broadcast_to(derivadas, derivadas.shape[:1] + formato)))
+    return resultado
+
+
+_FUNCOES = {
+    np.where: lambda condicao, a, b: _escolha(_partes(condicao)[0], a, b),
+    np.broadcast_arrays: _broadcast_arrays,
+    np.atleast_1d: lambda x: x if x.ndim else x.reshape(1),
+    np.round: lambda x, decimals=0: np.round(_partes(x)[0], decimals),
+    np.around: lambda x, decimals=0: np.around(_partes(x)[0], decimals),
+}
+
+
+class Dual:
+    """Array de valores com as derivadas em relação a ``k`` direções."""
+
+    # Faz as operações com ndarrays à esquerda chamarem os métodos do Dual
+    __array_priority__ = 1000
+
+    def __init__(self, valor, derivadas):
+        self.valor = np.asarray(valor, dtype=float)
+        self.derivadas = np.asarray(derivadas, dtype=float)
+
+    def __array_ufunc__(self, ufunc, metodo, *entradas, **opcoes):
+        if metodo != '__call__' or opcoes or ufunc not in _REGRAS:
+            return NotImplemented
+        return _REGRAS[ufunc](*entradas)
+
+    def __array_function__(self, funcao, tipos, argumentos, opcoes):
+        if funcao not in _FUNCOES:
+            return NotImplemented
+        return _FUNCOES[funcao](*argumentos, **opcoes)
+
+    @property
+    def shape(self):
+        return self.valor.shape
+
+    @property
+    def ndim(self):
+        return self.valor.ndim
+
+    def __len__(self):
+        return len(self.valor)
+
+    def __getitem__(self, indice):
+        indice = indice if isinstance(indice, tuple) else (indice,)
+        derivadas = _alinhar(self.derivadas, self.ndim)
+        derivadas = np.broadcast_to(derivadas, derivadas.shape[:1] + self.shape)
+        return Dual(self.valor[indice], derivadas[(slice(None),) + indice])
+
+    def reshape(self, *formato):
+        formato = formato[0] if len(formato) == 1 and isinstance(formato[0], tuple) else formato
+        valor = self.valor.reshape(formato)
+        derivadas = np.broadcast_to(_alinhar(self.derivadas, self.ndim),
+                                    self.derivadas.shape[:1] + self.shape)
+        return Dual(valor, derivadas.reshape(derivadas.shape[:1] + valor.shape))
+
+    def ravel(self):
+        return self.reshape(-1)
+
+    def __repr__(self):
+        return f"Dual({self.valor!r}, derivadas={self.derivadas!r})"
+
+    def __add__(self, outro):
+        return np.add(self, outro)
+
+    def __radd__(self, outro):
+        return np.add(outro, self)
+
+    def __sub__(self, outro):
+        return np.subtract(self, outro)
+
+    def __rsub__(self, outro):
+        return np.subtract(outro, self)
+
+    def __mul__(self, outro):
+        return np.multiply(self, outro)
+
+    def __rmul__(self, outro):
+        return np.multiply(outro, self)
+
+    def __truediv__(self, outro):
+        return np.true_divide(self, outro)
+
+    def __rtruediv__(self, outro):
+        return np.true_divide(outro, self)
+
+    def __pow__(self, outro):
+        return np.power(self, outro)
+
+    def __rpow__(self, outro):
+        return np.power(outro, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+    def __pos__(self):
+        return np.positive(self)
+
+    def __abs__(self):
+        return np.absolute(self)
+
+    def __eq__(self, outro):
+        return np.equal(self, outro)
+
+    def __ne__(self, outro):
+        return np.not_equal(self, outro)
+
+    def __lt__(self, outro):
+        return np.less(self, outro)
+
+    def __le__(self, outro):
+        return np.less_equal(self, outro)
+
+    def __gt__(self, outro):
+        return np.greater(self, outro)
+
+    def __ge__(self, outro):
+        return np.greater_equal(self, outro)
+
+    __hash__ = None
+
+
+def semear(valores):
+    """Um Dual por variável de ``valores``, cada uma com derivada 1 na sua própria direção.
+
+    ``valores`` mapeia nomes para escalares ou arrays; a ordem das direções é
+    a ordem das chaves.
+    """
+    quantidade = len(valores)
+    semeados = {}
+    for direcao, (nome, valor) in enumerate(valores.items()):
+        valor = np.asarray(valor, dtype=float)
+        derivadas = np.zeros((quantidade,) + valor.shape)
+        derivadas[direcao] = 1.0
+        semeados[nome] = Dual(valor, derivadas)
+    return semeados
+
+
+def separar(resultado, direcoes):
+    """(valores, derivadas) de um resultado, com derivadas nulas se ele não é um Dual."""
+    valor, derivadas = _partes(resultado)
+    if derivadas is None:
+        return valor, np.zeros((direcoes,) + valor.shape)
+    derivadas = _alinhar(derivadas, valor.ndim)
+    return valor, np.broadcast_to(derivadas, derivadas.shape[:1] + valor.shape)
@@ -0,0 +1,387 @@
+"""Simulação estocástica (Monte Carlo) das três opções.
+
+As taxas anuais do simulador passam a ser médias: a cada mês, a valorização
+do imóvel e o rendimento dos investimentos seguem retornos log-normais, com
+as volatilidades anuais e a correlação informadas, calibrados para que o
+valor esperado de cada fator de crescimento seja o da simulação determinística.
+Cada caminho é avaliado pelo motor vetorizado (``motor.simular_lote`` com
+``trajetoria``), com um caminho por linha do lote.
+
+Os caminhos são gerados e simulados em blocos. As séries mensais de cada
+bloco alimentam esboços de quantis (``quantis.EsbocoQuantis``) e somas
+acumuladas e são descartadas em seguida, de modo que a memória depende do
+tamanho do bloco e do número de meses, não do número de caminhos. Cada bloco
+de ``CAMINHOS_POR_SEMENTE`` caminhos tem seu próprio gerador, derivado da
+semente com ``SeedSequence.spawn``, e os blocos são simulados ao mesmo tempo
+por threads (``paralelo.mapear_blocos``); as somas mensais são acumuladas na
+ordem dos blocos, de modo que o resultado é o mesmo para qualquer número de
+trabalhadores.
+
+Para obter a mesma precisão com menos caminhos, os choques podem ser
+antitéticos ou estratificados (pontos de Sobol embaralhados ou hipercubo
+latino na soma dos choques de cada fator), e os fatores de crescimento
+acumulados podem servir de variáveis de controle, com as médias exatas da
+simulação determinística. Como cada bloco é uma réplica independente, a
+dispersão entre blocos dá o erro padrão das estimativas finais e o tamanho
+efetivo da amostra: o número de caminhos pseudoaleatórios, sem controle,
+que teria a mesma precisão.
+"""
+
+import threading
+
+import numpy as np
+
+import motor
+import paralelo
+from quantis import EsbocoQuantis
+
+# Volatilidades anuais padrão dos retornos e correlação entre eles
+VOLATILIDADE_IMOVEL = 0.10
+VOLATILIDADE_INVESTIMENTO = 0.15
+CORRELACAO = 0.0
+
+PROBABILIDADES_PADRAO = (0.05, 0.25, 0.50, 0.75, 0.95)
+
+AMOSTRAGENS = ('pseudoaleatoria', 'antitetica', 'sobol', 'hipercubo')
+
+# Caminhos por gerador: a unidade de reprodutibilidade dos sorteios
+CAMINHOS_POR_SEMENTE = 1024
+
+# Faixa dos esboços de patrimônio: abaixo de R$ 1 vale zero
+MINIMO_ESBOCO = 1.0
+MAXIMO_ESBOCO = 1e13
+
+
+# Coeficientes da aproximação racional de Acklam para a inversa da normal
+# padrão (erro relativo abaixo de 1,2e-9, suficiente para amostragem)
+_ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+
+
+def _polinomio(coeficientes, x):
+    resultado = np.zeros_like(x)
+    for coeficiente in coeficientes:
+        resultado = resultado * x + coeficiente
+    return resultado
+
+
+def _normal_inversa(u):
+    """Inversa da distribuição normal padrão para ``0 < u < 1``."""
+    u = np.asarray(u, dtype=float)
+    central = u - 0.5
+    r = central ** 2
+    resultado = central * _polinomio(_ACKLAM_A, r) / (_polinomio(_ACKLAM_B, r) * r + 1)
+
+    cauda = np.minimum(u, 1 - u)
+    nas_caudas = cauda < 0.02425
+    q = np.sqrt(-2 * np.log(np.where(nas_caudas, cauda, 0.5)))
+    valor_cauda = _polinomio(_ACKLAM_C, q) / (_polinomio(_ACKLAM_D, q) * q + 1)
+    return np.where(nas_caudas, np.where(u < 0.5, valor_cauda, -valor_cauda), resultado)
+
+
+def _sobol_2d(quantidade, rng):
+    """Primeiros ``quantidade`` pontos de Sobol em duas dimensões, com deslocamento digital aleatório."""
+    bits = 32
+    indices = np.arange(quantidade, dtype=np.uint64)
+    direcoes_1 = [np.uint64(1 << (bits - 1 - k)) for k in range(bits)]
+    direcoes_2 = [np.uint64(1 << (bits - 1))]
+    for _ in range(bits - 1):
+        anterior = direcoes_2[-1]
+        direcoes_2.append(anterior ^ (anterior >> np.uint64(1)))
+
+    pontos = np.zeros((quantidade, 2), dtype=np.uint64)
+    for k in range(bits):
+        ativo = (indices >> np.uint64(k)) & np.uint64(1)
+        pontos[:, 0] ^= ativo * direcoes_1[k]
+        pontos[:, 1] ^= ativo * direcoes_2[k]
+    pontos ^= rng.integers(0, 2 ** bits, size=2, dtype=np.uint64)
+    return (pontos.astype(float) + 0.5) / 2 ** bits
+
+
+def _hipercubo_latino(quantidade, rng, dimensoes=2):
+    """Amostra em hipercubo latino: um ponto por estrato em cada dimensão."""
+    estratos = np.stack([rng.permutation(quantidade) for _ in range(dimensoes)], axis=1)
+    return (estratos + rng.random((quantidade, dimensoes))) / quantidade
+
+
+def sortear_choques(rng, caminhos, meses, amostragem='pseudoaleatoria'):
+    """Choques normais padrão, formato (caminhos, meses, 2).
+
+    ``amostragem`` escolhe o esquema (ver ``AMOSTRAGENS``):
+
+    * ``'pseudoaleatoria'``: choques independentes;
+    * ``'antitetica'``: a segunda metade dos caminhos repete a primeira com
+      os choques trocados de sinal;
+    * ``'sobol'`` e ``'hipercubo'``: a soma dos choques de cada fator (que
+      determina o crescimento acumulado até o fim) é sorteada por pontos de
+      Sobol embaralhados ou por hipercubo latino, e o caminho até lá é
+      preenchido por uma ponte browniana pseudoaleatória. A estratificação
+      fica nas duas direções que concentram a variância dos valores finais,
+      em vez de em todas as 2 × meses dimensões.
+    """
+    if amostragem not in AMOSTRAGENS:
+        raise ValueError(f"Amostragem desconhecida: {amostragem!r}. Use uma de {AMOSTRAGENS}.")
+
+    if amostragem == 'antitetica':
+        metade = rng.standard_normal(((caminhos + 1) // 2, meses, 2))
+        return np.concatenate([metade, -metade])[:caminhos]
+
+    choques = rng.standard_normal((caminhos, meses, 2))
+    if amostragem == 'pseudoaleatoria' or meses == 0:
+        return choques
+
+    uniformes = _sobol_2d(caminhos, rng) if amostragem == 'sobol' else _hipercubo_latino(caminhos, rng)
+    somas = _normal_inversa(uniformes) * np.sqrt(meses)
+
+    # Ponte browniana: choques condicionados a terem a soma sorteada
+    return choques - choques.mean(axis=1, keepdims=True) + somas[:, None, :] / meses
+
+
+def trajetorias(parametros, choques, volatilidade_imovel=VOLATILIDADE_IMOVEL,
+                volatilidade_investimento=VOLATILIDADE_INVESTIMENTO, correlacao=CORRELACAO):
+    """Converte choques normais em taxas mensais de valorização e de rendimento.
+
+    Os retornos logarítmicos mensais têm média ``ln(1 + taxa mensal) -
+    sigma²/2`` e desvio ``sigma = volatilidade / sqrt(12)``, de modo que
+    ``E[1 + taxa] = 1 + taxa mensal`` da simulação determinística. A
+    correlação é aplicada pelo fator de Cholesky 2×2.
+
+    Retorna a ``trajetoria`` aceita por ``motor.simular_lote``, com formato
+    (caminhos, meses + 1) e o mês zero zerado.
+    """
+    caminhos, meses, _ = choques.shape
+    choque_imovel = choques[..., 0]
+    choque_investimento = correlacao * choques[..., 0] + np.sqrt(1 - correlacao ** 2) * choques[..., 1]
+
+    def taxas(taxa_anual, volatilidade, choque):
+        sigma = volatilidade / np.sqrt(12)
+        media = np.log1p(motor.taxa_mensal(taxa_anual)) - sigma ** 2 / 2
+        resultado = np.zeros((caminhos, meses + 1))
+        resultado[:, 1:] = np.expm1(media + sigma * choque)
+        return resultado
+
+    return {
+        'valorizacao': taxas(parametros['taxa_valorizacao_imovel'], volatilidade_imovel, choque_imovel),
+        'rendimento': taxas(parametros['taxa_juros_investimento'], volatilidade_investimento,
+                            choque_investimento),
+    }
+
+
+def geradores(semente, caminhos):
+    """Um gerador por grupo de ``CAMINHOS_POR_SEMENTE`` caminhos, derivados da semente.
+
+    São os geradores usados pela simulação de Monte Carlo: o bloco ``i`` de
+    caminhos sorteia seus choques com o gerador ``i``, de modo que quem os
+    recria com a mesma semente reproduz exatamente os mesmos caminhos.
+    """
+    grupos = -(-caminhos // CAMINHOS_POR_SEMENTE)
+    return [np.random.default_rng(filha) for filha in np.random.SeedSequence(semente).spawn(grupos)]
+
+
+def simular_bloco(parametros, prazo_simulacao, investimento_inicial, choques, **volatilidades):
+    """Patrimônio mês a mês de cada estratégia para um bloco de caminhos.
+
+    Retorna ``{estrategia: array (caminhos, meses + 1)}``.
+    """
+    return _simular_trajetorias(parametros, prazo_simulacao, investimento_inicial,
+                                trajetorias(parametros, choques, **volatilidades))
+
+
+def _simular_trajetorias(parametros, prazo_simulacao, investimento_inicial, trajetoria):
+    lote = motor.simular_lote(parametros, prazo_simulacao, investimento_inicial, trajetoria=trajetoria)
+    return {estrategia: colunas['Patrimônio'] for estrategia, colunas in lote.items()}
+
+
+def _controles(parametros, trajetoria):
+    """Fatores de crescimento acumulados do imóvel e dos investimentos, formato (caminhos, 2)."""
+    liquido = trajetoria['rendimento'][:, 1:] * (1 - parametros['aliquota_ir'])
+    return np.stack([np.prod(1 + trajetoria['valorizacao'][:, 1:], axis=1),
+                     np.prod(1 + liquido, axis=1)], axis=1)
+
+
+def _medias_controles(simulador, meses):
+    """Valores esperados exatos dos controles, pela simulação determinística.
+
+    O valor final do imóvel na simulação determinística, dividido pelo valor
+    inicial, é a média do fator de crescimento do imóvel; o dos investimentos
+    é o crescimento determinístico do capital à taxa líquida.
+    """
+    parametros = simulador.obter_parametros()
+    finais = motor.valores_finais(parametros, simulador.prazo_simulacao,
+                                  simulador.investimento_inicial_financiada)
+    imovel = finais['compra_vista']['Valor Imóvel'][0] / parametros['valor_imovel']
+    liquido = motor.taxa_mensal(parametros['taxa_juros_investimento']) * (1 - parametros['aliquota_ir'])
+    return np.array([imovel, (1 + liquido) ** meses])
+
+
+class _Estimador:
+    """Médias por bloco de uma quantidade por caminho, com controle opcional.
+
+    Guarda, por bloco, as médias de ``y`` (caminhos, k) e dos controles
+    ``x`` (caminhos, 2) e as somas de produtos cruzados que dão o
+    coeficiente de regressão dos controles. Os blocos são réplicas
+    independentes, de modo que a dispersão entre eles estima a variância do
+    estimador mesmo quando os caminhos de um bloco não são independentes
+    (antitéticos ou estratificados).
+    """
+
+    def __init__(self, blocos, colunas, controles=2):
+        self.tamanhos = np.zeros(blocos)
+        self.medias_y = np.zeros((blocos, colunas))
+        self.medias_x = np.zeros((blocos, controles))
+        self.somas_yy = np.zeros((blocos, colunas))
+        self.somas_xx = np.zeros((blocos, controles, controles))
+        self.somas_xy = np.zeros((blocos, controles, colunas))
+
+    def adicionar(self, bloco, y, x):
+        """Guarda as estatísticas do ``bloco``; blocos distintos podem vir de threads distintas."""
+        self.tamanhos[bloco] = len(y)
+        self.medias_y[bloco] = y.mean(axis=0)
+        self.medias_x[bloco] = x.mean(axis=0)
+        self.somas_yy[bloco] = (y ** 2).sum(axis=0)
+        self.somas_xx[bloco] = x.T @ x
+        self.somas_xy[bloco] = x.T @ y
+
+    def resultado(self, medias_controles=None):
+        """Estimativa, erro padrão e tamanho efetivo da amostra de cada coluna de ``y``.
+
+        O tamanho efetivo é o número de caminhos independentes, sem controle,
+        que daria o mesmo erro padrão: a variância de um caminho dividida
+        pela variância do estimador.
+        """
+        total = self.tamanhos.sum()
+        pesos = self.tamanhos / total
+        medias_y = self.medias_y
+        media_y = pesos @ medias_y
+        variancia_caminho = (np.maximum(self.somas_yy.sum(axis=0) / total - media_y ** 2, 0)
+                             * total / max(total - 1, 1))
+
+        if medias_controles is not None:
+            media_x = pesos @ self.medias_x
+            covariancia_x = self.somas_xx.sum(axis=0) / total - np.outer(media_x, media_x)
+            covariancia_xy = self.somas_xy.sum(axis=0) / total - np.outer(media_x, media_y)
+            coeficientes = np.linalg.lstsq(covariancia_x, covariancia_xy, rcond=None)[0]
+            medias_y = medias_y - (self.medias_x - medias_controles) @ coeficientes
+
+        estimativa = pesos @ medias_y
+        blocos = len(pesos)
+        if blocos < 2:
+            indefinido = np.full_like(estimativa, np.nan)
+            return estimativa, indefinido, indefinido
+        variancia = (pesos ** 2) @ (medias_y - estimativa) ** 2 * blocos / (blocos - 1)
+        # Dispersão no nível do arredondamento: o controle explica toda a variância
+        variancia = np.where(variancia > (1e-12 * estimativa) ** 2, variancia, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efetivo = np.where(variancia > 0, variancia_caminho / variancia, np.inf)
+        return estimativa, np.sqrt(variancia), efetivo
+
+
+def simular_monte_carlo(simulador, caminhos=10000, semente=0, probabilidades=PROBABILIDADES_PADRAO,
+                        precisao_relativa=0.005, volatilidade_imovel=VOLATILIDADE_IMOVEL,
+                        volatilidade_investimento=VOLATILIDADE_INVESTIMENTO,
+                        correlacao=CORRELACAO, amostragem='pseudoaleatoria', controle=False,
+                        trabalhadores=None):
+    """Simula ``caminhos`` trajetórias das três opções com memória limitada.
+
+    Args:
+        simulador: instância de ``SimuladorImovel`` com os parâmetros.
+        caminhos: número de trajetórias.
+        semente: semente da ``SeedSequence`` que gera os sorteios.
+        probabilidades: quantis estimados mês a mês.
+        precisao_relativa: erro relativo máximo dos quantis (ver ``quantis``).
+        volatilidade_imovel, volatilidade_investimento: volatilidades anuais.
+        correlacao: correlação entre os retornos do imóvel e dos investimentos.
+        amostragem: esquema de sorteio dos choques (ver ``sortear_choques``).
+        controle: usa os fatores de crescimento acumulados do imóvel e dos
+            investimentos como variáveis de controle, com as médias exatas da
+            simulação determinística, nas estimativas da média final e da
+            probabilidade de vitória.
+        trabalhadores: threads que simulam os blocos ao mesmo tempo (padrão
+            ``paralelo.TRABALHADORES``); o resultado não depende desse número.
+
+    Returns:
+        Dicionário com ``'Mês'``, as ``probabilidades``, os ``quantis`` de
+        cada estratégia (formato (len(probabilidades), meses + 1)), a
+        ``media`` mês a mês, a ``probabilidade_vitoria`` de cada estratégia
+        (fração dos caminhos em que tem o maior patrimônio final), o número
+        de ``caminhos`` e as ``estimativas`` finais de cada estratégia:
+        ``'media'`` e ``'probabilidade_vitoria'``, cada uma com seu
+        ``'erro_padrao'`` e ``'amostra_efetiva'``, e o ``'erro_padrao_quantis'``
+        do patrimônio final. Os erros são estimados pela dispersão entre os
+        blocos de ``CAMINHOS_POR_SEMENTE`` caminhos, que exige pelo menos dois
+        blocos (com um só, ficam indefinidos).
+    """
+    parametros = simulador.obter_parametros()
+    meses = int(round(simulador.prazo_simulacao * 12))
+    volatilidades = {
+        'volatilidade_imovel': volatilidade_imovel,
+        'volatilidade_investimento': volatilidade_investimento,
+        'correlacao': correlacao,
+    }
+
+    geradores_blocos = geradores(semente, caminhos)
+    blocos = len(geradores_blocos)
+    estrategias = len(motor.ESTRATEGIAS)
+    esbocos = {estrategia: EsbocoQuantis(meses + 1, precisao_relativa, MINIMO_ESBOCO, MAXIMO_ESBOCO)
+               for estrategia in motor.ESTRATEGIAS}
+    trava_esbocos = threading.Lock()
+    soma = np.zeros((estrategias, meses + 1))
+    patrimonio_final = _Estimador(blocos, estrategias)
+    vitoria = _Estimador(blocos, estrategias)
+    quantis_blocos = np.zeros((blocos, len(probabilidades), estrategias))
+
+    def simular(indice):
+        quantidade = min(CAMINHOS_POR_SEMENTE, caminhos - indice * CAMINHOS_POR_SEMENTE)
+        choques = sortear_choques(geradores_blocos[indice], quantidade, meses, amostragem)
+        trajetoria = trajetorias(parametros, choques, **volatilidades)
+        patrimonios = _simular_trajetorias(parametros, simulador.prazo_simulacao,
+                                           simulador.investimento_inicial_financiada, trajetoria)
+
+        for estrategia, valores in patrimonios.items():
+            contagens = esbocos[estrategia].contar(valores)
+            with trava_esbocos:
+                esbocos[estrategia].contagens += contagens
+        finais = np.stack([patrimonios[estrategia][:, -1] for estrategia in motor.ESTRATEGIAS], axis=1)
+        vencedoras = np.argmax(finais, axis=1)[:, None] == np.arange(estrategias)
+        controles = _controles(parametros, trajetoria)
+        patrimonio_final.adicionar(indice, finais, controles)
+        vitoria.adicionar(indice, vencedoras.astype(float), controles)
+        quantis_blocos[indice] = np.quantile(finais, probabilidades, axis=0)
+        return np.stack([patrimonios[estrategia].sum(axis=0) for estrategia in motor.ESTRATEGIAS])
+
+    # Somas mensais acumuladas na ordem dos blocos, para não depender de qual
+    # thread termina primeiro
+    for somas_bloco in paralelo.mapear_blocos(simular, blocos, trabalhadores):
+        soma += somas_bloco
+
+    medias_controles = _medias_controles(simulador, meses) if controle else None
+    estimativas = {}
+    for nome, estimador in (('media', patrimonio_final), ('probabilidade_vitoria', vitoria)):
+        valor, erro, efetivo = estimador.resultado(medias_controles)
+        for coluna, estrategia in enumerate(motor.ESTRATEGIAS):
+            estimativas.setdefault(estrategia, {})[nome] = {
+                'valor': float(valor[coluna]),
+                'erro_padrao': float(erro[coluna]),
+                'amostra_efetiva': float(efetivo[coluna]),
+            }
+    erros_quantis = (quantis_blocos.std(axis=0, ddof=1) / np.sqrt(blocos)
+                     if blocos > 1 else np.full(quantis_blocos.shape[1:], np.nan))
+    for coluna, estrategia in enumerate(motor.ESTRATEGIAS):
+        estimativas[estrategia]['erro_padrao_quantis'] = erros_quantis[:, coluna]
+
+    return {
+        'Mês': np.arange(meses + 1, dtype=float),
+        'probabilidades': np.asarray(probabilidades, dtype=float),
+        'quantis': {estrategia: esboco.quantis(probabilidades) for estrategia, esboco in esbocos.items()},
+        'media': dict(zip(motor.ESTRATEGIAS, soma / caminhos)),
+        'probabilidade_vitoria': {estrategia: valores['probabilidade_vitoria']['valor']
+                                  for estrategia, valores in estimativas.items()},
+        'caminhos': caminhos,
+        'estimativas': estimativas,
+    }
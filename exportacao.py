@@ -0,0 +1,138 @@
+"""Saída em Arrow: lotes do motor como record batches e arquivos IPC (Feather).
+
+Cada record batch traz um bloco de cenários: a coluna ``cenario`` (posição
+do cenário na entrada), uma coluna por parâmetro de ``motor.PARAMETROS`` e
+``motor.PARAMETROS_CUSTOS`` e uma coluna struct por estratégia, com um campo
+por coluna do motor (os mesmos nomes dos DataFrames do simulador). Há dois
+formatos:
+
+- ``'lista'``: uma linha por cenário; cada campo é uma lista de tamanho fixo
+  com os meses 0 a ``meses``. O buffer de valores da lista é o próprio array
+  (cenários, meses + 1) do motor, sem cópia.
+- ``'longo'``: uma linha por cenário e mês, com a coluna ``mes``; cada campo
+  é um número. É o formato mais cômodo para agrupar por mês no DuckDB ou no
+  Polars, ao custo de repetir os parâmetros em todos os meses.
+
+Os arquivos usam o formato de arquivo IPC do Arrow (Feather v2), sem
+compressão, com um record batch por bloco de cenários, gravado assim que o
+bloco é calculado; a memória depende do tamanho do bloco, não do número de
+cenários. Quem lê pode mapear o arquivo em memória (``ler_arrow``) e usar as
+colunas sem copiá-las.
+
+O pyarrow, instalado junto com o Streamlit, é importado só quando usado.
+"""
+
+import itertools
+
+import numpy as np
+
+import motor
+import paralelo
+
+FORMATOS = ('lista', 'longo')
+
+# Cenários por record batch: cada um ocupa cerca de 21 colunas x (meses + 1) floats
+CENARIOS_POR_BLOCO = 1024
+
+
+def ler_parametros_csv(caminho, padroes=None, tamanho_bloco=CENARIOS_POR_BLOCO):
+    """Lê cenários de um CSV em blocos de ``tamanho_bloco`` linhas.
+
+    Gera dicionários de arrays no formato aceito por ``motor.simular_lote``.
+    As colunas com nomes de parâmetros do simulador são lidas; colunas
+    ausentes e células vazias usam ``padroes``.
+    """
+    import pandas as pd
+
+    padroes = padroes or {}
+    nomes = motor.PARAMETROS + motor.PARAMETROS_CUSTOS
+    cabecalho = pd.read_csv(caminho, nrows=0).columns
+    usadas = [nome for nome in nomes if nome in cabecalho]
+    with pd.read_csv(caminho, usecols=usadas, chunksize=tamanho_bloco, dtype=float) as leitor:
+        for bloco in leitor:
+            parametros = {nome: np.full(len(bloco), float(padroes.get(nome, 0.0))) for nome in nomes}
+            for nome in usadas:
+                valores = bloco[nome].to_numpy()
+                parametros[nome] = np.where(np.isnan(valores), parametros[nome], valores)
+            yield parametros
+
+
+def lote_para_arrow(lote, parametros, formato='lista', primeiro_cenario=0):
+    """Record batch do Arrow com um lote de ``motor.simular_lote`` e seus parâmetros.
+
+    ``primeiro_cenario`` é o número do primeiro cenário do lote na coluna
+    ``cenario``, para numerar os blocos de um arquivo em sequência. No
+    formato ``'longo'`` os meses vêm da coluna ``'Mês'`` do lote, de modo que
+    blocos de meses de ``motor.iterar_lote`` também podem ser convertidos.
+    """
+    import pyarrow as pa
+
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS}.")
+    meses = next(iter(lote.values()))['Mês']
+    cenarios, pontos = meses.shape
+    longo = formato == 'longo'
+
+    def valores(array):
+        array = np.ascontiguousarray(array, dtype=float)
+        if longo:
+            return pa.array(array.reshape(-1))
+        return pa.FixedSizeListArray.from_arrays(pa.array(array.reshape(-1)), pontos)
+
+    numeros = np.arange(primeiro_cenario, primeiro_cenario + cenarios, dtype=np.int64)
+    colunas = {'cenario': np.repeat(numeros, pontos) if longo else numeros}
+    if longo:
+        colunas['mes'] = meses.reshape(-1).astype(np.int32)
+    for nome, valor in motor.preparar_parametros(parametros).items():
+        valor = np.broadcast_to(valor[:, 0], (cenarios,))
+        colunas[nome] = np.repeat(valor, pontos) if longo else np.ascontiguousarray(valor)
+    for estrategia, series in lote.items():
+        nomes = [nome for nome in series if nome != 'Mês']
+        colunas[estrategia] = pa.StructArray.from_arrays(
+            [valores(series[nome]) for nome in nomes], names=nomes)
+    return pa.RecordBatch.from_pydict(colunas)
+
+
+def iterar_arrow(blocos, prazo_simulacao, investimento_inicial='entrada', formato='lista',
+                 estrategias=motor.ESTRATEGIAS):
+    """Simula cada bloco de parâmetros e gera o seu record batch, numerando os cenários em sequência.
+
+    ``blocos`` é um iterável (pode ser um gerador, como ``ler_parametros_csv``)
+    de dicionários de parâmetros; cada bloco é simulado com
+    ``paralelo.simular_lote`` e descartado depois de convertido.
+    """
+    primeiro = 0
+    for parametros in blocos:
+        lote = paralelo.simular_lote(parametros, prazo_simulacao, investimento_inicial, estrategias)
+        registro = lote_para_arrow(lote, parametros, formato, primeiro)
+        primeiro += len(next(iter(lote.values()))['Mês'])
+        yield registro
+
+
+def gravar_arrow(caminho, registros, metadados=None):
+    """Grava os record batches em um arquivo IPC do Arrow à medida que são gerados.
+
+    O esquema é o do primeiro record batch, acrescido de ``metadados``
+    (textos, por exemplo o prazo e o formato). Devolve o número de linhas
+    gravadas.
+    """
+    import pyarrow as pa
+
+    registros = iter(registros)
+    primeiro = next(registros, None)
+    if primeiro is None:
+        raise ValueError("Nenhum cenário para gravar.")
+    esquema = primeiro.schema.with_metadata({chave: str(valor) for chave, valor in (metadados or {}).items()})
+    linhas = 0
+    with pa.OSFile(caminho, 'wb') as arquivo, pa.ipc.new_file(arquivo, esquema) as escritor:
+        for registro in itertools.chain([primeiro], registros):
+            escritor.write_batch(registro)
+            linhas += registro.num_rows
+    return linhas
+
+
+def ler_arrow(caminho):
+    """Tabela do Arrow de um arquivo de ``gravar_arrow``, mapeada em memória, sem cópia."""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(caminho)).read_all()
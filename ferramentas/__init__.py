@@ -0,0 +1 @@
+"""Ferramentas de linha de comando do Simulador de Opções Imobiliárias."""
@@ -0,0 +1,106 @@
+"""Benchmark do tempo de importação (partida a frio) do simulador.
+
+Executa cada módulo em um interpretador novo com ``python -X importtime``,
+soma o tempo cumulativo de importação e compara com um orçamento em
+milissegundos. Também verifica que as bibliotecas pesadas não são carregadas
+na importação. Uso::
+
+    python -m ferramentas.benchmark_inicializacao [--repeticoes 5] [--saida arquivo.json]
+
+O processo termina com código 1 se algum módulo estourar o orçamento.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento de importação a frio (ms) de cada módulo, medido pela mediana
+ORCAMENTO_MS = {
+    'simulador': 100.0,
+    'app': 600.0,
+}
+
+# Bibliotecas que devem ser importadas apenas no primeiro uso
+MODULOS_ADIADOS = ('pandas', 'matplotlib', 'numpy')
+
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def medir_importacao(modulo):
+    """Importa o módulo em um processo novo e devolve o relatório do importtime.
+
+    Retorna ``(total_ms, modulos)``, em que ``modulos`` mapeia cada módulo
+    importado ao seu tempo cumulativo em milissegundos.
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    modulos = {}
+    total_ms = 0.0
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if not encontrado:
+            continue
+        cumulativo_ms = int(encontrado.group(2)) / 1000
+        nome = encontrado.group(4)
+        modulos[nome] = cumulativo_ms
+        # Linhas sem recuo extra são importações de primeiro nível
+        if len(encontrado.group(3)) == 1:
+            total_ms += cumulativo_ms
+    return total_ms, modulos
+
+
+def executar_benchmark(repeticoes=5, orcamento=None):
+    """Mede todos os módulos do orçamento e devolve um dicionário de resultados."""
+    orcamento = orcamento or ORCAMENTO_MS
+    resultados = {}
+    for modulo, limite_ms in orcamento.items():
+        tempos = []
+        carregados = set()
+        for _ in range(repeticoes):
+            total_ms, modulos = medir_importacao(modulo)
+            tempos.append(total_ms)
+            carregados.update(modulos)
+        tempos.sort()
+        mediana_ms = tempos[len(tempos) // 2]
+        adiados_carregados = sorted(m for m in MODULOS_ADIADOS if m in carregados)
+        resultados[modulo] = {
+            'mediana_ms': round(mediana_ms, 1),
+            'minimo_ms': round(tempos[0], 1),
+            'maximo_ms': round(tempos[-1], 1),
+            'orcamento_ms': limite_ms,
+            'modulos_pesados_carregados': adiados_carregados,
+            'dentro_do_orcamento': mediana_ms <= limite_ms and not adiados_carregados,
+        }
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help='grava os resultados em JSON neste arquivo')
+    args = parser.parse_args(argv)
+
+    resultados = executar_benchmark(args.repeticoes)
+    for modulo, resultado in resultados.items():
+        situacao = 'OK' if resultado['dentro_do_orcamento'] else 'ESTOURO'
+        print(f"{modulo:<12} {resultado['mediana_ms']:>8.1f} ms "
+              f"(orçamento {resultado['orcamento_ms']:.0f} ms) {situacao}")
+        if resultado['modulos_pesados_carregados']:
+            print(f"    importados cedo demais: {', '.join(resultado['modulos_pesados_carregados'])}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+
+    return 0 if all(r['dentro_do_orcamento'] for r in resultados.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
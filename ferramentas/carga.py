@@ -0,0 +1,177 @@
+"""Teste de carga da interface com usuários simulados em sessões concorrentes.
+
+Uso::
+
+    python -m ferramentas.carga [--usuarios 1,2,4,8] [--acoes 10] [--pensamento 1.0]
+        [--app app.py] [--semente 0] [--saida resultados.json]
+
+Cada usuário é uma sessão ``streamlit.testing.v1.AppTest`` em um processo
+próprio (o ``AppTest`` não pode ser usado por várias threads do mesmo
+processo). Após a carga inicial da página, o usuário repete ``--acoes``
+vezes: espera um tempo de reflexão com distribuição exponencial de média
+``--pensamento`` segundos e então move um controle deslizante da barra
+lateral, altera o valor do imóvel, troca uma caixa de seleção ou um botão de
+opção, o que provoca uma reexecução do script. A troca de abas acontece no
+navegador, sem reexecução, e por isso não é simulada.
+
+Para cada nível de concorrência são informados os percentis 50, 95 e 99 da
+latência das reexecuções, o tempo de CPU por reexecução e a memória residente
+máxima por sessão. O nível em que a latência dispara em relação ao de um
+usuário indica a concorrência suportada pela máquina.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from simulador import DOMINIOS
+
+# Tipos de ação e seus pesos no sorteio
+ACOES = {
+    'controle_deslizante': 0.6,
+    'valor_imovel': 0.1,
+    'caixa_selecao': 0.2,
+    'botao_opcao': 0.1,
+}
+
+PERCENTIS = (50, 95, 99)
+
+_PARAMETROS_POR_ROTULO = {dominio['rotulo']: nome for nome, dominio in DOMINIOS.items()}
+
+
+def _memoria_residente_mb():
+    """Memória residente máxima do processo, em MB."""
+    import resource
+
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _valor_aleatorio(rng, minimo, maximo, passo, tipo):
+    """Sorteia um valor válido para o controle, na grade de ``passo``."""
+    passos = int(round((maximo - minimo) / passo))
+    return tipo(minimo + rng.integers(0, passos + 1) * passo)
+
+
+def _executar_acao(app, acao, rng):
+    """Aplica uma ação do usuário à sessão (sem reexecutar o script)."""
+    if acao == 'controle_deslizante':
+        controle = app.sidebar.slider[int(rng.integers(len(app.sidebar.slider)))]
+        controle.set_value(_valor_aleatorio(rng, controle.min, controle.max, controle.step,
+                                            type(controle.value)))
+    elif acao == 'valor_imovel':
+        controle = app.sidebar.number_input[0]
+        controle.set_value(_valor_aleatorio(rng, controle.min, controle.max, controle.step, float))
+    elif acao == 'caixa_selecao':
+        controle = app.selectbox[int(rng.integers(len(app.selectbox)))]
+        opcao = controle.options[int(rng.integers(len(controle.options)))]
+        # O AppTest expõe as opções já formatadas; as caixas do mapa de
+        # sensibilidade exibem o rótulo de DOMINIOS e esperam o nome do parâmetro
+        controle.set_value(_PARAMETROS_POR_ROTULO.get(opcao, opcao))
+    else:
+        controle = app.radio[int(rng.integers(len(app.radio)))]
+        controle.set_value(controle.options[int(rng.integers(len(controle.options)))])
+
+
+def executar_sessao(arquivo_app, acoes, pensamento, semente, tempo_limite=120):
+    """Simula um usuário e devolve as medições da sessão.
+
+    Executada em um processo separado por ``executar_nivel``.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    pasta_app = os.path.dirname(os.path.abspath(arquivo_app))
+    if pasta_app not in sys.path:
+        sys.path.insert(0, pasta_app)
+
+    rng = np.random.default_rng(semente)
+    nomes, pesos = list(ACOES), np.array(list(ACOES.values()))
+
+    inicio = time.perf_counter()
+    app = AppTest.from_file(arquivo_app, default_timeout=tempo_limite).run()
+    carga_inicial = time.perf_counter() - inicio
+
+    latencias, cpu, erros = [], [], 0
+    for _ in range(acoes):
+        time.sleep(rng.exponential(pensamento))
+        _executar_acao(app, nomes[rng.choice(len(nomes), p=pesos / pesos.sum())], rng)
+
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        app.run()
+        latencias.append(time.perf_counter() - inicio)
+        cpu.append(time.process_time() - inicio_cpu)
+        erros += len(app.exception) > 0
+
+    return {
+        'carga_inicial': carga_inicial,
+        'latencias': latencias,
+        'cpu': cpu,
+        'erros': erros,
+        'memoria_mb': _memoria_residente_mb(),
+    }
+
+
+def executar_nivel(usuarios, arquivo_app, acoes, pensamento, semente):
+    """Executa ``usuarios`` sessões simultâneas e resume as medições."""
+    sementes = np.random.SeedSequence([semente, usuarios]).generate_state(usuarios)
+    with ProcessPoolExecutor(max_workers=usuarios, mp_context=get_context('spawn')) as executor:
+        sessoes = list(executor.map(
+            executar_sessao,
+            [arquivo_app] * usuarios, [acoes] * usuarios, [pensamento] * usuarios,
+            [int(valor) for valor in sementes]))
+
+    latencias = np.concatenate([sessao['latencias'] for sessao in sessoes]) * 1000
+    return {
+        'usuarios': usuarios,
+        'reexecucoes': len(latencias),
+        'erros': sum(sessao['erros'] for sessao in sessoes),
+        'latencia_ms': {f'p{percentil}': float(np.percentile(latencias, percentil))
+                        for percentil in PERCENTIS},
+        'carga_inicial_ms': float(np.median([sessao['carga_inicial'] for sessao in sessoes]) * 1000),
+        'cpu_ms_por_reexecucao': float(np.mean(np.concatenate(
+            [sessao['cpu'] for sessao in sessoes])) * 1000),
+        'memoria_mb_por_sessao': float(np.max([sessao['memoria_mb'] for sessao in sessoes])),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usuarios', default='1,2,4,8',
+                        help='níveis de concorrência, separados por vírgula')
+    parser.add_argument('--acoes', type=int, default=10, help='reexecuções por usuário')
+    parser.add_argument('--pensamento', type=float, default=1.0,
+                        help='tempo médio de reflexão entre ações, em segundos')
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='grava os resultados em JSON')
+    args = parser.parse_args(argv)
+
+    niveis = [int(valor) for valor in args.usuarios.split(',')]
+    print(f"{'usuários':>8} {'reexec.':>8} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'CPU ms':>8} {'RSS MB':>8} {'carga ms':>9}")
+
+    resultados = []
+    for usuarios in niveis:
+        nivel = executar_nivel(usuarios, args.app, args.acoes, args.pensamento, args.semente)
+        resultados.append(nivel)
+        latencia = nivel['latencia_ms']
+        print(f"{usuarios:>8} {nivel['reexecucoes']:>8} {nivel['erros']:>6} "
+              f"{latencia['p50']:>9.0f} {latencia['p95']:>9.0f} {latencia['p99']:>9.0f} "
+              f"{nivel['cpu_ms_por_reexecucao']:>8.0f} {nivel['memoria_mb_por_sessao']:>8.0f} "
+              f"{nivel['carga_inicial_ms']:>9.0f}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+    return 1 if any(nivel['erros'] for nivel in resultados) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Simula uma carteira de imóveis a partir de um CSV e grava a série agregada.
+
+Uso::
+
+    python -m ferramentas.carteira propriedades.csv [--prazo 30] [--saida agregado.csv]
+        [--propriedades por_propriedade.csv] [--corrigido] [--bloco 256]
+
+O CSV tem uma propriedade por linha, com colunas nomeadas como os parâmetros
+do simulador (``valor_imovel``, ``percentual_aluguel``, ...); colunas ausentes
+usam os valores padrão do simulador.
+
+Com ``--propriedades``, grava também uma linha por propriedade, na ordem do
+CSV de entrada, com a opção escolhida, o patrimônio final de cada opção e os
+meses em que uma opção ultrapassa outra (vazio se não ultrapassa no prazo).
+"""
+
+import argparse
+import contextlib
+import csv
+import sys
+import time
+
+import carteira
+from simulador import SimuladorImovel, SimuladorImovelCorrigido, formatar_moeda
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo')
+    parser.add_argument('--prazo', type=float, default=SimuladorImovel().prazo_simulacao,
+                        help='prazo da simulação em anos')
+    parser.add_argument('--saida', help='grava a série mensal agregada neste CSV')
+    parser.add_argument('--propriedades', help='grava o resultado de cada propriedade neste CSV')
+    parser.add_argument('--corrigido', action='store_true',
+                        help='investe o valor financiado, como em app_corrigido.py')
+    parser.add_argument('--bloco', type=int, default=256, help='propriedades por bloco')
+    args = parser.parse_args(argv)
+
+    classe = SimuladorImovelCorrigido if args.corrigido else SimuladorImovel
+    simulador = classe()
+
+    with contextlib.ExitStack() as pilha:
+        por_propriedade = None
+        if args.propriedades:
+            arquivo = pilha.enter_context(open(args.propriedades, 'w', newline='', encoding='utf-8'))
+            escritor = csv.writer(arquivo)
+
+            def por_propriedade(linhas):
+                if arquivo.tell() == 0:
+                    escritor.writerow(linhas)
+                escritor.writerows(zip(*(['' if valor != valor else valor for valor in coluna]
+                                         for coluna in linhas.values())))
+
+        inicio = time.perf_counter()
+        resultado = carteira.simular_carteira(
+            carteira.ler_carteira_csv(args.arquivo, simulador.obter_parametros()),
+            args.prazo,
+            investimento_inicial=simulador.investimento_inicial_financiada,
+            tamanho_bloco=args.bloco,
+            por_propriedade=por_propriedade
+        )
+        duracao = time.perf_counter() - inicio
+
+    print(f"{resultado['propriedades']} propriedades em {duracao:.2f} s")
+    for estrategia, quantidade in resultado['decisoes'].items():
+        print(f"  {estrategia:<18} {quantidade}")
+    print(f"Patrimônio final da carteira: {formatar_moeda(resultado['Patrimônio'][-1])}")
+
+    if args.saida:
+        colunas = ['Mês', *carteira.COLUNAS_AGREGADAS]
+        with open(args.saida, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            escritor.writerows(zip(*(resultado[coluna] for coluna in colunas)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Constrói o cubo de respostas usado pela interface para consultas instantâneas.
+
+Uso::
+
+    python -m ferramentas.construir_cubo [--passo-meses 1] [--saida cubo_respostas.npz]
+
+Por padrão o cubo guarda todos os meses, a resolução da simulação. Cubos
+com ``--passo-meses`` maior (12: valores anuais) são menores e servem a
+``cubo.consultar``, mas a interface os ignora e simula.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cubo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--passo-meses', type=int, default=1,
+                        help='intervalo, em meses, entre os pontos guardados (divisor de 12)')
+    parser.add_argument('--saida', default=cubo.CAMINHO_CUBO)
+    args = parser.parse_args(argv)
+
+    if args.passo_meses < 1 or 12 % args.passo_meses:
+        parser.error('--passo-meses deve ser um divisor de 12')
+
+    inicio = time.perf_counter()
+    tabelas = cubo.construir(passo_meses=args.passo_meses)
+    cubo.salvar(tabelas, args.saida)
+    duracao = time.perf_counter() - inicio
+
+    tamanho_kb = os.path.getsize(args.saida) / 1024
+    print(f"Cubo gravado em {args.saida} ({tamanho_kb:.0f} KB, {duracao:.2f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
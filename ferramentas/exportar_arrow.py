@@ -0,0 +1,66 @@
+"""Simula os cenários de um CSV e grava os resultados em um arquivo Arrow IPC (Feather).
+
+Uso::
+
+    python -m ferramentas.exportar_arrow cenarios.csv resultados.arrow [--prazo 30]
+        [--formato lista|longo] [--bloco 1024] [--corrigido]
+
+O CSV tem um cenário por linha, com colunas nomeadas como os parâmetros do
+simulador (``valor_imovel``, ``percentual_aluguel``, ``taxa_iptu``...);
+colunas ausentes usam os valores padrão do simulador. O prazo é comum a
+todo o arquivo. Os cenários são lidos, simulados e gravados em blocos de
+``--bloco``, um record batch por bloco (ver ``exportacao``).
+
+O arquivo pode ser lido sem cópia, por exemplo::
+
+    import pyarrow as pa
+    tabela = pa.ipc.open_file(pa.memory_map('resultados.arrow')).read_all()
+
+ou diretamente pelo DuckDB e pelo Polars (``pl.read_ipc(..., memory_map=True)``).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import exportacao
+from simulador import SimuladorImovel, SimuladorImovelCorrigido
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo')
+    parser.add_argument('saida')
+    parser.add_argument('--prazo', type=float, default=SimuladorImovel().prazo_simulacao,
+                        help='prazo da simulação em anos')
+    parser.add_argument('--formato', choices=exportacao.FORMATOS, default='lista',
+                        help='lista: uma linha por cenário; longo: uma linha por cenário e mês')
+    parser.add_argument('--bloco', type=int, default=exportacao.CENARIOS_POR_BLOCO,
+                        help='cenários por record batch')
+    parser.add_argument('--corrigido', action='store_true',
+                        help='investe o valor financiado, como em app_corrigido.py')
+    args = parser.parse_args(argv)
+
+    classe = SimuladorImovelCorrigido if args.corrigido else SimuladorImovel
+    simulador = classe()
+
+    inicio = time.perf_counter()
+    blocos = exportacao.ler_parametros_csv(args.arquivo, simulador.obter_parametros(), args.bloco)
+    linhas = exportacao.gravar_arrow(
+        args.saida,
+        exportacao.iterar_arrow(blocos, args.prazo, simulador.investimento_inicial_financiada,
+                                args.formato),
+        {'prazo_simulacao': args.prazo, 'formato': args.formato,
+         'investimento_inicial': simulador.investimento_inicial_financiada}
+    )
+    duracao = time.perf_counter() - inicio
+
+    tamanho = os.path.getsize(args.saida) / 2**20
+    print(f"{linhas} linhas ({args.formato}) em {args.saida}, {tamanho:,.1f} MiB, "
+          f"em {duracao:.2f} s ({tamanho / max(duracao, 1e-9):,.0f} MiB/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Compara as implementações rápidas com o laço de referência em parâmetros aleatórios.
+
+Uso::
+
+    python -m ferramentas.fuzz_diferencial [--casos 50] [--semente 0]
+        [--caminhos motor,blocos,extensao,valores_finais,cubo,amortizacao,simulador]
+        [--tolerancia 1e-9]
+    python -m ferramentas.fuzz_diferencial --caso '{"valor_imovel": 1e6, ...}'
+
+Cada caso sorteia os parâmetros ora nos valores dos controles da interface,
+ora em faixas mais largas (taxas negativas, prazos curtos e longos, 0% e 100%
+financiado), e também o investimento inicial da compra financiada (app.py ou
+app_corrigido.py). Em parte dos casos os custos e o IR são todos zero, o
+único cenário coberto pelo cubo. O resultado de ``referencia.SimuladorReferencia``
+é comparado coluna a coluna com cada caminho rápido, inclusive a fachada
+``SimuladorImovel``; o erro de cada coluna é relativo ao maior valor absoluto
+da coluna na referência.
+
+Casos divergentes são reduzidos: cada parâmetro é trocado pelo valor padrão
+do simulador ou por valores mais simples enquanto a divergência persistir,
+e a reprodução mínima é impressa no formato aceito por ``--caso``. O código
+de saída é 1 se alguma divergência for encontrada.
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import amortizacao
+import cubo
+import motor
+from referencia import SimuladorReferencia
+from simulador import DOMINIOS, SimuladorImovel
+
+# Parâmetros sorteados e suas faixas além dos controles: (mínimo, máximo) na
+# unidade do simulador
+FAIXAS_ESTENDIDAS = {
+    'valor_imovel': (1e3, 1e8),
+    'percentual_aluguel': (0.0, 0.03),
+    'taxa_valorizacao_imovel': (-0.10, 0.40),
+    'taxa_juros_investimento': (-0.10, 0.40),
+    'percentual_financiamento': (0.0, 1.0),
+    'taxa_juros_financiamento': (0.0, 0.40),
+    'prazo_financiamento': (1 / 12, 50.0),
+    'prazo_simulacao': (1, 60),
+    'taxa_iptu': (0.0, 0.05),
+    'taxa_manutencao': (0.0, 0.05),
+    'percentual_condominio': (0.0, 0.01),
+    'percentual_custos_aquisicao': (0.0, 0.15),
+    'aliquota_ir': (0.0, 0.5),
+}
+
+INVESTIMENTOS_INICIAIS = ('entrada', 'financiado')
+
+
+def _valor_grade(parametro, rng):
+    """Sorteia um dos valores permitidos pelo controle do parâmetro."""
+    dominio = DOMINIOS[parametro]
+    passos = int(round((dominio['maximo'] - dominio['minimo']) / dominio['passo']))
+    valor = dominio['minimo'] + rng.integers(0, passos + 1) * dominio['passo']
+    return valor / dominio['escala']
+
+
+def _valor_estendido(parametro, rng):
+    """Sorteia um valor na faixa estendida do parâmetro."""
+    minimo, maximo = FAIXAS_ESTENDIDAS[parametro]
+    if parametro == 'valor_imovel':
+        return float(math.exp(rng.uniform(math.log(minimo), math.log(maximo))))
+    if parametro == 'prazo_simulacao':
+        return int(rng.integers(minimo, maximo + 1))
+    if parametro == 'prazo_financiamento':
+        # Prazos em meses inteiros, como no simulador
+        return int(rng.integers(round(minimo * 12), round(maximo * 12) + 1)) / 12
+    return float(rng.uniform(minimo, maximo))
+
+
+def sortear_caso(rng, proporcao_grade=0.6, proporcao_sem_custos=0.4):
+    """Sorteia um caso: parâmetros do simulador mais o investimento inicial."""
+    caso = {}
+    for parametro in FAIXAS_ESTENDIDAS:
+        if rng.random() < proporcao_grade:
+            caso[parametro] = _valor_grade(parametro, rng)
+        else:
+            caso[parametro] = _valor_estendido(parametro, rng)
+    if rng.random() < proporcao_sem_custos:
+        caso.update(dict.fromkeys(motor.PARAMETROS_CUSTOS, 0.0))
+    caso['prazo_simulacao'] = int(round(caso['prazo_simulacao']))
+    caso['investimento_inicial'] = INVESTIMENTOS_INICIAIS[rng.integers(0, 2)]
+    return caso
+
+
+def _separar(caso):
+    """Separa o caso em (parâmetros do motor, prazo da simulação, investimento inicial)."""
+    parametros = {nome: caso[nome] for nome in motor.PARAMETROS + motor.PARAMETROS_CUSTOS}
+    return parametros, caso['prazo_simulacao'], caso['investimento_inicial']
+
+
+def executar_referencia(caso):
+    """Resultados do laço de referência: ``{estrategia: DataFrame}``."""
+    simulador = SimuladorReferencia()
+    simulador.investimento_inicial_financiada = caso['investimento_inicial']
+    simulador.definir_parametros(**{nome: caso[nome] for nome in FAIXAS_ESTENDIDAS})
+    return simulador.executar_simulacao()
+
+
+# Caminhos rápidos: cada um devolve {estrategia: {coluna: array 1D}} com a
+# coluna 'Mês' indicando os meses calculados, ou None se não se aplica ao caso.
+
+def _caminho_motor(caso):
+    lote = motor.simular_lote(*_separar(caso))
+    return {estrategia: {nome: valores[0] for nome, valores in colunas.items()}
+            for estrategia, colunas in lote.items()}
+
+
+def _caminho_blocos(caso):
+    blocos = list(motor.iterar_lote(*_separar(caso), meses_por_bloco=7))
+    return {estrategia: {nome: np.concatenate([bloco[estrategia][nome][0] for bloco in blocos])
+                         for nome in colunas}
+            for estrategia, colunas in blocos[0].items()}
+
+
+def _caminho_extensao(caso):
+    parametros, prazo_simulacao, investimento_inicial = _separar(caso)
+    meses = int(round(prazo_simulacao * 12))
+    estados = motor.novos_estados()
+    lote = motor.simular_lote(parametros, meses // 3 / 12, investimento_inicial, estados=estados)
+    for prazo in (2 * meses // 3 / 12, prazo_simulacao):
+        lote = motor.estender_lote(lote, estados, parametros, prazo, investimento_inicial)
+    return {estrategia: {nome: valores[0] for nome, valores in colunas.items()}
+            for estrategia, colunas in lote.items()}
+
+
+def _caminho_valores_finais(caso):
+    parametros, prazo_simulacao, investimento_inicial = _separar(caso)
+    finais = motor.valores_finais(parametros, prazo_simulacao, investimento_inicial)
+    mes = np.array([prazo_simulacao * 12.0])
+    return {estrategia: {'Mês': mes, **colunas} for estrategia, colunas in finais.items()}
+
+
+_tabelas_cubo = None
+
+
+def _caminho_cubo(caso):
+    global _tabelas_cubo
+    if _tabelas_cubo is None:
+        _tabelas_cubo = cubo.construir()
+    lote = cubo.consultar(*_separar(caso), cubo=_tabelas_cubo)
+    if lote is None:
+        return None
+    return {estrategia: {nome: valores[0] for nome, valores in colunas.items()}
+            for estrategia, colunas in lote.items()}
+
+
+def _caminho_amortizacao(caso):
+    parametros, prazo_simulacao, investimento_inicial = _separar(caso)
+    resultado = amortizacao.simular_amortizacao(
+        parametros, [amortizacao.politica()], prazo_simulacao, investimento_inicial)
+    colunas = {nome: valores[0, 0] for nome, valores in resultado.items()
+               if nome != 'Mês de Quitação'}
+    return {'compra_financiada': colunas}
+
+
+def _caminho_simulador(caso):
+    # Metade do prazo e depois o prazo todo: o segundo cálculo estende o
+    # horizonte guardado pela fachada em vez de recalcular do mês zero
+    simulador = SimuladorImovel()
+    simulador.investimento_inicial_financiada = caso['investimento_inicial']
+    simulador.definir_parametros(**{nome: caso[nome] for nome in FAIXAS_ESTENDIDAS})
+    for prazo in (max(caso['prazo_simulacao'] // 2, 1), caso['prazo_simulacao']):
+        simulador.definir_parametros(prazo_simulacao=prazo)
+        resultados = simulador.executar_simulacao()
+    return {estrategia: {nome: df[nome].to_numpy(dtype=float) for nome in df}
+            for estrategia, df in resultados.items()}
+
+
+CAMINHOS = {
+    'motor': _caminho_motor,
+    'blocos': _caminho_blocos,
+    'extensao': _caminho_extensao,
+    'valores_finais': _caminho_valores_finais,
+    'cubo': _caminho_cubo,
+    'amortizacao': _caminho_amortizacao,
+    'simulador': _caminho_simulador,
+}
+
+
+def comparar(referencia, rapido, tolerancia):
+    """Primeira divergência entre os resultados, ou ``None`` se concordam.
+
+    Colunas que a referência não tem (custos por componente, amortização
+    extra) são ignoradas.
+    """
+    for estrategia, colunas in rapido.items():
+        df = referencia[estrategia]
+        meses = np.rint(colunas['Mês']).astype(int)
+        for nome, valores in colunas.items():
+            if nome == 'Mês' or nome not in df:
+                continue
+            esperado = df[nome].to_numpy(dtype=float)
+            escala = max(1.0, float(np.max(np.abs(esperado))))
+            erro = np.abs(np.asarray(valores, dtype=float) - esperado[meses]) / escala
+            erro = np.where(np.isnan(erro), np.inf, erro)
+            if np.max(erro) > tolerancia:
+                indice = int(np.argmax(erro))
+                return {
+                    'estrategia': estrategia,
+                    'coluna': nome,
+                    'mes': int(meses[indice]),
+                    'esperado': float(esperado[meses[indice]]),
+                    'obtido': float(valores[indice]),
+                    'erro_relativo': float(erro[indice]),
+                }
+    return None
+
+
+def verificar(caso, caminho, tolerancia):
+    """Executa referência e caminho rápido; devolve a divergência ou ``None``."""
+    rapido = CAMINHOS[caminho](caso)
+    if rapido is None:
+        return None
+    return comparar(executar_referencia(caso), rapido, tolerancia)
+
+
+def _candidatos(parametro, valor):
+    """Valores para tentar no lugar de ``valor``, do mais simples ao menos simples."""
+    if parametro == 'investimento_inicial':
+        return ['entrada'] if valor != 'entrada' else []
+    if parametro == 'prazo_simulacao':
+        return [candidato for candidato in (1, valor // 2, valor - 1) if 0 < candidato < valor]
+    candidatos = [getattr(SimuladorImovel(), parametro)]
+    if parametro == 'prazo_financiamento':
+        candidatos += [prazo for prazo in (1 / 12, 1, round(valor), round(valor * 6) / 12) if prazo > 0]
+    elif parametro == 'valor_imovel':
+        candidatos += [round(valor, -3)]
+    else:
+        candidatos += [0.0, round(valor, 3)]
+    # Só valores mais simples que o atual, para que a redução sempre termine
+    if valor in candidatos:
+        candidatos = candidatos[:candidatos.index(valor)]
+    return candidatos
+
+
+def reduzir(caso, caminho, tolerancia):
+    """Simplifica o caso divergente enquanto a divergência persistir."""
+    divergencia = verificar(caso, caminho, tolerancia)
+    alterado = True
+    while alterado:
+        alterado = False
+        # O prazo da simulação primeiro: encurtá-lo acelera as tentativas seguintes
+        ordem = ['prazo_simulacao'] + [nome for nome in FAIXAS_ESTENDIDAS if nome != 'prazo_simulacao']
+        for parametro in ordem + ['investimento_inicial']:
+            for candidato in _candidatos(parametro, caso[parametro]):
+                tentativa = dict(caso, **{parametro: candidato})
+                nova = verificar(tentativa, caminho, tolerancia)
+                if nova is not None:
+                    caso, divergencia, alterado = tentativa, nova, True
+                    break
+    return caso, divergencia
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--casos', type=int, default=50)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--caminhos', default=','.join(CAMINHOS),
+                        help='caminhos rápidos a verificar, separados por vírgula')
+    parser.add_argument('--tolerancia', type=float, default=1e-9,
+                        help='erro máximo relativo ao maior valor absoluto da coluna')
+    parser.add_argument('--caso', help='verifica apenas este caso (JSON impresso numa reprodução)')
+    args = parser.parse_args(argv)
+
+    caminhos = args.caminhos.split(',')
+    desconhecidos = set(caminhos) - set(CAMINHOS)
+    if desconhecidos:
+        parser.error(f"caminhos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    if args.caso:
+        # Reproduções anteriores aos custos não os trazem: valem zero
+        casos = [{**dict.fromkeys(motor.PARAMETROS_CUSTOS, 0.0), **json.loads(args.caso)}]
+    else:
+        rng = np.random.default_rng(args.semente)
+        casos = [sortear_caso(rng) for _ in range(args.casos)]
+
+    inicio = time.perf_counter()
+    verificados = dict.fromkeys(caminhos, 0)
+    falhas = 0
+    for numero, caso in enumerate(casos, start=1):
+        referencia = executar_referencia(caso)
+        for caminho in caminhos:
+            rapido = CAMINHOS[caminho](caso)
+            if rapido is None:
+                continue
+            verificados[caminho] += 1
+            if comparar(referencia, rapido, args.tolerancia) is None:
+                continue
+
+            falhas += 1
+            minimo, divergencia = reduzir(caso, caminho, args.tolerancia)
+            print(f"[caso {numero}] {caminho} diverge da referência")
+            print(f"  {divergencia['estrategia']} / {divergencia['coluna']} no mês {divergencia['mes']}: "
+                  f"esperado {divergencia['esperado']:.10g}, obtido {divergencia['obtido']:.10g} "
+                  f"(erro relativo {divergencia['erro_relativo']:.2e})")
+            print(f"  reprodução: --caminhos {caminho} --caso '{json.dumps(minimo)}'")
+
+    duracao = time.perf_counter() - inicio
+    resumo = ', '.join(f"{caminho} {quantidade}" for caminho, quantidade in verificados.items())
+    print(f"{len(casos)} casos em {duracao:.1f} s; comparações por caminho: {resumo}; "
+          f"divergências: {falhas}")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
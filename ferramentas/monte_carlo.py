@@ -0,0 +1,129 @@
+"""Executa a simulação estocástica e informa quantis, tempo e memória.
+
+Uso::
+
+    python -m ferramentas.monte_carlo [--caminhos 100000] [--semente 0]
+        [--prazo 30] [--precisao 0.005] [--corrigido] [--verificar]
+        [--amostragem pseudoaleatoria|antitetica|sobol|hipercubo] [--controle]
+
+Imprime os percentis do patrimônio final de cada opção, a probabilidade de
+cada uma terminar com o maior patrimônio e o pico de memória alocada pelo
+NumPy durante a simulação (medido com ``tracemalloc``), que não depende do
+número de caminhos. Em seguida vêm as estimativas finais com erro padrão e
+o ganho de cada esquema de redução de variância (``--amostragem`` e
+``--controle``): o tamanho efetivo da amostra dividido pelo número de
+caminhos, ou seja, quantas vezes menos caminhos são necessários para a mesma
+precisão que a amostragem pseudoaleatória simples.
+
+Com ``--verificar``, os mesmos caminhos são simulados de novo guardando
+todas as séries, e os quantis do esboço são comparados com os exatos em
+todos os meses: o maior erro relativo deve ficar abaixo de ``--precisao``.
+Use poucos caminhos nesse modo, pois ele guarda a matriz completa.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import estocastico
+import motor
+from simulador import SimuladorImovel, SimuladorImovelCorrigido, formatar_moeda
+
+
+def erro_maximo(simulador, resultado, semente):
+    """Maior erro relativo dos quantis do esboço em relação aos exatos.
+
+    Considera apenas valores com módulo de pelo menos ``MINIMO_ESBOCO``,
+    faixa em que vale a garantia relativa.
+    """
+    parametros = simulador.obter_parametros()
+    meses = int(round(simulador.prazo_simulacao * 12))
+    caminhos = resultado['caminhos']
+    series = {estrategia: [] for estrategia in motor.ESTRATEGIAS}
+    for indice, rng in enumerate(estocastico.geradores(semente, caminhos)):
+        quantidade = min(estocastico.CAMINHOS_POR_SEMENTE,
+                         caminhos - indice * estocastico.CAMINHOS_POR_SEMENTE)
+        bloco = estocastico.simular_bloco(
+            parametros, simulador.prazo_simulacao, simulador.investimento_inicial_financiada,
+            estocastico.sortear_choques(rng, quantidade, meses, resultado['amostragem']))
+        for estrategia, valores in bloco.items():
+            series[estrategia].append(valores)
+
+    pior = 0.0
+    for estrategia, blocos in series.items():
+        ordenados = np.sort(np.concatenate(blocos), axis=0)
+        for indice, probabilidade in enumerate(resultado['probabilidades']):
+            exato = ordenados[int(np.floor(probabilidade * (caminhos - 1)))]
+            estimado = resultado['quantis'][estrategia][indice]
+            validos = np.abs(exato) >= estocastico.MINIMO_ESBOCO
+            if validos.any():
+                erro = np.abs(estimado - exato)[validos] / np.abs(exato)[validos]
+                pior = max(pior, float(erro.max()))
+    return pior
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--caminhos', type=int, default=100000)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--prazo', type=int, default=30, help='prazo da simulação, em anos')
+    parser.add_argument('--precisao', type=float, default=0.005,
+                        help='erro relativo máximo dos quantis')
+    parser.add_argument('--corrigido', action='store_true',
+                        help='investe o valor financiado, como o app_corrigido.py')
+    parser.add_argument('--amostragem', choices=estocastico.AMOSTRAGENS, default='pseudoaleatoria')
+    parser.add_argument('--controle', action='store_true',
+                        help='usa os fatores de crescimento como variáveis de controle')
+    parser.add_argument('--verificar', action='store_true',
+                        help='compara os quantis com os exatos (guarda todas as séries)')
+    args = parser.parse_args(argv)
+
+    simulador = SimuladorImovelCorrigido() if args.corrigido else SimuladorImovel()
+    simulador.definir_parametros(prazo_simulacao=args.prazo)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = estocastico.simular_monte_carlo(
+        simulador, caminhos=args.caminhos, semente=args.semente,
+        precisao_relativa=args.precisao, amostragem=args.amostragem, controle=args.controle)
+    resultado['amostragem'] = args.amostragem
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{args.caminhos} caminhos x {args.prazo * 12} meses em {duracao:.1f} s; "
+          f"pico de memória {pico / 2 ** 20:.0f} MB")
+    rotulos = '  '.join(f"{'P' + format(probabilidade * 100, '.0f'):>16}"
+                        for probabilidade in resultado['probabilidades'])
+    print(f"{'':<18}{rotulos}  {'vitórias':>9}")
+    for estrategia in motor.ESTRATEGIAS:
+        finais = '  '.join(f"{formatar_moeda(valor):>16}"
+                           for valor in resultado['quantis'][estrategia][:, -1])
+        vitorias = resultado['probabilidade_vitoria'][estrategia]
+        print(f"{estrategia:<18}{finais}  {vitorias:>8.1%}")
+
+    print(f"\n{'':<18}{'média final':>16} {'erro':>10} {'ganho':>7}  {'vitórias':>9} {'erro':>7} "
+          f"{'ganho':>7}  {'erro P5':>10} {'erro P95':>10}")
+    for estrategia, estimativa in resultado['estimativas'].items():
+        media, vitoria = estimativa['media'], estimativa['probabilidade_vitoria']
+        erros_quantis = dict(zip(resultado['probabilidades'], estimativa['erro_padrao_quantis']))
+        print(f"{estrategia:<18}{formatar_moeda(media['valor']):>16} "
+              f"{formatar_moeda(media['erro_padrao']):>10} {media['amostra_efetiva'] / args.caminhos:>6.1f}x  "
+              f"{vitoria['valor']:>8.1%} {vitoria['erro_padrao']:>7.2%} "
+              f"{vitoria['amostra_efetiva'] / args.caminhos:>6.1f}x  "
+              f"{formatar_moeda(erros_quantis.get(0.05, np.nan)):>10} "
+              f"{formatar_moeda(erros_quantis.get(0.95, np.nan)):>10}")
+
+    if args.verificar:
+        pior = erro_maximo(simulador, resultado, args.semente)
+        situacao = 'OK' if pior <= args.precisao else 'EXCEDEU'
+        print(f"Maior erro relativo dos quantis: {pior:.4%} (limite {args.precisao:.2%}) {situacao}")
+        return 0 if situacao == 'OK' else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
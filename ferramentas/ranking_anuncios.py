@@ -0,0 +1,83 @@
+"""Ranqueia anúncios de um CSV pela margem da compra sobre o aluguel.
+
+Uso::
+
+    python -m ferramentas.ranking_anuncios anuncios.csv [--quantidade 20] [--prazo 30]
+        [--relativa] [--corrigido] [--bloco 65536] [--saida ranking.csv]
+        [--coluna-preco preco] [--coluna-aluguel aluguel] [--coluna-bairro bairro]
+
+O CSV tem um anúncio por linha, com o preço pedido, o aluguel mensal pedido e
+o bairro; colunas com nomes de parâmetros do simulador (``taxa_iptu``,
+``percentual_condominio``...) substituem os padrões daquele anúncio. O
+arquivo é lido em blocos e apenas os ``--quantidade`` melhores anúncios de
+cada critério ficam em memória (ver ``anuncios``).
+
+Com ``--saida``, grava os rankings em um CSV, uma linha por posição e
+critério.
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+import anuncios
+from simulador import SimuladorImovel, SimuladorImovelCorrigido, formatar_moeda
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo')
+    parser.add_argument('--quantidade', type=int, default=20, help='anúncios em cada ranking')
+    parser.add_argument('--prazo', type=float, default=SimuladorImovel().prazo_simulacao,
+                        help='prazo da simulação em anos')
+    parser.add_argument('--relativa', action='store_true',
+                        help='ordena pela margem dividida pelo preço do anúncio')
+    parser.add_argument('--corrigido', action='store_true',
+                        help='investe o valor financiado, como em app_corrigido.py')
+    parser.add_argument('--bloco', type=int, default=anuncios.TAMANHO_BLOCO,
+                        help='anúncios lidos por bloco')
+    parser.add_argument('--saida', help='grava os rankings neste CSV')
+    for nome, coluna in anuncios.COLUNAS_ANUNCIO.items():
+        parser.add_argument(f'--coluna-{nome}', default=coluna, help=f'coluna do CSV com o {nome}')
+    args = parser.parse_args(argv)
+
+    classe = SimuladorImovelCorrigido if args.corrigido else SimuladorImovel
+    simulador = classe()
+    colunas = {nome: getattr(args, f'coluna_{nome}') for nome in anuncios.COLUNAS_ANUNCIO}
+
+    inicio = time.perf_counter()
+    resultado = anuncios.ranquear_anuncios(
+        anuncios.ler_anuncios_csv(args.arquivo, colunas, args.bloco),
+        args.prazo,
+        padroes=simulador.obter_parametros(),
+        quantidade=args.quantidade,
+        investimento_inicial=simulador.investimento_inicial_financiada,
+        relativa=args.relativa
+    )
+    duracao = time.perf_counter() - inicio
+
+    total = resultado['anuncios']
+    print(f"{total} anúncios em {duracao:.2f} s ({total / max(duracao, 1e-9):,.0f} por segundo); "
+          f"{resultado['descartados']} sem preço ou aluguel válidos")
+    for criterio, ranking in resultado['rankings'].items():
+        print(f"\n{criterio} sobre aluguel:")
+        for posicao, anuncio in enumerate(ranking, 1):
+            margem = (f"{anuncio['margem'] * 100:.1f}% do preço" if args.relativa
+                      else formatar_moeda(anuncio['margem']))
+            print(f"  {posicao:>3}. linha {anuncio['linha']:>9}  {str(anuncio['bairro']):<20} "
+                  f"{formatar_moeda(anuncio['preco']):>18} {formatar_moeda(anuncio['aluguel']):>14}  {margem}")
+
+    if args.saida:
+        with open(args.saida, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['criterio', 'posicao', 'linha', 'bairro', 'preco', 'aluguel', 'margem'])
+            for criterio, ranking in resultado['rankings'].items():
+                for posicao, anuncio in enumerate(ranking, 1):
+                    escritor.writerow([criterio, posicao, anuncio['linha'], anuncio['bairro'],
+                                       anuncio['preco'], anuncio['aluguel'], anuncio['margem']])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
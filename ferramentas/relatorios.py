@@ -0,0 +1,54 @@
+"""Gera um relatório HTML ou PDF por cenário de um CSV, sem a interface.
+
+Uso::
+
+    python -m ferramentas.relatorios cenarios.csv [--saida relatorios/] [--formato html|pdf]
+        [--processos N] [--corrigido]
+
+O CSV tem um cenário por linha, com colunas nomeadas como os parâmetros do
+simulador (``valor_imovel``, ``percentual_aluguel``, ``prazo_simulacao``...)
+e uma coluna ``cliente`` opcional; colunas ausentes usam os valores padrão
+do simulador. Todos os cenários são calculados antes e os relatórios são
+desenhados em ``--processos`` processos (padrão: um por processador).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import relatorios
+from simulador import SimuladorImovel, SimuladorImovelCorrigido
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivo')
+    parser.add_argument('--saida', default='relatorios', help='diretório dos relatórios')
+    parser.add_argument('--formato', choices=relatorios.FORMATOS, default='html')
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1,
+                        help='processos que desenham os relatórios')
+    parser.add_argument('--corrigido', action='store_true',
+                        help='investe o valor financiado, como em app_corrigido.py')
+    args = parser.parse_args(argv)
+
+    classe = SimuladorImovelCorrigido if args.corrigido else SimuladorImovel
+    simulador = classe()
+    padroes = dict(simulador.obter_parametros(), prazo_simulacao=simulador.prazo_simulacao)
+
+    inicio = time.perf_counter()
+    dados = relatorios.preparar_relatorios(relatorios.ler_cenarios_csv(args.arquivo, padroes),
+                                           simulador.investimento_inicial_financiada)
+    calculo = time.perf_counter() - inicio
+
+    caminhos = relatorios.gravar_relatorios(dados, args.saida, args.formato,
+                                            simulador.analisar_riscos_beneficios(), args.processos)
+    total = time.perf_counter() - inicio
+
+    print(f"{len(caminhos)} relatórios em {args.saida} em {total:.2f} s "
+          f"(cálculo {calculo:.2f} s; {len(caminhos) / max(total, 1e-9) * 60:,.0f} por minuto)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
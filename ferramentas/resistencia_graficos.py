@@ -0,0 +1,114 @@
+"""Teste de resistência do desenho de gráficos: a memória deve ficar estável.
+
+Uso::
+
+    python -m ferramentas.resistencia_graficos [--modo figura|conjunto|pyplot]
+        [--imagens 2000] [--limite-mb 20]
+
+Desenha repetidamente os gráficos estáticos do simulador, como em horas de
+reexecuções de um servidor, e acompanha a memória residente do processo. As
+primeiras ``--aquecimento`` imagens servem para carregar o matplotlib e
+preencher os caches de fontes; o crescimento é medido daí até o fim e o
+código de saída é 1 se passar de ``--limite-mb``.
+
+Modos: ``figura`` cria e libera uma figura por imagem (padrão do app);
+``conjunto`` reaproveita uma figura por tipo de gráfico
+(``SIMULADOR_REUTILIZAR_FIGURAS=1``); ``pyplot`` reproduz o comportamento
+antigo, com ``plt.subplots`` sem fechar a figura, para comparação.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import graficos
+import motor
+from simulador import SimuladorImovel
+
+# Tipos de gráfico exibidos pelo app no modo estático
+TITULOS = (
+    'Evolução do Patrimônio ao Longo do Tempo',
+    'Evolução do Valor do Imóvel',
+    'Comparação dos Investimentos',
+)
+
+
+def memoria_residente_mb():
+    """Memória residente atual do processo, em MB."""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            paginas = int(arquivo.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        # Sem /proc (macOS): usa o pico, que também revela crescimento contínuo
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20
+
+
+def _imagem_pyplot(series, titulo, rotulo_y):
+    """Comportamento anterior: figura do pyplot nunca fechada."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=graficos.TAMANHO_FIGURA)
+    graficos.desenhar(ax, series, titulo, rotulo_y)
+    return graficos.serializar(fig)
+
+
+def _series(rng):
+    """Séries de patrimônio de um cenário aleatório, como no app."""
+    simulador = SimuladorImovel()
+    simulador.definir_parametros(
+        taxa_valorizacao_imovel=rng.uniform(0, 0.15),
+        taxa_juros_investimento=rng.uniform(0, 0.15),
+        prazo_simulacao=int(rng.integers(1, 11)) * 5
+    )
+    lote = motor.simular_lote(simulador.obter_parametros(), simulador.prazo_simulacao)
+    return {estrategia: (colunas['Mês'][0] / 12, colunas['Patrimônio'][0])
+            for estrategia, colunas in lote.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modo', choices=('figura', 'conjunto', 'pyplot'), default='figura')
+    parser.add_argument('--imagens', type=int, default=2000)
+    parser.add_argument('--aquecimento', type=int, default=200)
+    parser.add_argument('--limite-mb', type=float, default=20.0,
+                        help='crescimento máximo da memória após o aquecimento')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.modo == 'pyplot':
+        desenhar = _imagem_pyplot
+    else:
+        reutilizar = args.modo == 'conjunto'
+
+        def desenhar(series, titulo, rotulo_y):
+            return graficos.imagem_png(series, titulo, rotulo_y, reutilizar=reutilizar)
+
+    rng = np.random.default_rng(args.semente)
+    intervalo = max(1, args.imagens // 10)
+    inicio = time.perf_counter()
+    base = None
+    for indice in range(1, args.imagens + 1):
+        desenhar(_series(rng), TITULOS[indice % len(TITULOS)], 'Valor (R$)')
+        if indice == args.aquecimento:
+            base = memoria_residente_mb()
+        if indice % intervalo == 0:
+            print(f"{indice:>7} imagens  {memoria_residente_mb():8.1f} MB  "
+                  f"{(time.perf_counter() - inicio) / indice * 1000:6.1f} ms/imagem")
+
+    base = base if base is not None else memoria_residente_mb()
+    crescimento = memoria_residente_mb() - base
+    situacao = 'OK' if crescimento <= args.limite_mb else 'EXCEDEU'
+    print(f"Crescimento após o aquecimento: {crescimento:.1f} MB "
+          f"(limite {args.limite_mb:.0f} MB) {situacao}")
+    return 0 if situacao == 'OK' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Preparação dos gráficos do simulador.
+
+Há dois modos de exibição: imagem estática desenhada no servidor com o
+matplotlib e gráfico interativo desenhado no navegador. As imagens estáticas
+usam figuras próprias (``matplotlib.figure.Figure``), nunca o pyplot, cujo
+gerenciador global mantém vivas as figuras não fechadas e faz a memória de um
+servidor de longa duração crescer a cada execução. No modo interativo as
+séries são reduzidas no servidor com o algoritmo LTTB (Largest-Triangle-Three-
+Buckets), de modo que o volume de dados enviado fica limitado por
+``PONTOS_MAXIMOS`` independentemente do prazo da simulação ou do número de
+séries sobrepostas.
+
+As séries são passadas como um dicionário ``{rótulo: (anos, valores)}``.
+"""
+
+import io
+import os
+import threading
+
+import numpy as np
+
+# Total de pontos enviados ao navegador por gráfico, somando todas as séries
+PONTOS_MAXIMOS = 600
+
+# Mínimo de pontos por série (primeiro, último e ao menos um intermediário)
+PONTOS_MINIMOS_SERIE = 3
+
+TAMANHO_FIGURA = (10, 6)
+
+# Reaproveitar uma figura por tipo de gráfico no modo estático (ConjuntoFiguras)
+REUTILIZAR_FIGURAS = os.environ.get('SIMULADOR_REUTILIZAR_FIGURAS', '') == '1'
+
+
+# Formatador para exibir valores em reais
+def formatar_eixo_y(valor, pos):
+    if valor >= 1e6:
+        return f'R$ {valor/1e6:.1f}M'
+    else:
+        return f'R$ {valor/1e3:.0f}K'
+
+
+def lttb(x, y, pontos):
+    """Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada balde intermediário, o ponto
+    que forma o maior triângulo com o ponto escolhido no balde anterior e a
+    média do balde seguinte. Se a série já tem ``pontos`` ou menos, devolve
+    todos os índices.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+
+    # Limites dos baldes intermediários (excluem o primeiro e o último ponto)
+    limites = np.floor(np.linspace(1, n - 1, pontos - 1)).astype(int)
+    inicio_baldes = limites[:-1]
+    fim_baldes = limites[1:]
+
+    # Médias de cada balde, usadas como terceiro vértice do triângulo
+    somas_x = np.add.reduceat(x[:n - 1], inicio_baldes)
+    somas_y = np.add.reduceat(y[:n - 1], inicio_baldes)
+    tamanhos = fim_baldes - inicio_baldes
+    medias_x = np.append(somas_x / tamanhos, x[-1])
+    medias_y = np.append(somas_y / tamanhos, y[-1])
+
+    indices = np.empty(pontos, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+    for balde, (inicio, fim) in enumerate(zip(inicio_baldes, fim_baldes)):
+        xa, ya = x[anterior], y[anterior]
+        xc, yc = medias_x[balde + 1], medias_y[balde + 1]
+        areas = np.abs((xa - xc) * (y[inicio:fim] - ya) - (xa - x[inicio:fim]) * (yc - ya))
+        anterior = inicio + int(np.argmax(areas))
+        indices[balde + 1] = anterior
+    return indices
+
+
+def dados_interativos(series, pontos_maximos=PONTOS_MAXIMOS):
+    """Monta um DataFrame longo (Anos, Valor, Série) com as séries reduzidas.
+
+    O orçamento de pontos é dividido igualmente entre as séries.
+    """
+    import pandas as pd
+
+    pontos_serie = max(PONTOS_MINIMOS_SERIE, pontos_maximos // max(1, len(series)))
+    partes = []
+    for rotulo, (anos, valores) in series.items():
+        anos = np.asarray(anos, dtype=float)
+        valores = np.asarray(valores, dtype=float)
+        indices = lttb(anos, valores, pontos_serie)
+        partes.append(pd.DataFrame({
+            'Anos': anos[indices],
+            'Valor': valores[indices],
+            'Série': rotulo,
+        }))
+    return pd.concat(partes, ignore_index=True)
+
+
+def grafico_interativo(dados, rotulo_y, marcos):
+    """Gráfico Altair das séries de ``dados_interativos`` com linhas verticais nos ``marcos``.
+
+    ``marcos`` é uma lista de ``(anos, texto)``, como os cruzamentos entre
+    estratégias; o texto aparece ao lado da linha e ao passar o mouse.
+    """
+    import altair as alt
+    import pandas as pd
+
+    linhas = alt.Chart(dados).mark_line().encode(
+        x=alt.X('Anos:Q', title='Anos'),
+        y=alt.Y('Valor:Q', title=rotulo_y),
+        color=alt.Color('Série:N', title=None),
+        tooltip=['Série', alt.Tooltip('Anos:Q', format='.2f'), alt.Tooltip('Valor:Q', format=',.2f')]
+    )
+    tabela_marcos = pd.DataFrame(marcos, columns=['Anos', 'Marco'])
+    regras = alt.Chart(tabela_marcos).mark_rule(strokeDash=[4, 4], color='gray').encode(
+        x='Anos:Q', tooltip=['Marco', alt.Tooltip('Anos:Q', format='.2f')])
+    textos = alt.Chart(tabela_marcos).mark_text(
+        align='left', baseline='top', dx=4, dy=4, angle=0, color='gray', fontSize=11
+    ).encode(x='Anos:Q', y=alt.value(0), text='Marco')
+    return alt.layer(linhas, regras, textos)
+
+
+def desenhar_marcos(ax, marcos):
+    """Desenha os ``marcos`` como linhas verticais anotadas e devolve os artistas criados.
+
+    Quem reaproveita os eixos pode remover os artistas devolvidos e desenhar
+    os marcos do próximo gráfico sem redesenhar as séries.
+    """
+    artistas = []
+    for anos, texto in marcos:
+        artistas.append(ax.axvline(anos, color='gray', linestyle=':', linewidth=1))
+        artistas.append(ax.annotate(texto, (anos, 1), xycoords=('data', 'axes fraction'),
+                                    xytext=(3, -3), textcoords='offset points', rotation=90,
+                                    va='top', ha='left', fontsize=8, color='dimgray'))
+    return artistas
+
+
+def desenhar(ax, series, titulo, rotulo_y, marcos=()):
+    """Desenha as séries nos eixos no estilo do simulador.
+
+    ``series`` mapeia cada rótulo da legenda para ``(anos, valores)``. Os
+    eixos podem ser de uma figura nova ou reaproveitada (ver
+    ``ConjuntoFiguras``). ``marcos`` opcionais, como em ``grafico_interativo``, viram linhas
+    verticais anotadas.
+    """
+    from matplotlib.ticker import FuncFormatter
+
+    for rotulo, (anos, valores) in series.items():
+        ax.plot(anos, valores, label=rotulo, linewidth=2)
+
+    desenhar_marcos(ax, marcos)
+
+    ax.set_xlabel('Anos')
+    ax.set_ylabel(rotulo_y)
+    ax.set_title(titulo)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend()
+    ax.yaxis.set_major_formatter(FuncFormatter(formatar_eixo_y))
+
+
+def serializar(fig):
+    """Grava a figura em PNG com as mesmas opções do ``st.pyplot``."""
+    imagem = io.BytesIO()
+    fig.savefig(imagem, format='png', dpi=200, bbox_inches='tight')
+    return imagem.getvalue()
+
+
+def figura_matplotlib(series, titulo, rotulo_y, marcos=()):
+    """Desenha as séries em uma figura do matplotlib no estilo do simulador.
+
+    A figura é criada sem o pyplot e não fica registrada em nenhum estado
+    global: é liberada assim que deixa de ser referenciada.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=TAMANHO_FIGURA)
+    desenhar(fig.subplots(), series, titulo, rotulo_y, marcos)
+    return fig
+
+
+class ConjuntoFiguras:
+    """Reaproveita uma figura por tipo de gráfico em vez de criar uma a cada execução.
+
+    Cada tipo (identificado pelo título) tem sua figura e seus eixos, limpos e
+    redesenhados a cada uso sob um lock, pois as sessões do Streamlit rodam
+    em threads do mesmo processo. A quantidade de figuras vivas fica limitada
+    ao número de tipos de gráfico.
+    """
+
+    def __init__(self):
+        self._figuras = {}
+        self._lock = threading.Lock()
+
+    def _obter(self, chave):
+        with self._lock:
+            if chave not in self._figuras:
+                from matplotlib.figure import Figure
+
+                fig = Figure(figsize=TAMANHO_FIGURA)
+                self._figuras[chave] = (fig, fig.subplots(), threading.Lock())
+            return self._figuras[chave]
+
+    def imagem_png(self, series, titulo, rotulo_y, marcos=()):
+        """Redesenha a figura do tipo ``titulo`` e devolve o PNG."""
+        fig, ax, lock = self._obter(titulo)
+        with lock:
+            ax.clear()
+            desenhar(ax, series, titulo, rotulo_y, marcos)
+            return serializar(fig)
+
+
+_conjunto_figuras = ConjuntoFiguras()
+
+
+def imagem_png(series, titulo, rotulo_y, reutilizar=REUTILIZAR_FIGURAS, marcos=()):
+    """Desenha as séries e devolve a imagem PNG, sem manter figuras vivas.
+
+    Com ``reutilizar`` a figura vem de um ``ConjuntoFiguras`` compartilhado;
+    caso contrário, uma figura nova é criada, serializada e liberada.
+    """
+    if reutilizar:
+        return _conjunto_figuras.imagem_png(series, titulo, rotulo_y, marcos)
+    fig = figura_matplotlib(series, titulo, rotulo_y, marcos)
+    try:
+        return serializar(fig)
+    finally:
+        fig.clear()
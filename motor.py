@@ -0,0 +1,641 @@
+"""Motor vetorizado do simulador: avalia lotes de cenários de uma só vez.
+
+As funções deste módulo calculam as três opções sobre arrays do NumPy com
+formato (cenários, meses + 1). Cada parâmetro pode ser um escalar ou um array
+unidimensional; todos são difundidos para o mesmo número de cenários. O prazo
+da simulação é comum a todo o lote.
+
+Cada opção é um pipeline de componentes de fluxo de caixa (aluguel,
+prestações, custos de propriedade, condomínio, custos de aquisição). Um
+componente devolve as saídas mensais que retira do investimento e as colunas
+que quer exibir; as saídas de todos os componentes são somadas e aplicadas à
+recorrência do investimento em uma única passada vetorizada. A tributação
+dos rendimentos entra na mesma passada, como redução da taxa mensal.
+
+As colunas devolvidas usam os mesmos nomes dos DataFrames do simulador.
+"""
+
+import numpy as np
+
+import duais
+
+ESTRATEGIAS = ('aluguel', 'compra_vista', 'compra_financiada')
+
+PARAMETROS = (
+    'valor_imovel',
+    'percentual_aluguel',
+    'taxa_juros_investimento',
+    'taxa_juros_financiamento',
+    'taxa_valorizacao_imovel',
+    'percentual_financiamento',
+    'prazo_financiamento',
+)
+
+# Custos e impostos opcionais; zero reproduz o modelo original do simulador
+PARAMETROS_CUSTOS = (
+    'taxa_iptu',                    # fração anual do valor do imóvel, paga pelo proprietário
+    'taxa_manutencao',              # fração anual do valor do imóvel, paga pelo proprietário
+    'percentual_condominio',        # fração mensal do valor do imóvel, paga por quem mora
+    'percentual_custos_aquisicao',  # ITBI, escritura e registro, pagos no mês zero
+    'aliquota_ir',                  # alíquota sobre os rendimentos do investimento
+)
+
+
+# Parâmetros contínuos, em relação aos quais gradientes_finais deriva; os
+# prazos são arredondados para meses e não têm derivada
+PARAMETROS_CONTINUOS = tuple(nome for nome in PARAMETROS + PARAMETROS_CUSTOS
+                             if nome != 'prazo_financiamento')
+
+
+def _como_float(valor):
+    """Array de floats, preservando números duais (ver ``duais``)."""
+    return valor if isinstance(valor, duais.Dual) else np.asarray(valor, dtype=float)
+
+
+def taxa_mensal(taxa_anual):
+    """Converte uma taxa anual em taxa mensal equivalente."""
+    return (1 + _como_float(taxa_anual)) ** (1/12) - 1
+
+
+def preparar_parametros(parametros):
+    """Difunde os parâmetros do lote para colunas de formato (cenários, 1).
+
+    Custos ausentes em ``parametros`` valem zero.
+    """
+    nomes = PARAMETROS + PARAMETROS_CUSTOS
+    valores = np.broadcast_arrays(*[np.asarray(parametros.get(nome, 0.0), dtype=float)
+                                    for nome in nomes])
+    return {nome: np.atleast_1d(valor).reshape(-1, 1)
+            for nome, valor in zip(nomes, valores)}
+
+
+def _recorrencia_investimento(inicial, crescimento, saidas):
+    """Resolve ``x[m] = x[m-1] * (1 + taxa[m]) - saidas[m]`` para todos os meses.
+
+    ``x[0] = inicial - saidas[0]`` e ``crescimento[m]`` é o produto dos
+    fatores ``1 + taxa`` até o mês ``m``. Usa a forma descontada ``x[m] =
+    crescimento[m] * (x[0] - soma(saidas[k] / crescimento[k]))``, calculada
+    com uma soma acumulada em vez de um laço mês a mês.
+    """
+    return crescimento * (inicial - np.cumsum(saidas / crescimento, axis=1))
+
+
+def _crescimento_acumulado(taxas):
+    """Produto acumulado de ``1 + taxas`` por linha, com o mês zero valendo 1."""
+    fatores = 1 + taxas
+    fatores[:, 0] = 1
+    return np.cumprod(fatores, axis=1)
+
+
+def taxa_investimento_liquida(p):
+    """Taxa mensal do investimento descontado o IR sobre os rendimentos.
+
+    ``p`` são os parâmetros de ``preparar_parametros``; o resultado tem
+    formato (cenários, 1).
+    """
+    return taxa_mensal(p['taxa_juros_investimento']) * (1 - p['aliquota_ir'])
+
+
+def _sem_mes_zero(fluxo, mes):
+    """Cópia do fluxo mensal com o mês zero zerado (nada é pago no mês zero)."""
+    fluxo = fluxo.copy()
+    if mes[0] == 0:
+        fluxo[:, 0] = 0
+    return fluxo
+
+
+def _acumulado(contexto, nome, valores):
+    """Soma acumulada mês a mês, continuando a do bloco anterior quando há estado."""
+    acumulado = np.cumsum(valores, axis=1)
+    estado = contexto['estado']
+    if estado is not None:
+        if nome in estado['acumulados']:
+            acumulado += estado['acumulados'][nome]
+        estado['acumulados'][nome] = acumulado[:, -1:]
+    return acumulado
+
+
+def _investimento(inicial, contexto, saidas):
+    """Saldo do investimento mês a mês (ver ``_recorrencia_investimento``).
+
+    Com estado, os blocos seguintes ao primeiro partem do saldo do último mês
+    do bloco anterior, com o crescimento contado a partir dele.
+    """
+    crescimento = contexto['crescimento_investimento']
+    estado = contexto['estado']
+    if estado is None:
+        return _recorrencia_investimento(inicial, crescimento, saidas)
+    if 'investimento' in estado:
+        inicial = estado['investimento']
+        crescimento = crescimento / estado['crescimento']
+    investimento = _recorrencia_investimento(inicial, crescimento, saidas)
+    estado['investimento'] = investimento[:, -1:]
+    estado['crescimento'] = contexto['crescimento_investimento'][:, -1:]
+    return investimento
+
+
+# Componentes de fluxo de caixa. Recebem o contexto do lote (parâmetros, meses
+# e valor do imóvel mês a mês) e devolvem (saídas mensais, colunas). Os meses
+# do contexto podem ser um bloco que não começa no mês zero (ver iterar_lote).
+
+def componente_aluguel(contexto):
+    """Aluguel mensal, que acompanha a valorização do imóvel."""
+    aluguel = contexto['valor_imovel'] * contexto['p']['percentual_aluguel']
+    saidas = _sem_mes_zero(aluguel, contexto['mes'])
+    return saidas, {
+        'Aluguel Mensal': aluguel,
+        'Aluguel Acumulado': _acumulado(contexto, 'Aluguel Acumulado', saidas),
+    }
+
+
+def componente_prestacoes(contexto):
+    """Prestações do financiamento pelo Sistema de Amortização Constante (SAC)."""
+    p, mes = contexto['p'], contexto['mes']
+    valor_financiado = p['valor_imovel'] * p['percentual_financiamento']
+    meses_financiamento = np.round(p['prazo_financiamento'] * 12)
+    amortizacao_mensal = valor_financiado / meses_financiamento
+
+    # Saldo devedor e prestação só existem durante o período de financiamento
+    em_financiamento = (mes >= 1) & (mes <= meses_financiamento)
+    saldo_devedor = np.where(mes <= meses_financiamento,
+                             valor_financiado - amortizacao_mensal * mes, 0.0)
+    saldo_anterior = valor_financiado - amortizacao_mensal * (mes - 1)
+    juros = np.where(em_financiamento,
+                     saldo_anterior * taxa_mensal(p['taxa_juros_financiamento']), 0.0)
+    prestacao = np.where(em_financiamento, amortizacao_mensal + juros, 0.0)
+
+    return prestacao, {
+        'Saldo Devedor': saldo_devedor,
+        'Prestação': prestacao,
+        'Juros Pagos': juros,
+        'Juros Acumulados': _acumulado(contexto, 'Juros Acumulados', juros),
+    }
+
+
+def componente_custos_propriedade(contexto):
+    """IPTU e manutenção do proprietário, proporcionais ao valor atual do imóvel."""
+    p = contexto['p']
+    custos = _sem_mes_zero(contexto['valor_imovel'] * (p['taxa_iptu'] + p['taxa_manutencao']) / 12,
+                           contexto['mes'])
+    return custos, {'Custos Mensais': custos}
+
+
+def componente_condominio(contexto):
+    """Condomínio, pago por quem mora no imóvel (proprietário ou inquilino)."""
+    condominio = _sem_mes_zero(contexto['valor_imovel'] * contexto['p']['percentual_condominio'],
+                               contexto['mes'])
+    return condominio, {'Custos Mensais': condominio}
+
+
+def componente_custos_aquisicao(contexto):
+    """ITBI, escritura e registro, pagos uma única vez no mês zero."""
+    p = contexto['p']
+    custos = np.zeros_like(contexto['valor_imovel'])
+    if contexto['mes'][0] == 0:
+        custos[:, :1] = p['valor_imovel'] * p['percentual_custos_aquisicao']
+    return custos, {}
+
+
+COMPONENTES = {
+    'aluguel': (componente_aluguel, componente_condominio),
+    'compra_vista': (componente_custos_aquisicao, componente_custos_propriedade,
+                     componente_condominio),
+    'compra_financiada': (componente_prestacoes, componente_custos_aquisicao,
+                          componente_custos_propriedade, componente_condominio),
+}
+
+
+def executar_componentes(componentes, contexto):
+    """Soma as saídas de todos os componentes e reúne suas colunas.
+
+    ``contexto`` vem de ``criar_contexto``. Devolve ``(saidas, colunas)``:
+    as saídas mensais somadas, no formato do valor do imóvel do contexto, e
+    as colunas dos componentes; colunas com o mesmo nome em mais de um
+    componente são somadas.
+    """
+    saidas = np.zeros_like(contexto['valor_imovel'])
+    colunas = {}
+    for componente in componentes:
+        saida, colunas_componente = componente(contexto)
+        saidas += saida
+        for nome, valores in colunas_componente.items():
+            colunas[nome] = colunas[nome] + valores if nome in colunas else valores
+    return saidas, colunas
+
+
+def criar_contexto(p, meses, trajetoria=None, estado=None):
+    """Contexto do lote repassado aos componentes de fluxo de caixa.
+
+    ``p`` são os parâmetros de ``preparar_parametros``. O contexto é um
+    dicionário com ``'p'``, os meses (``'mes'``), o valor do imóvel e o
+    crescimento acumulado do investimento mês a mês (``'valor_imovel'`` e
+    ``'crescimento_investimento'``, formato (cenários, meses)) e o
+    ``'estado'``.
+
+    Sem ``trajetoria`` as taxas são constantes. Com ela, as taxas mensais de
+    cada caminho vêm de ``trajetoria['valorizacao']`` e
+    ``trajetoria['rendimento']`` (formato (caminhos, meses + 1), mês zero
+    ignorado) e o lote passa a ter uma linha por caminho.
+
+    ``estado`` opcional (ver ``iterar_lote``) restringe o contexto ao bloco
+    de meses de ``estado['inicio']`` a ``meses`` e guarda o que passa de um
+    bloco para o seguinte.
+    """
+    inicio = 0 if estado is None else estado['inicio']
+    mes = np.arange(inicio, meses + 1)
+    if trajetoria is None:
+        valor_imovel = p['valor_imovel'] * (1 + taxa_mensal(p['taxa_valorizacao_imovel'])) ** mes
+        crescimento = (1 + taxa_investimento_liquida(p)) ** mes
+    else:
+        valor_imovel = p['valor_imovel'] * _crescimento_acumulado(
+            trajetoria['valorizacao'][:, :meses + 1])[:, inicio:]
+        crescimento = _crescimento_acumulado(
+            trajetoria['rendimento'][:, :meses + 1] * (1 - p['aliquota_ir']))[:, inicio:]
+    return {'p': p, 'mes': mes, 'valor_imovel': valor_imovel,
+            'crescimento_investimento': crescimento, 'estado': estado}
+
+
+def calcular_aluguel_lote(p, meses, componentes=COMPONENTES['aluguel'], trajetoria=None,
+                          estado=None):
+    """Evolução patrimonial da opção de aluguel para um lote de cenários."""
+    contexto = criar_contexto(p, meses, trajetoria, estado)
+    saidas, colunas = executar_componentes(componentes, contexto)
+    investimento = _investimento(p['valor_imovel'], contexto, saidas)
+
+    return {
+        'Mês': np.broadcast_to(contexto['mes'].astype(float), investimento.shape),
+        'Patrimônio': investimento,
+        'Investimento': investimento,
+        **colunas,
+        'Valor Imóvel': contexto['valor_imovel'],
+    }
+
+
+def calcular_compra_vista_lote(p, meses, componentes=COMPONENTES['compra_vista'],
+                               trajetoria=None, estado=None):
+    """Evolução patrimonial da opção de compra à vista para um lote de cenários.
+
+    Todo o capital vai para o imóvel; os custos do proprietário formam um
+    saldo de investimento negativo que rende à mesma taxa (custo de
+    oportunidade). Sem custos, o investimento é zero.
+    """
+    contexto = criar_contexto(p, meses, trajetoria, estado)
+    saidas, colunas = executar_componentes(componentes, contexto)
+    investimento = _investimento(0.0, contexto, saidas)
+
+    return {
+        'Mês': np.broadcast_to(contexto['mes'].astype(float), investimento.shape),
+        'Patrimônio': contexto['valor_imovel'] + investimento,
+        'Valor Imóvel': contexto['valor_imovel'],
+        'Investimento': investimento,
+        **colunas,
+    }
+
+
+def calcular_compra_financiada_lote(p, meses, investimento_inicial='entrada',
+                                    componentes=COMPONENTES['compra_financiada'],
+                                    trajetoria=None, estado=None):
+    """Evolução patrimonial da opção de compra financiada (SAC) para um lote.
+
+    ``investimento_inicial`` escolhe o capital investido no mês zero:
+    ``'entrada'`` (app.py) ou ``'financiado'`` (app_corrigido.py).
+    """
+    contexto = criar_contexto(p, meses, trajetoria, estado)
+    saidas, colunas = executar_componentes(componentes, contexto)
+
+    valor_financiado = p['valor_imovel'] * p['percentual_financiamento']
+    if investimento_inicial == 'financiado':
+        inicial = valor_financiado
+    else:
+        inicial = p['valor_imovel'] - valor_financiado
+
+    # Como as saídas nunca são negativas, uma vez esgotado o investimento
+    # permanece zerado; o max(0, ...) mês a mês equivale a um único corte.
+    # Entre blocos passa o saldo antes do corte, que preserva essa equivalência.
+    investimento = np.maximum(_investimento(inicial, contexto, saidas), 0.0)
+
+    patrimonio = contexto['valor_imovel'] - colunas['Saldo Devedor'] + investimento
+    if contexto['mes'][0] == 0:
+        patrimonio[:, 0] = p['valor_imovel'][:, 0]
+
+    return {
+        'Mês': np.broadcast_to(contexto['mes'].astype(float), patrimonio.shape),
+        'Patrimônio': patrimonio,
+        'Valor Imóvel': contexto['valor_imovel'],
+        'Saldo Devedor': colunas.pop('Saldo Devedor'),
+        'Investimento': investimento,
+        **colunas,
+    }
+
+
+def novos_estados(estrategias=ESTRATEGIAS):
+    """Estados vazios, no mês zero, para ``simular_lote`` e ``iterar_lote`` continuarem depois.
+
+    Cada estado guarda o primeiro mês ainda não calculado (``'inicio'``) e o
+    que a recorrência precisa para continuar dali: o saldo e o crescimento do
+    investimento e as somas acumuladas de aluguel e juros no último mês
+    calculado. O saldo devedor e os demais valores dependem apenas do mês.
+    """
+    return {estrategia: {'inicio': 0, 'acumulados': {}} for estrategia in estrategias}
+
+
+def _avancar_lote(p, fim, investimento_inicial, estrategias, trajetoria, estados):
+    """Calcula os meses de ``estados[estrategia]['inicio']`` a ``fim`` e avança os estados."""
+    calculos = {
+        'aluguel': calcular_aluguel_lote,
+        'compra_vista': calcular_compra_vista_lote,
+        'compra_financiada': lambda p, fim, trajetoria, estado: calcular_compra_financiada_lote(
+            p, fim, investimento_inicial, trajetoria=trajetoria, estado=estado),
+    }
+    bloco = {}
+    for estrategia in estrategias:
+        bloco[estrategia] = calculos[estrategia](
+            p, fim, trajetoria=trajetoria, estado=estados[estrategia])
+        estados[estrategia]['inicio'] = fim + 1
+    return bloco
+
+
+def simular_lote(parametros, prazo_simulacao, investimento_inicial='entrada',
+                 estrategias=ESTRATEGIAS, trajetoria=None, estados=None):
+    """Executa as estratégias pedidas para todos os cenários do lote.
+
+    ``parametros`` mapeia cada nome de ``PARAMETROS`` para um escalar ou
+    array. ``trajetoria`` opcional traz taxas mensais de valorização e de
+    rendimento por caminho (ver ``criar_contexto``), usadas no lugar das taxas
+    anuais constantes. Retorna ``{estrategia: {coluna: array (cenários,
+    meses + 1)}}``.
+
+    Com ``estados`` (de ``novos_estados``), calcula apenas os meses a partir
+    de onde os estados pararam e os deixa no fim do prazo, de modo que uma
+    chamada seguinte com um prazo maior continua dali (ver ``estender_lote``).
+    """
+    p = preparar_parametros(parametros)
+    meses = int(round(prazo_simulacao * 12))
+    if estados is not None:
+        return _avancar_lote(p, meses, investimento_inicial, estrategias, trajetoria, estados)
+    resultados = {}
+    if 'aluguel' in estrategias:
+        resultados['aluguel'] = calcular_aluguel_lote(p, meses, trajetoria=trajetoria)
+    if 'compra_vista' in estrategias:
+        resultados['compra_vista'] = calcular_compra_vista_lote(p, meses, trajetoria=trajetoria)
+    if 'compra_financiada' in estrategias:
+        resultados['compra_financiada'] = calcular_compra_financiada_lote(
+            p, meses, investimento_inicial, trajetoria=trajetoria)
+    return resultados
+
+
+def iterar_lote(parametros, prazo_simulacao, investimento_inicial='entrada',
+                estrategias=ESTRATEGIAS, meses_por_bloco=12, trajetoria=None, estados=None):
+    """Gera o resultado de ``simular_lote`` em blocos consecutivos de meses.
+
+    O primeiro bloco vai do mês zero a ``meses_por_bloco``; os seguintes têm
+    ``meses_por_bloco`` meses cada (o último pode ser menor). Cada bloco é
+    ``{estrategia: {coluna: array (cenários, meses do bloco)}}``, com as
+    mesmas colunas de ``simular_lote``; concatenados, reproduzem o lote
+    inteiro, a menos de arredondamento. De um bloco para o seguinte passam
+    apenas o saldo e o crescimento do investimento e as somas acumuladas do
+    último mês, de modo que a memória depende do tamanho do bloco, não do
+    prazo, e quem consome os blocos pode exibi-los ou gravá-los à medida que
+    chegam.
+
+    Com ``estados`` (ver ``simular_lote``), os blocos começam onde os
+    estados pararam, e os estados avançam a cada bloco gerado.
+    """
+    p = preparar_parametros(parametros)
+    meses = int(round(prazo_simulacao * 12))
+    if estados is None:
+        estados = novos_estados(estrategias)
+
+    inicio = min(estados[estrategia]['inicio'] for estrategia in estrategias)
+    while inicio <= meses:
+        fim = min(max(inicio, 1) + meses_por_bloco - 1, meses)
+        yield _avancar_lote(p, fim, investimento_inicial, estrategias, trajetoria, estados)
+        inicio = fim + 1
+
+
+def concatenar_lotes(anterior, seguinte, estados):
+    """Lote com os meses de ``seguinte`` depois dos de ``anterior``.
+
+    ``anterior`` e ``seguinte`` têm as mesmas estratégias e colunas, e
+    ``estados`` são os estados (ver ``novos_estados``) que acompanham
+    ``anterior``. As colunas ficam em arrays com folga de meses, guardados
+    nos estados: enquanto há folga, os meses novos são escritos depois dos
+    anteriores sem copiá-los; quando falta, a capacidade ao menos dobra, de
+    modo que extensões sucessivas copiam os meses já calculados poucas vezes.
+    """
+    resultado = {}
+    for estrategia, colunas in anterior.items():
+        reservas = estados[estrategia].setdefault('reservas', {})
+        resultado[estrategia] = {}
+        for coluna, valores in colunas.items():
+            novos = seguinte[estrategia][coluna]
+            usados = valores.shape[1]
+            total = usados + novos.shape[1]
+            reserva = reservas.get(coluna)
+            if reserva is None or valores.base is not reserva or reserva.shape[1] < total:
+                reserva = np.empty((len(valores), max(total, 2 * usados)))
+                reserva[:, :usados] = valores
+                reservas[coluna] = reserva
+            reserva[:, usados:total] = novos
+            resultado[estrategia][coluna] = reserva[:, :total]
+    return resultado
+
+
+def recortar_lote(lote, prazo_simulacao):
+    """Lote restrito aos meses 0 a ``prazo_simulacao`` (vistas, sem cópia)."""
+    meses = int(round(prazo_simulacao * 12))
+    return {estrategia: {coluna: valores[:, :meses + 1] for coluna, valores in colunas.items()}
+            for estrategia, colunas in lote.items()}
+
+
+def estender_lote(lote, estados, parametros, prazo_simulacao, investimento_inicial='entrada',
+                  trajetoria=None):
+    """Estende um lote de ``simular_lote`` com ``estados`` até ``prazo_simulacao``.
+
+    Apenas os meses além do último já calculado são simulados, partindo dos
+    estados, de modo que o custo é proporcional ao acréscimo do prazo, e os
+    estados avançam até o novo fim. Se o lote já cobre o prazo, é devolvido
+    como está; use ``recortar_lote`` para servir prazos menores. Os
+    parâmetros devem ser os mesmos que geraram o lote.
+    """
+    meses = int(round(prazo_simulacao * 12))
+    estrategias = tuple(lote)
+    for estrategia in estrategias:
+        if lote[estrategia]['Mês'].shape[1] != estados[estrategia]['inicio']:
+            raise ValueError("O lote não termina no mês em que os estados pararam; "
+                             "estenda o lote completo, não um recorte.")
+    if all(estados[estrategia]['inicio'] > meses for estrategia in estrategias):
+        return lote
+    novos = simular_lote(parametros, prazo_simulacao, investimento_inicial, estrategias,
+                         trajetoria, estados)
+    return concatenar_lotes(lote, novos, estados)
+
+
+def _soma_geometrica(logaritmo, termos):
+    """Soma de ``exp(k * logaritmo)`` para k = 1..termos, em forma fechada."""
+    logaritmo, termos = np.broadcast_arrays(logaritmo, termos)
+    nulo = logaritmo == 0
+    seguro = np.where(nulo, 1.0, logaritmo)
+    soma = np.exp(seguro) * np.expm1(termos * seguro) / np.expm1(seguro)
+    # Em zero a soma vale ``termos``; o termo de primeira ordem, nulo ali, só
+    # contribui para a derivada quando ``logaritmo`` é um número dual
+    return np.where(nulo, termos + logaritmo * termos * (termos + 1) / 2, soma)
+
+
+def _soma_aritmetico_geometrica(logaritmo, termos):
+    """Soma de ``(k - 1) * exp(k * logaritmo)`` para k = 1..termos, em forma fechada.
+
+    Com ``w = exp(logaritmo)``, a soma é ``w * T``, onde ``T = soma(j * w^j)``
+    para j = 0..termos-1. Perto de ``w = 1`` a forma fechada de ``T`` perde
+    precisão por cancelamento e é trocada pela série de Taylor em
+    ``logaritmo`` (erro relativo abaixo de 1e-12 nos dois lados do limite).
+    """
+    logaritmo, termos = np.broadcast_arrays(logaritmo, termos)
+    pequeno = np.abs(logaritmo) * termos < 1e-3
+    seguro = np.where(pequeno, 1.0, logaritmo)
+    ultimo = termos - 1
+
+    # T = w / (1 - w) * (soma(w^j, j = 0..K-2) - (K - 1) * w^(K-1))
+    parcial = np.expm1(ultimo * seguro) / np.expm1(seguro)
+    fechada = -np.exp(seguro) / np.expm1(seguro) * (parcial - ultimo * np.exp(ultimo * seguro))
+
+    # Somas de potências j^p para j = 0..N, com N = K - 1
+    n = ultimo
+    potencia_1 = n * (n + 1) / 2
+    potencia_2 = n * (n + 1) * (2 * n + 1) / 6
+    potencia_3 = potencia_1 ** 2
+    potencia_4 = n * (n + 1) * (2 * n + 1) * (3 * n ** 2 + 3 * n - 1) / 30
+    serie = (potencia_1 + logaritmo * potencia_2 + logaritmo ** 2 / 2 * potencia_3
+             + logaritmo ** 3 / 6 * potencia_4)
+
+    soma = np.exp(logaritmo) * np.where(pequeno, serie, fechada)
+    return np.where(termos > 0, soma, 0.0)
+
+
+def valores_finais(parametros, prazo_simulacao, investimento_inicial='entrada'):
+    """Valores do último mês de cada estratégia, em forma fechada.
+
+    Equivale à última linha de ``simular_lote``, mas com custo independente
+    do prazo: o valor do imóvel cresce geometricamente; aluguel, condomínio e
+    custos do proprietário acompanham o imóvel e formam uma soma geométrica
+    descontada; as prestações SAC decrescem linearmente e formam uma soma
+    aritmético-geométrica até o fim do financiamento ou do horizonte. O
+    investimento da compra financiada é cortado em zero uma única vez, como
+    em ``calcular_compra_financiada_lote``.
+
+    ``prazo_simulacao`` pode ser um array, com um horizonte por cenário.
+    Retorna ``{estrategia: {coluna: array (cenários,)}}`` com ``'Patrimônio'``,
+    ``'Investimento'`` e ``'Valor Imóvel'``; a compra financiada traz também
+    ``'Saldo Devedor'`` e a ``'Prestação Máxima'`` paga até o horizonte.
+    """
+    nomes = PARAMETROS + PARAMETROS_CUSTOS
+    valores = np.broadcast_arrays(*[_como_float(parametros.get(nome, 0.0)) for nome in nomes],
+                                  np.asarray(prazo_simulacao, dtype=float))
+    valores = [np.atleast_1d(valor).ravel() for valor in valores]
+    p = dict(zip(nomes, valores[:-1]))
+    meses = np.round(valores[-1] * 12)
+
+    valor = p['valor_imovel']
+    log_imovel = np.log1p(taxa_mensal(p['taxa_valorizacao_imovel']))
+    log_investimento = np.log1p(taxa_mensal(p['taxa_juros_investimento']) * (1 - p['aliquota_ir']))
+    crescimento_investimento = np.exp(meses * log_investimento)
+    valor_imovel = valor * np.exp(meses * log_imovel)
+
+    # Valor presente, por real de imóvel, de uma saída que acompanha o imóvel nos meses 1..M
+    fator_imovel = _soma_geometrica(log_imovel - log_investimento, meses)
+    condominio = p['percentual_condominio']
+    custos_proprietario = (p['taxa_iptu'] + p['taxa_manutencao']) / 12 + condominio
+    custos_aquisicao = valor * p['percentual_custos_aquisicao']
+
+    investimento_aluguel = crescimento_investimento * valor * (
+        1 - (p['percentual_aluguel'] + condominio) * fator_imovel)
+
+    investimento_vista = crescimento_investimento * (
+        -custos_aquisicao - valor * custos_proprietario * fator_imovel)
+
+    # Prestações SAC: P_k = A + (F - A (k - 1)) i, pagas nos meses 1..min(M, n)
+    valor_financiado = valor * p['percentual_financiamento']
+    meses_financiamento = np.round(p['prazo_financiamento'] * 12)
+    amortizacao = valor_financiado / meses_financiamento
+    juros_mensal = taxa_mensal(p['taxa_juros_financiamento'])
+    meses_pagos = np.minimum(meses, meses_financiamento)
+    prestacoes_descontadas = (
+        (amortizacao + valor_financiado * juros_mensal)
+        * _soma_geometrica(-log_investimento, meses_pagos)
+        - amortizacao * juros_mensal * _soma_aritmetico_geometrica(-log_investimento, meses_pagos))
+
+    if investimento_inicial == 'financiado':
+        inicial = valor_financiado
+    else:
+        inicial = valor - valor_financiado
+    investimento_financiada = np.maximum(crescimento_investimento * (
+        inicial - custos_aquisicao - prestacoes_descontadas
+        - valor * custos_proprietario * fator_imovel), 0.0)
+    saldo_devedor = np.where(meses <= meses_financiamento,
+                             valor_financiado - amortizacao * meses, 0.0)
+    patrimonio_financiada = np.where(
+        meses > 0, valor_imovel - saldo_devedor + investimento_financiada, valor)
+
+    # As prestações variam linearmente: a maior é a primeira ou a última paga
+    prestacao_maxima = np.where(meses_pagos >= 1, amortizacao + juros_mensal * np.maximum(
+        valor_financiado, valor_financiado - amortizacao * (meses_pagos - 1)), 0.0)
+
+    return {
+        'aluguel': {
+            'Patrimônio': investimento_aluguel,
+            'Investimento': investimento_aluguel,
+            'Valor Imóvel': valor_imovel,
+        },
+        'compra_vista': {
+            'Patrimônio': valor_imovel + investimento_vista,
+            'Investimento': investimento_vista,
+            'Valor Imóvel': valor_imovel,
+        },
+        'compra_financiada': {
+            'Patrimônio': patrimonio_financiada,
+            'Investimento': investimento_financiada,
+            'Valor Imóvel': valor_imovel,
+            'Saldo Devedor': saldo_devedor,
+            'Prestação Máxima': prestacao_maxima,
+        },
+    }
+
+
+def gradientes_finais(parametros, prazo_simulacao, investimento_inicial='entrada',
+                      variaveis=PARAMETROS_CONTINUOS):
+    """Patrimônio final de cada estratégia e suas derivadas exatas, em uma só passada.
+
+    Avalia ``valores_finais`` com números duais (diferenciação automática em
+    modo direto) semeados em cada parâmetro de ``variaveis``. Onde o
+    investimento da compra financiada se esgota, o corte em zero tem
+    derivada zero, sem o ruído de diferenças finitas em torno do corte.
+
+    Returns:
+        ``{estrategia: {'Patrimônio': array (cenários,), 'Gradiente':
+        {parametro: array (cenários,)}}}``, com a derivada do patrimônio
+        final em relação a cada parâmetro na unidade do simulador (por
+        exemplo, reais por unidade de taxa anual).
+    """
+    semeados = duais.semear({nome: parametros.get(nome, 0.0) for nome in variaveis})
+    finais = valores_finais(dict(parametros, **semeados), prazo_simulacao, investimento_inicial)
+    resultado = {}
+    for estrategia, colunas in finais.items():
+        valor, derivadas = duais.separar(colunas['Patrimônio'], len(variaveis))
+        resultado[estrategia] = {'Patrimônio': valor, 'Gradiente': dict(zip(variaveis, derivadas))}
+    return resultado
+
+
+def patrimonios_finais(parametros, prazo_simulacao, investimento_inicial='entrada'):
+    """Patrimônio final de cada estratégia, com prazo de simulação por cenário.
+
+    Atalho para ``valores_finais``. Retorna ``{estrategia: array (cenários,)}``.
+    """
+    finais = valores_finais(parametros, prazo_simulacao, investimento_inicial)
+    return {estrategia: colunas['Patrimônio'] for estrategia, colunas in finais.items()}
+
+
+def para_dataframe(colunas, cenario=0):
+    """Materializa um cenário de uma estratégia do lote como DataFrame."""
+    import pandas as pd
+
+    return pd.DataFrame({nome: np.asarray(valores[cenario]) for nome, valores in colunas.items()})
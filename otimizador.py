@@ -0,0 +1,141 @@
+"""Otimização do percentual e do prazo do financiamento.
+
+Responde à pergunta "quanto financiar e por quanto tempo?": mantém os demais
+parâmetros do simulador fixos, avalia toda a grade permitida pelos controles
+da interface em um único lote vetorizado (pelos valores finais em forma
+fechada, ``motor.valores_finais``) e escolhe a combinação com maior
+patrimônio final na compra financiada.
+"""
+
+import numpy as np
+
+import motor
+
+# Valores permitidos pelos controles "Percentual Financiado" e "Prazo do Financiamento"
+PERCENTUAIS_PADRAO = np.arange(10, 91, 5) / 100
+PRAZOS_PADRAO = np.arange(5, 36)
+
+LIMITES_PERCENTUAL = (0.10, 0.90)
+LIMITES_PRAZO = (5, 35)
+
+
+def _avaliar(simulador, percentuais, prazos, renda_mensal, comprometimento_maximo):
+    """Avalia a grade percentuais × prazos em um lote e aplica a restrição de renda.
+
+    Retorna ``(patrimonio, prestacao_maxima)`` com formato
+    (len(percentuais), len(prazos)); combinações inviáveis recebem NaN no
+    patrimônio.
+    """
+    grade_percentual, grade_prazo = np.meshgrid(percentuais, prazos, indexing='ij')
+    parametros = simulador.obter_parametros()
+    parametros['percentual_financiamento'] = grade_percentual.ravel()
+    parametros['prazo_financiamento'] = grade_prazo.ravel()
+
+    resultado = motor.valores_finais(
+        parametros, simulador.prazo_simulacao,
+        investimento_inicial=simulador.investimento_inicial_financiada
+    )['compra_financiada']
+
+    patrimonio = resultado['Patrimônio'].reshape(grade_percentual.shape)
+    prestacao_maxima = resultado['Prestação Máxima'].reshape(grade_percentual.shape)
+
+    if renda_mensal is not None:
+        inviavel = prestacao_maxima > renda_mensal * comprometimento_maximo
+        patrimonio = np.where(inviavel, np.nan, patrimonio)
+
+    return patrimonio, prestacao_maxima
+
+
+def _melhor_indice(patrimonio):
+    """Índice (i, j) do maior patrimônio viável, ou None se nenhum for viável."""
+    if np.all(np.isnan(patrimonio)):
+        return None
+    return np.unravel_index(np.nanargmax(patrimonio), patrimonio.shape)
+
+
+def otimizar_financiamento(simulador, renda_mensal=None, comprometimento_maximo=0.30,
+                           percentuais=None, prazos=None, refinamentos=0,
+                           pontos_refinamento=9):
+    """Encontra o percentual financiado e o prazo que maximizam o patrimônio final.
+
+    Args:
+        simulador: instância de ``SimuladorImovel`` com os demais parâmetros.
+        renda_mensal: renda usada na restrição de comprometimento; ``None``
+            desativa a restrição.
+        comprometimento_maximo: fração máxima da renda que a maior prestação
+            pode consumir.
+        percentuais, prazos: grade inicial; por padrão, os valores permitidos
+            pelos controles da interface (10–90% de 5 em 5, 5–35 anos).
+        refinamentos: rodadas de refinamento em torno do melhor ponto,
+            tratando percentual e prazo (em meses) como contínuos.
+        pontos_refinamento: pontos por eixo em cada rodada de refinamento.
+
+    Returns:
+        Dicionário com o melhor ``percentual_financiamento``,
+        ``prazo_financiamento`` (anos), ``patrimonio_final`` e
+        ``prestacao_maxima``, além da grade inicial avaliada (``percentuais``,
+        ``prazos``, ``grade_patrimonio``, ``grade_prestacao``). Os valores do
+        melhor ponto são ``None`` quando nenhuma combinação é viável.
+    """
+    percentuais = PERCENTUAIS_PADRAO if percentuais is None else np.asarray(percentuais, dtype=float)
+    prazos = PRAZOS_PADRAO if prazos is None else np.asarray(prazos, dtype=float)
+
+    grade_patrimonio, grade_prestacao = _avaliar(
+        simulador, percentuais, prazos, renda_mensal, comprometimento_maximo)
+
+    resultado = {
+        'percentual_financiamento': None,
+        'prazo_financiamento': None,
+        'patrimonio_final': None,
+        'prestacao_maxima': None,
+        'percentuais': percentuais,
+        'prazos': prazos,
+        'grade_patrimonio': grade_patrimonio,
+        'grade_prestacao': grade_prestacao,
+    }
+
+    indice = _melhor_indice(grade_patrimonio)
+    if indice is None:
+        return resultado
+
+    melhor_percentual = percentuais[indice[0]]
+    melhor_prazo = prazos[indice[1]]
+    melhor_patrimonio = grade_patrimonio[indice]
+    melhor_prestacao = grade_prestacao[indice]
+
+    # Refinamento grosso-fino: cada rodada avalia uma grade menor em torno do
+    # melhor ponto, com metade da largura da janela anterior.
+    passo_percentual = np.diff(percentuais).min() if len(percentuais) > 1 else 0.05
+    passo_prazo = np.diff(prazos).min() if len(prazos) > 1 else 1.0
+    for _ in range(refinamentos):
+        candidatos_percentual = np.clip(
+            np.linspace(melhor_percentual - passo_percentual, melhor_percentual + passo_percentual,
+                        pontos_refinamento),
+            *LIMITES_PERCENTUAL)
+        candidatos_prazo = np.clip(
+            np.round(np.linspace(melhor_prazo - passo_prazo, melhor_prazo + passo_prazo,
+                                 pontos_refinamento) * 12) / 12,
+            *LIMITES_PRAZO)
+        candidatos_percentual = np.unique(candidatos_percentual)
+        candidatos_prazo = np.unique(candidatos_prazo)
+
+        patrimonio, prestacao = _avaliar(
+            simulador, candidatos_percentual, candidatos_prazo, renda_mensal,
+            comprometimento_maximo)
+        indice = _melhor_indice(patrimonio)
+        if indice is not None and patrimonio[indice] > melhor_patrimonio:
+            melhor_percentual = candidatos_percentual[indice[0]]
+            melhor_prazo = candidatos_prazo[indice[1]]
+            melhor_patrimonio = patrimonio[indice]
+            melhor_prestacao = prestacao[indice]
+
+        passo_percentual /= 2
+        passo_prazo /= 2
+
+    resultado.update({
+        'percentual_financiamento': float(melhor_percentual),
+        'prazo_financiamento': float(melhor_prazo),
+        'patrimonio_final': float(melhor_patrimonio),
+        'prestacao_maxima': float(melhor_prestacao),
+    })
+    return resultado
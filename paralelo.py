@@ -0,0 +1,131 @@
+"""Execução em blocos por várias threads dentro do próprio processo.
+
+As operações pesadas do motor (ufuncs, ``cumsum``, ``cumprod`` e reduções do
+NumPy) liberam o GIL, de modo que blocos de cenários ou de caminhos podem ser
+avaliados ao mesmo tempo por threads, sem o custo de iniciar processos a cada
+reexecução do Streamlit. Os executores são criados uma vez por número de
+trabalhadores e reaproveitados.
+
+Cada bloco escreve sua parte em arrays alocados antes da execução, ou a
+devolve para ser acumulada na ordem dos blocos (``mapear_blocos``), e
+qualquer sorteio usa o gerador do próprio bloco (derivado com
+``SeedSequence.spawn``), de modo que o resultado não depende do número de
+threads nem da ordem em que os blocos terminam.
+
+O número máximo de trabalhadores vem da variável de ambiente
+``SIMULADOR_TRABALHADORES`` (padrão: número de processadores, até
+``TRABALHADORES_MAXIMOS``); ``1`` executa tudo na thread que chamou.
+"""
+
+import collections
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import motor
+
+TRABALHADORES_MAXIMOS = 8
+
+TRABALHADORES = int(os.environ.get('SIMULADOR_TRABALHADORES', '0')) or min(
+    os.cpu_count() or 1, TRABALHADORES_MAXIMOS)
+
+# Cenários por bloco em simular_lote: grande o bastante para diluir o custo
+# de despacho, pequeno o bastante para as colunas de um bloco caberem no cache
+CENARIOS_POR_BLOCO = 256
+
+_executores = {}
+_trava_executores = threading.Lock()
+
+
+def _executor(trabalhadores):
+    """Executor compartilhado com ``trabalhadores`` threads."""
+    with _trava_executores:
+        if trabalhadores not in _executores:
+            _executores[trabalhadores] = ThreadPoolExecutor(
+                max_workers=trabalhadores, thread_name_prefix='simulador')
+        return _executores[trabalhadores]
+
+
+def executar_blocos(funcao, blocos, trabalhadores=None):
+    """Chama ``funcao(indice)`` para cada bloco e espera todas as chamadas.
+
+    ``funcao`` deve escrever seu resultado em estruturas já alocadas,
+    indexadas pelo bloco. Com um trabalhador ou um bloco, executa em
+    sequência na thread atual. A primeira exceção de um bloco é propagada.
+    """
+    trabalhadores = min(trabalhadores or TRABALHADORES, blocos)
+    if trabalhadores <= 1:
+        for indice in range(blocos):
+            funcao(indice)
+        return
+    for _ in _executor(trabalhadores).map(funcao, range(blocos)):
+        pass
+
+
+def mapear_blocos(funcao, blocos, trabalhadores=None):
+    """Gera ``funcao(indice)`` de cada bloco, na ordem dos blocos.
+
+    Para resultados que devem ser acumulados em ordem fixa. No máximo duas
+    vezes ``trabalhadores`` blocos ficam em execução ou à espera de serem
+    consumidos, de modo que a memória não cresce com o número de blocos.
+    Com um trabalhador ou um bloco, executa em sequência na thread atual.
+    """
+    trabalhadores = min(trabalhadores or TRABALHADORES, blocos)
+    if trabalhadores <= 1:
+        for indice in range(blocos):
+            yield funcao(indice)
+        return
+    executor = _executor(trabalhadores)
+    pendentes = collections.deque()
+    for indice in range(blocos):
+        pendentes.append(executor.submit(funcao, indice))
+        if len(pendentes) >= 2 * trabalhadores:
+            yield pendentes.popleft().result()
+    while pendentes:
+        yield pendentes.popleft().result()
+
+
+def simular_lote(parametros, prazo_simulacao, investimento_inicial='entrada',
+                 estrategias=motor.ESTRATEGIAS, trajetoria=None,
+                 cenarios_por_bloco=CENARIOS_POR_BLOCO, trabalhadores=None):
+    """Mesmo resultado de ``motor.simular_lote``, com os cenários divididos entre threads.
+
+    Os parâmetros (e a ``trajetoria``, se houver) são fatiados em blocos de
+    ``cenarios_por_bloco`` linhas; o primeiro bloco define as colunas, e os
+    demais escrevem nas mesmas colunas já alocadas para o lote inteiro.
+    """
+    p = motor.preparar_parametros(parametros)
+    linhas = len(next(iter(p.values())))
+    if trajetoria is not None:
+        linhas = max(linhas, len(trajetoria['valorizacao']))
+
+    def fatiar(inicio, fim):
+        bloco = {nome: valor[:, 0] if len(valor) == 1 else valor[inicio:fim, 0]
+                 for nome, valor in p.items()}
+        caminhos = None if trajetoria is None else {
+            nome: taxas[inicio:fim] for nome, taxas in trajetoria.items()}
+        return motor.simular_lote(bloco, prazo_simulacao, investimento_inicial, estrategias, caminhos)
+
+    blocos = -(-linhas // cenarios_por_bloco)
+    primeiro = fatiar(0, cenarios_por_bloco)
+    if blocos == 1:
+        return primeiro
+
+    resultado = {}
+    for estrategia, colunas in primeiro.items():
+        resultado[estrategia] = {}
+        for coluna, valores in colunas.items():
+            resultado[estrategia][coluna] = np.empty((linhas,) + valores.shape[1:], valores.dtype)
+            resultado[estrategia][coluna][:len(valores)] = valores
+
+    def executar(indice):
+        inicio = (indice + 1) * cenarios_por_bloco
+        fim = min(inicio + cenarios_por_bloco, linhas)
+        for estrategia, colunas in fatiar(inicio, fim).items():
+            for coluna, valores in colunas.items():
+                resultado[estrategia][coluna][inicio:fim] = valores
+
+    executar_blocos(executar, blocos - 1, trabalhadores)
+    return resultado
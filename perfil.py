@@ -0,0 +1,174 @@
+"""Captura de perfil de uma execução completa da página, sob demanda.
+
+Quando um usuário relata lentidão com certos parâmetros, a execução dele pode
+ser medida no próprio servidor: com ``?perfil`` no endereço da página (uma
+única execução) ou com ``SIMULADOR_PERFIL=1`` no ambiente (todas as
+execuções completas), ``app.main`` roda a página dentro de ``Captura``.
+
+A captura combina um perfilador por amostragem, uma thread que lê a pilha da
+thread do script a cada ``INTERVALO_AMOSTRAGEM`` segundos com
+``sys._current_frames``, e o ``tracemalloc``. Em ``SIMULADOR_PERFIL_DIR``
+(padrão: ``perfis/`` ao lado deste arquivo) são gravados, com um nome que
+identifica os parâmetros da simulação:
+
+* ``.folded``: pilhas no formato "empilhado" (uma pilha por linha, funções
+  separadas por ``;``, seguida do número de amostras), aceito por
+  ``flamegraph.pl``, speedscope e similares para desenhar o gráfico de chamas;
+* ``.txt``: duração, funções com mais amostras (próprias e acumuladas) e os
+  locais que mais alocaram memória;
+* ``.json``: os parâmetros da simulação e o resumo da captura.
+
+Desligada, a captura não custa nada além de consultar o ambiente e os
+parâmetros do endereço: este módulo nem é importado.
+"""
+
+import collections
+import datetime
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+DIRETORIO_PADRAO = os.environ.get(
+    'SIMULADOR_PERFIL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfis')
+)
+
+# Período de amostragem, em segundos
+INTERVALO_AMOSTRAGEM = 0.002
+
+# Quantidade de linhas nos rankings do relatório
+LINHAS_RELATORIO = 25
+
+# Quadros guardados por alocação: o relatório agrupa pela linha que alocou,
+# e cada quadro a mais encarece todas as alocações durante a captura
+QUADROS_ALOCACAO = 1
+
+# O tracemalloc é global ao processo: capturas simultâneas (sessões
+# distintas) o compartilham, ligado pela primeira e desligado pela última
+_trava_tracemalloc = threading.Lock()
+_capturas_ativas = 0
+_iniciou_tracemalloc = False
+
+
+def _nome_quadro(quadro):
+    codigo = quadro.f_code
+    modulo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+    return f"{modulo}:{codigo.co_name}:{codigo.co_firstlineno}"
+
+
+class Captura:
+    """Gerenciador de contexto que mede a thread atual por amostragem e com ``tracemalloc``.
+
+    Com capturas simultâneas, o pico de memória e as alocações são do
+    processo inteiro, desde o início da mais antiga ainda ativa.
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.pilhas = collections.Counter()
+        self.duracao = 0.0
+        self.pico_memoria = 0
+        self.alocacoes = None
+        self._alvo = None
+        self._parar = threading.Event()
+        self._amostrador = None
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self._alvo)
+            pilha = []
+            while quadro is not None:
+                pilha.append(_nome_quadro(quadro))
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def __enter__(self):
+        global _capturas_ativas, _iniciou_tracemalloc
+        with _trava_tracemalloc:
+            if _capturas_ativas == 0:
+                _iniciou_tracemalloc = not tracemalloc.is_tracing()
+                if _iniciou_tracemalloc:
+                    tracemalloc.start(QUADROS_ALOCACAO)
+                tracemalloc.reset_peak()
+            _capturas_ativas += 1
+        self._alvo = threading.get_ident()
+        self._amostrador = threading.Thread(target=self._amostrar, name='perfil', daemon=True)
+        self._inicio = time.perf_counter()
+        self._amostrador.start()
+        return self
+
+    def __exit__(self, *excecao):
+        global _capturas_ativas, _iniciou_tracemalloc
+        self.duracao = time.perf_counter() - self._inicio
+        self._parar.set()
+        self._amostrador.join()
+        with _trava_tracemalloc:
+            self.alocacoes = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ])
+            self.pico_memoria = tracemalloc.get_traced_memory()[1]
+            _capturas_ativas -= 1
+            if _capturas_ativas == 0 and _iniciou_tracemalloc:
+                tracemalloc.stop()
+                _iniciou_tracemalloc = False
+        return False
+
+    def funcoes_mais_amostradas(self, quantidade=LINHAS_RELATORIO):
+        """Listas ``(função, amostras)`` do tempo próprio e do tempo acumulado."""
+        proprio, acumulado = collections.Counter(), collections.Counter()
+        for pilha, amostras in self.pilhas.items():
+            funcoes = pilha.split(';')
+            proprio[funcoes[-1]] += amostras
+            for funcao in set(funcoes):
+                acumulado[funcao] += amostras
+        return proprio.most_common(quantidade), acumulado.most_common(quantidade)
+
+    def salvar(self, parametros, diretorio=DIRETORIO_PADRAO):
+        """Grava os arquivos da captura e devolve o prefixo comum dos nomes.
+
+        ``parametros`` (dicionário serializável em JSON) identifica o cenário:
+        o nome dos arquivos leva a data e um resumo do conjunto de parâmetros,
+        de modo que capturas do mesmo cenário ficam lado a lado.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        texto_parametros = json.dumps(parametros, sort_keys=True, default=str)
+        resumo = hashlib.sha1(texto_parametros.encode()).hexdigest()[:10]
+        agora = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        prefixo = os.path.join(diretorio, f"perfil_{resumo}_{agora}")
+
+        with open(prefixo + '.folded', 'w', encoding='utf-8') as arquivo:
+            for pilha, amostras in sorted(self.pilhas.items()):
+                arquivo.write(f"{pilha} {amostras}\n")
+
+        amostras = sum(self.pilhas.values())
+        proprio, acumulado = self.funcoes_mais_amostradas()
+        alocacoes = self.alocacoes.statistics('lineno')[:LINHAS_RELATORIO]
+        with open(prefixo + '.txt', 'w', encoding='utf-8') as arquivo:
+            arquivo.write(f"Parâmetros: {texto_parametros}\n")
+            arquivo.write(f"Duração: {self.duracao * 1000:.1f} ms; {amostras} amostras a cada "
+                          f"{self.intervalo * 1000:.1f} ms; pico de memória "
+                          f"{self.pico_memoria / 2 ** 20:.1f} MB\n")
+            for titulo, linhas in (("Tempo próprio", proprio), ("Tempo acumulado", acumulado)):
+                arquivo.write(f"\n{titulo} (amostras):\n")
+                for funcao, contagem in linhas:
+                    arquivo.write(f"{contagem:>8} {contagem / max(amostras, 1):>7.1%}  {funcao}\n")
+            arquivo.write("\nMaiores alocações vivas ao fim da execução:\n")
+            for estatistica in alocacoes:
+                arquivo.write(f"{estatistica.size / 1024:>10.1f} KB {estatistica.count:>8} blocos  "
+                              f"{estatistica.traceback[0]}\n")
+
+        with open(prefixo + '.json', 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'parametros': parametros,
+                'duracao_s': self.duracao,
+                'amostras': amostras,
+                'intervalo_s': self.intervalo,
+                'pico_memoria_bytes': self.pico_memoria,
+            }, arquivo, indent=2, default=str)
+        return prefixo
@@ -0,0 +1,112 @@
+"""Quantis em fluxo contínuo com memória limitada.
+
+``EsbocoQuantis`` estima percentis de muitas séries paralelas (por exemplo,
+o patrimônio em cada mês da simulação) a partir de amostras recebidas em
+blocos, sem guardar as amostras. Cada série mantém um histograma com baldes
+logarítmicos (o mesmo princípio do DDSketch): o balde ``k`` cobre valores
+absolutos em ``(minimo * gama^(k-1), minimo * gama^k]``, com ``gama = (1 + a)
+/ (1 - a)`` e ``a = precisao_relativa``, e é representado pelo ponto que fica
+a uma distância relativa de no máximo ``a`` de qualquer valor do balde.
+Valores negativos usam baldes espelhados.
+
+Garantia de precisão: se o quantil exato (a estatística de ordem de posição
+``q * (n - 1)``, arredondada para baixo) é ``x``, o valor estimado ``x̂``
+satisfaz ``|x̂ - x| <= a * |x|`` para ``minimo <= |x| <= maximo``. Valores
+com ``|x| < minimo`` caem no balde central, estimado como zero (erro
+absoluto menor que ``minimo``); valores além de ``maximo`` são agrupados no
+último balde. O ``np.percentile`` padrão interpola entre duas estatísticas
+de ordem vizinhas, de modo que a estimativa fica a no máximo ``a`` (em termos
+relativos) do intervalo entre elas.
+
+A memória é ``series × baldes`` contadores de 32 bits, com ``baldes ≈ 2 *
+ln(maximo / minimo) / ln(gama)``: com a precisão padrão de 0,5% e a faixa de
+R$ 1 a R$ 10^13, são cerca de 6 mil baldes por série, independentemente do
+número de amostras. Esboços com a mesma configuração podem ser combinados.
+"""
+
+import math
+
+import numpy as np
+
+
+class EsbocoQuantis:
+    """Histograma logarítmico por série com erro relativo garantido nos quantis."""
+
+    def __init__(self, series, precisao_relativa=0.005, minimo=1.0, maximo=1e13):
+        """Cria um esboço vazio para ``series`` séries paralelas.
+
+        Args:
+            series: número de séries (por exemplo, meses + 1).
+            precisao_relativa: erro relativo máximo dos quantis estimados.
+            minimo: menor valor absoluto distinguido de zero.
+            maximo: maior valor absoluto com a garantia de precisão.
+        """
+        if not 0 < precisao_relativa < 1:
+            raise ValueError("A precisão relativa deve estar entre 0 e 1.")
+        self.series = series
+        self.precisao_relativa = precisao_relativa
+        self.minimo = minimo
+        self.maximo = maximo
+        self._log_gama = math.log((1 + precisao_relativa) / (1 - precisao_relativa))
+        self._baldes_lado = int(math.ceil(math.log(maximo / minimo) / self._log_gama))
+
+        # Índices: negativos do mais negativo ao menos negativo, zero, positivos
+        self.baldes = 2 * self._baldes_lado + 1
+        # Contadores de 32 bits: até 2^31 - 1 amostras por série
+        self.contagens = np.zeros((series, self.baldes), dtype=np.int32)
+
+        lado = np.arange(1, self._baldes_lado + 1)
+        representantes = minimo * np.exp(lado * self._log_gama) * 2 / (
+            1 + math.exp(self._log_gama))
+        self._representantes = np.concatenate([-representantes[::-1], [0.0], representantes])
+
+    @property
+    def amostras(self):
+        """Número de amostras recebidas por série."""
+        return int(self.contagens[0].sum()) if self.series else 0
+
+    def _indices(self, valores):
+        """Balde de cada valor."""
+        absolutos = np.abs(valores)
+        with np.errstate(divide='ignore'):
+            lado = np.ceil(np.log(absolutos / self.minimo) / self._log_gama)
+        lado = np.clip(np.nan_to_num(lado, neginf=0), 1, self._baldes_lado).astype(np.int64)
+        centro = self._baldes_lado
+        indices = np.where(valores > 0, centro + lado, centro - lado)
+        return np.where(absolutos < self.minimo, centro, indices)
+
+    def contar(self, valores):
+        """Contagens por balde de um bloco de amostras, sem alterar o esboço.
+
+        Permite contar blocos em paralelo e somar as contagens ao esboço
+        depois, com ``contagens += ...`` protegido por uma trava.
+        """
+        valores = np.asarray(valores, dtype=float)
+        indices = self._indices(valores) + np.arange(self.series) * self.baldes
+        return np.bincount(
+            indices.ravel(), minlength=self.series * self.baldes
+        ).reshape(self.series, self.baldes)
+
+    def adicionar(self, valores):
+        """Acrescenta um bloco de amostras com formato (amostras, series)."""
+        self.contagens += self.contar(valores)
+
+    def combinar(self, outro):
+        """Soma ao esboço as contagens de outro esboço com a mesma configuração."""
+        if (outro.series, outro.baldes, outro.precisao_relativa, outro.minimo) != (
+                self.series, self.baldes, self.precisao_relativa, self.minimo):
+            raise ValueError("Só é possível combinar esboços com a mesma configuração.")
+        self.contagens += outro.contagens
+
+    def quantis(self, probabilidades):
+        """Quantis estimados, com formato (len(probabilidades), series)."""
+        probabilidades = np.atleast_1d(np.asarray(probabilidades, dtype=float))
+        acumuladas = np.cumsum(self.contagens, axis=1)
+        total = acumuladas[:, -1:]
+        resultado = np.empty((len(probabilidades), self.series))
+        for indice, probabilidade in enumerate(probabilidades):
+            # Primeiro balde cuja contagem acumulada passa da posição q * (n - 1)
+            posicao = np.floor(probabilidade * (total - 1))
+            balde = np.argmax(acumuladas > posicao, axis=1)
+            resultado[indice] = self._representantes[balde]
+        return resultado
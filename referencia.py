@@ -0,0 +1,185 @@
+"""Implementação de referência do simulador, com um laço mês a mês escalar.
+
+Mantida para validar as implementações rápidas (``motor``, ``cubo``): calcula
+as três opções mês a mês, em Python puro, como a primeira versão do
+simulador, incluindo o ``max(0, ...)`` da compra financiada, a diferença de
+investimento inicial entre app.py e app_corrigido.py e os custos de
+propriedade e impostos:
+
+* IR sobre os rendimentos: a taxa mensal dos investimentos é multiplicada
+  por ``1 - aliquota_ir``;
+* custos de aquisição, pagos pelo investimento no mês zero nas compras;
+* IPTU e manutenção (anuais) pagos pelo proprietário e condomínio (mensal)
+  pago por quem mora, proporcionais ao valor atual do imóvel, a partir do
+  mês 1 e retirados do investimento.
+
+Os valores de cada mês são guardados em listas e o ``DataFrame`` é montado
+no fim, para que a referência seja rápida o bastante para os testes.
+"""
+
+from simulador import SimuladorImovel
+
+
+class SimuladorReferencia(SimuladorImovel):
+    """Simulador com o cálculo original, mês a mês, de cada opção."""
+
+    def _taxas_mensais(self):
+        """Taxas mensais de valorização do imóvel e de rendimento líquido de IR."""
+        taxa_valorizacao_mensal = (1 + self.taxa_valorizacao_imovel) ** (1/12) - 1
+        taxa_juros_mensal = ((1 + self.taxa_juros_investimento) ** (1/12) - 1) * (1 - self.aliquota_ir)
+        return taxa_valorizacao_mensal, taxa_juros_mensal
+
+    @staticmethod
+    def _tabela(colunas):
+        import pandas as pd
+
+        return pd.DataFrame({nome: [float(valor) for valor in valores] for nome, valores in colunas.items()})
+
+    def calcular_aluguel(self):
+        """Calcula a evolução patrimonial na opção de aluguel."""
+        taxa_valorizacao_mensal, taxa_juros_mensal = self._taxas_mensais()
+        meses = int(round(self.prazo_simulacao * 12))
+
+        # Valores iniciais: começa com o valor equivalente ao imóvel investido
+        colunas = {
+            'Mês': [0],
+            'Patrimônio': [self.valor_imovel],
+            'Investimento': [self.valor_imovel],
+            'Aluguel Mensal': [self.valor_imovel * self.percentual_aluguel],
+            'Aluguel Acumulado': [0.0],
+            'Custos Mensais': [0.0],
+            'Valor Imóvel': [self.valor_imovel],
+        }
+
+        # Cálculo mês a mês
+        for mes in range(1, meses + 1):
+            # Atualização do valor do imóvel
+            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
+
+            # Aluguel e condomínio acompanham a valorização do imóvel
+            valor_aluguel_atual = valor_imovel_atual * self.percentual_aluguel
+            condominio = valor_imovel_atual * self.percentual_condominio
+
+            # Investimento cresce com juros e é reduzido pelo aluguel e pelo condomínio
+            investimento_atual = (colunas['Investimento'][-1] * (1 + taxa_juros_mensal)
+                                  - valor_aluguel_atual - condominio)
+
+            colunas['Mês'].append(mes)
+            colunas['Patrimônio'].append(investimento_atual)
+            colunas['Investimento'].append(investimento_atual)
+            colunas['Aluguel Mensal'].append(valor_aluguel_atual)
+            colunas['Aluguel Acumulado'].append(colunas['Aluguel Acumulado'][-1] + valor_aluguel_atual)
+            colunas['Custos Mensais'].append(condominio)
+            colunas['Valor Imóvel'].append(valor_imovel_atual)
+
+        df = self._tabela(colunas)
+        self.resultados['aluguel'] = df
+        return df
+
+    def calcular_compra_vista(self):
+        """Calcula a evolução patrimonial na opção de compra à vista."""
+        taxa_valorizacao_mensal, taxa_juros_mensal = self._taxas_mensais()
+        meses = int(round(self.prazo_simulacao * 12))
+
+        # Os custos de aquisição e do proprietário formam um saldo negativo
+        # que rende à mesma taxa dos investimentos (custo de oportunidade)
+        investimento = -self.valor_imovel * self.percentual_custos_aquisicao
+        colunas = {
+            'Mês': [0],
+            'Patrimônio': [self.valor_imovel + investimento],
+            'Valor Imóvel': [self.valor_imovel],
+            'Investimento': [investimento],
+            'Custos Mensais': [0.0],
+        }
+
+        # Cálculo mês a mês
+        for mes in range(1, meses + 1):
+            # Atualização do valor do imóvel
+            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
+            custos = valor_imovel_atual * ((self.taxa_iptu + self.taxa_manutencao) / 12
+                                           + self.percentual_condominio)
+            investimento = investimento * (1 + taxa_juros_mensal) - custos
+
+            colunas['Mês'].append(mes)
+            colunas['Patrimônio'].append(valor_imovel_atual + investimento)
+            colunas['Valor Imóvel'].append(valor_imovel_atual)
+            colunas['Investimento'].append(investimento)
+            colunas['Custos Mensais'].append(custos)
+
+        df = self._tabela(colunas)
+        self.resultados['compra_vista'] = df
+        return df
+
+    def calcular_compra_financiada(self):
+        """Calcula a evolução patrimonial na opção de compra financiada."""
+        taxa_valorizacao_mensal, taxa_juros_investimento_mensal = self._taxas_mensais()
+        taxa_juros_mensal = (1 + self.taxa_juros_financiamento) ** (1/12) - 1
+
+        valor_financiado = self.valor_imovel * self.percentual_financiamento
+        valor_entrada = self.valor_imovel - valor_financiado
+
+        # Cálculo da prestação do financiamento (Sistema de Amortização Constante - SAC)
+        meses_financiamento = round(self.prazo_financiamento * 12)
+        amortizacao_mensal = valor_financiado / meses_financiamento
+        meses = int(round(self.prazo_simulacao * 12))
+
+        # Valores iniciais: os custos de aquisição saem do investimento
+        if self.investimento_inicial_financiada == 'financiado':
+            investimento_inicial = valor_financiado
+        else:
+            investimento_inicial = valor_entrada
+        investimento = investimento_inicial - self.valor_imovel * self.percentual_custos_aquisicao
+        colunas = {
+            'Mês': [0],
+            'Patrimônio': [self.valor_imovel],
+            'Valor Imóvel': [self.valor_imovel],
+            'Saldo Devedor': [valor_financiado],
+            'Investimento': [max(0, investimento)],
+            'Prestação': [0.0],
+            'Juros Pagos': [0.0],
+            'Juros Acumulados': [0.0],
+            'Custos Mensais': [0.0],
+        }
+
+        # Cálculo mês a mês
+        for mes in range(1, meses + 1):
+            # Atualização do valor do imóvel
+            valor_imovel_atual = self.valor_imovel * (1 + taxa_valorizacao_mensal) ** mes
+
+            # Cálculo do saldo devedor e prestação (apenas durante o período de financiamento)
+            if mes <= meses_financiamento:
+                saldo_devedor_anterior = colunas['Saldo Devedor'][-1]
+                juros_mensais = saldo_devedor_anterior * taxa_juros_mensal
+                prestacao = amortizacao_mensal + juros_mensais
+                saldo_devedor_atual = valor_financiado - amortizacao_mensal * mes
+            else:
+                saldo_devedor_atual = 0
+                prestacao = 0
+                juros_mensais = 0
+
+            custos = valor_imovel_atual * ((self.taxa_iptu + self.taxa_manutencao) / 12
+                                           + self.percentual_condominio)
+
+            # Atualização do investimento, que não fica negativo
+            investimento = max(0, investimento) * (1 + taxa_juros_investimento_mensal) - prestacao - custos
+
+            # Patrimônio total = valor do imóvel - saldo devedor + investimentos
+            colunas['Mês'].append(mes)
+            colunas['Patrimônio'].append(valor_imovel_atual - saldo_devedor_atual + max(0, investimento))
+            colunas['Valor Imóvel'].append(valor_imovel_atual)
+            colunas['Saldo Devedor'].append(saldo_devedor_atual)
+            colunas['Investimento'].append(max(0, investimento))
+            colunas['Prestação'].append(prestacao)
+            colunas['Juros Pagos'].append(juros_mensais)
+            colunas['Juros Acumulados'].append(colunas['Juros Acumulados'][-1] + juros_mensais)
+            colunas['Custos Mensais'].append(custos)
+
+        df = self._tabela(colunas)
+        self.resultados['compra_financiada'] = df
+        return df
+
+
+class SimuladorReferenciaCorrigido(SimuladorReferencia):
+    """Referência da variante que investe o valor financiado (app_corrigido.py)."""
+
+    investimento_inicial_financiada = 'financiado'
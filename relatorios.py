@@ -0,0 +1,390 @@
+"""Relatórios de clientes em lote, sem a interface: um HTML ou PDF por cenário.
+
+Cada relatório traz o gráfico de evolução patrimonial da aba principal, a
+tabela "Comparação dos Resultados" e os riscos e benefícios de
+``SimuladorImovel.analisar_riscos_beneficios``.
+
+O trabalho é dividido em duas etapas. Primeiro todos os cenários são
+calculados em lotes vetorizados (``motor.simular_lote``, TIR e VPL de
+``rentabilidade`` e cruzamentos de ``cruzamentos``), agrupados por prazo, e
+reduzidos ao pouco que cada relatório exibe. Depois os relatórios são
+desenhados em um pool de processos: cada processo compila o modelo HTML uma
+única vez e mantém uma única figura do matplotlib, cujas linhas recebem os
+dados de cada relatório sem que eixos, legenda e formatadores sejam
+refeitos.
+"""
+
+import csv
+import io
+import os
+import re
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import cruzamentos
+import motor
+import rentabilidade
+from simulador import formatar_moeda
+
+FORMATOS = ('html', 'pdf')
+
+# Rótulos das estratégias, na ordem de motor.ESTRATEGIAS
+NOMES_ESTRATEGIAS = {'aluguel': 'Aluguel', 'compra_vista': 'Compra à Vista',
+                     'compra_financiada': 'Compra Financiada'}
+
+TITULO_GRAFICO = 'Comparação da Evolução Patrimonial'
+ROTULO_GRAFICO = 'Patrimônio Total'
+
+# Relatórios entregues a cada processo por vez
+RELATORIOS_POR_TAREFA = 32
+
+# Caracteres por linha do texto da página do PDF
+LARGURA_TEXTO_PDF = 125
+
+MODELO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Simulação imobiliária{% if cliente %} - {{ cliente }}{% endif %}</title>
+<style>
+body { font-family: sans-serif; max-width: 960px; margin: 2em auto; color: #222; }
+table { border-collapse: collapse; width: 100%; margin: 1em 0; }
+th, td { border: 1px solid #ccc; padding: 0.4em 0.6em; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.riscos { display: flex; gap: 1.5em; }
+.riscos section { flex: 1; }
+svg { width: 100%; height: auto; }
+</style>
+</head>
+<body>
+<h1>Simulação imobiliária{% if cliente %} - {{ cliente }}{% endif %}</h1>
+<p>Imóvel de {{ valor_imovel }}, prazo de {{ prazo }} anos.</p>
+<h2>Evolução Patrimonial</h2>
+{{ grafico | safe }}
+<h2>Comparação dos Resultados</h2>
+<table>
+<tr>{% for coluna in comparacao %}<th>{{ coluna }}</th>{% endfor %}</tr>
+{% for linha in linhas %}<tr>{% for valor in linha %}<td>{{ valor }}</td>{% endfor %}</tr>
+{% endfor %}</table>
+<h2>Conclusão</h2>
+<p>A opção com maior patrimônio final após {{ prazo }} anos é <strong>{{ melhor }}</strong>,
+com {{ patrimonio_melhor }}.</p>
+<h2>Riscos e Benefícios</h2>
+<div class="riscos">
+{% for estrategia, analise in riscos.items() %}<section>
+<h3>{{ nomes[estrategia] }}</h3>
+<h4>Benefícios</h4>
+<ul>{% for item in analise['beneficios'] %}<li>{{ item }}</li>{% endfor %}</ul>
+<h4>Riscos</h4>
+<ul>{% for item in analise['riscos'] %}<li>{{ item }}</li>{% endfor %}</ul>
+</section>
+{% endfor %}</div>
+</body>
+</html>
+"""
+
+
+def tabela_comparacao(finais, valor_imovel, taxas_retorno, valores_presentes):
+    """Colunas da tabela "Comparação dos Resultados", já formatadas.
+
+    ``finais`` mapeia cada estratégia para os valores do último mês (um
+    dicionário ou uma linha de DataFrame); ``taxas_retorno`` e
+    ``valores_presentes``, para a TIR anual e o VPL de ``rentabilidade``.
+    """
+    def retorno(estrategia):
+        return f"{(finais[estrategia]['Patrimônio'] / valor_imovel - 1) * 100:.2f}%"
+
+    def tir(estrategia):
+        taxa = taxas_retorno[estrategia]
+        return 'N/A' if np.isnan(taxa) else f"{taxa * 100:.2f}%"
+
+    aluguel, vista, financiada = (finais[estrategia] for estrategia in motor.ESTRATEGIAS)
+    return {
+        'Métrica': [
+            'Patrimônio Final',
+            'Valor Final do Imóvel',
+            'Investimento Final',
+            'Aluguel Total Pago',
+            'Juros Totais Pagos',
+            'Retorno sobre Investimento (%)',
+            'Taxa Interna de Retorno (% a.a.)',
+            'Valor Presente Líquido'
+        ],
+        'Aluguel': [
+            formatar_moeda(aluguel['Patrimônio']),
+            formatar_moeda(aluguel['Valor Imóvel']),
+            formatar_moeda(aluguel['Investimento']),
+            formatar_moeda(aluguel['Aluguel Acumulado']),
+            'N/A',
+            retorno('aluguel'),
+            tir('aluguel'),
+            formatar_moeda(valores_presentes['aluguel'])
+        ],
+        'Compra à Vista': [
+            formatar_moeda(vista['Patrimônio']),
+            formatar_moeda(vista['Valor Imóvel']),
+            'N/A',
+            'N/A',
+            'N/A',
+            retorno('compra_vista'),
+            tir('compra_vista'),
+            formatar_moeda(valores_presentes['compra_vista'])
+        ],
+        'Compra Financiada': [
+            formatar_moeda(financiada['Patrimônio']),
+            formatar_moeda(financiada['Valor Imóvel']),
+            formatar_moeda(financiada['Investimento']),
+            'N/A',
+            formatar_moeda(financiada['Juros Acumulados']),
+            retorno('compra_financiada'),
+            tir('compra_financiada'),
+            formatar_moeda(valores_presentes['compra_financiada'])
+        ]
+    }
+
+
+def ler_cenarios_csv(caminho, padroes=None):
+    """Lê os cenários de um CSV, um por linha.
+
+    As colunas têm os nomes dos parâmetros do simulador, além de
+    ``prazo_simulacao`` e de um ``cliente`` opcional, usado no título e no
+    nome do arquivo; colunas ausentes ou vazias usam ``padroes``.
+    """
+    padroes = padroes or {}
+    nomes = motor.PARAMETROS + motor.PARAMETROS_CUSTOS + ('prazo_simulacao',)
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            cenario = dict(padroes, cliente=linha.get('cliente') or '')
+            for nome in nomes:
+                if linha.get(nome) not in (None, ''):
+                    cenario[nome] = float(linha[nome])
+            yield cenario
+
+
+def _marcos(analise, cenario):
+    """Cruzamentos de um cenário do lote como ``(anos, texto)``, como na aba principal."""
+    marcos = []
+    for a, b in cruzamentos.PARES:
+        sinais = analise[(a, b)]['sinais'][cenario]
+        for mes in cruzamentos.meses_cruzamento(sinais)[0]:
+            frente, atras = (a, b) if sinais[mes] > 0 else (b, a)
+            marcos.append((mes / 12, f"{NOMES_ESTRATEGIAS[frente]} passa {NOMES_ESTRATEGIAS[atras]}"))
+    return sorted(marcos)
+
+
+def preparar_relatorios(cenarios, investimento_inicial='entrada', tamanho_bloco=256):
+    """Calcula todos os cenários em lote e devolve os dados de cada relatório, na ordem recebida.
+
+    Cenários com o mesmo prazo são simulados juntos, em blocos de
+    ``tamanho_bloco``. Cada relatório guarda só as séries anuais de
+    patrimônio, os marcos de cruzamento e a tabela já formatada.
+    """
+    cenarios = list(cenarios)
+    por_prazo = {}
+    for indice, cenario in enumerate(cenarios):
+        por_prazo.setdefault(cenario['prazo_simulacao'], []).append(indice)
+
+    relatorios = [None] * len(cenarios)
+    for prazo, indices in por_prazo.items():
+        meses = int(round(prazo * 12))
+        amostras = np.unique(np.r_[0:meses + 1:12, meses])
+        for inicio in range(0, len(indices), tamanho_bloco):
+            bloco = indices[inicio:inicio + tamanho_bloco]
+            parametros = {nome: np.array([cenarios[i].get(nome, 0.0) for i in bloco], dtype=float)
+                          for nome in motor.PARAMETROS + motor.PARAMETROS_CUSTOS}
+            lote = motor.simular_lote(parametros, prazo, investimento_inicial)
+            rentabilidades = rentabilidade.avaliar_lote(parametros, prazo,
+                                                        investimento_inicial=investimento_inicial,
+                                                        tamanho_bloco=tamanho_bloco)
+            analise = cruzamentos.analisar(lote)
+
+            for posicao, indice in enumerate(bloco):
+                finais = {estrategia: {coluna: valores[posicao, -1] for coluna, valores in colunas.items()}
+                          for estrategia, colunas in lote.items()}
+                patrimonios = [finais[estrategia]['Patrimônio'] for estrategia in motor.ESTRATEGIAS]
+                melhor = motor.ESTRATEGIAS[int(np.argmax(patrimonios))]
+                relatorios[indice] = {
+                    'indice': indice,
+                    'cliente': cenarios[indice].get('cliente', ''),
+                    'valor_imovel': float(parametros['valor_imovel'][posicao]),
+                    'prazo': prazo,
+                    'anos': amostras / 12,
+                    'series': {NOMES_ESTRATEGIAS[estrategia]: lote[estrategia]['Patrimônio'][posicao, amostras]
+                               for estrategia in motor.ESTRATEGIAS},
+                    'marcos': _marcos(analise, posicao),
+                    'comparacao': tabela_comparacao(
+                        finais, parametros['valor_imovel'][posicao],
+                        {estrategia: valores['tir'][posicao] for estrategia, valores in rentabilidades.items()},
+                        {estrategia: valores['vpl'][posicao] for estrategia, valores in rentabilidades.items()}),
+                    'melhor': NOMES_ESTRATEGIAS[melhor],
+                    'patrimonio_melhor': formatar_moeda(finais[melhor]['Patrimônio']),
+                }
+    return relatorios
+
+
+def nome_arquivo(relatorio, formato):
+    """Nome do arquivo do relatório: posição no arquivo de cenários e cliente."""
+    cliente = re.sub(r'[^\w-]+', '_', relatorio['cliente']).strip('_')
+    return f"relatorio_{relatorio['indice']:05d}{'_' + cliente if cliente else ''}.{formato}"
+
+
+class Renderizador:
+    """Modelo compilado e figura reaproveitados por todos os relatórios de um processo.
+
+    No HTML, o gráfico é embutido como SVG. No PDF, a mesma figura é uma
+    página A4 com o gráfico, a tabela, a conclusão e os riscos.
+    """
+
+    def __init__(self, diretorio, formato, riscos):
+        import jinja2
+        from matplotlib.figure import Figure
+
+        import graficos
+
+        self.diretorio = diretorio
+        self.formato = formato
+        self.riscos = riscos
+        self.modelo = jinja2.Environment(autoescape=True).from_string(MODELO_HTML)
+
+        if formato == 'pdf':
+            self.figura = Figure(figsize=(8.27, 11.69))
+            grade = self.figura.add_gridspec(3, 1, height_ratios=(4, 3, 5), left=0.12, right=0.95,
+                                            top=0.95, bottom=0.03, hspace=0.25)
+            self.eixos = self.figura.add_subplot(grade[0])
+            self.eixos_tabela = self.figura.add_subplot(grade[1])
+            self.eixos_texto = self.figura.add_subplot(grade[2])
+            self.eixos_tabela.set_axis_off()
+            self.eixos_texto.set_axis_off()
+            self.texto = self.eixos_texto.text(0, 1, '', va='top', ha='left', fontsize=7.5,
+                                               family='sans-serif')
+            # Quebrar as linhas com o matplotlib (wrap=True) mede cada palavra a
+            # cada página; os riscos são os mesmos em todas e são quebrados uma vez
+            linhas = []
+            for estrategia, analise in riscos.items():
+                linhas.append(NOMES_ESTRATEGIAS[estrategia])
+                linhas.append(self._quebrar("  Benefícios: " + "; ".join(analise['beneficios']) + "."))
+                linhas.append(self._quebrar("  Riscos: " + "; ".join(analise['riscos']) + "."))
+            self._riscos_pdf = "\n".join(linhas)
+        else:
+            self.figura = Figure(figsize=graficos.TAMANHO_FIGURA)
+            self.eixos = self.figura.subplots()
+        self._linhas = None
+        self._marcos = []
+
+    @staticmethod
+    def _quebrar(texto):
+        return textwrap.fill(texto, LARGURA_TEXTO_PDF, subsequent_indent='    ')
+
+    def _atualizar_grafico(self, relatorio):
+        """Troca os dados das linhas e os marcos, sem redesenhar eixos e legenda."""
+        import graficos
+
+        series = {rotulo: (relatorio['anos'], valores) for rotulo, valores in relatorio['series'].items()}
+        if self._linhas is None:
+            graficos.desenhar(self.eixos, series, TITULO_GRAFICO, ROTULO_GRAFICO)
+            self._linhas = self.eixos.get_lines()
+        else:
+            for linha, (anos, valores) in zip(self._linhas, series.values()):
+                linha.set_data(anos, valores)
+        for artista in self._marcos:
+            artista.remove()
+        self._marcos = graficos.desenhar_marcos(self.eixos, relatorio['marcos'])
+        self.eixos.relim()
+        self.eixos.autoscale_view()
+
+    def html(self, relatorio):
+        import matplotlib
+
+        self._atualizar_grafico(relatorio)
+        imagem = io.StringIO()
+        # Textos do SVG como texto, desenhados pelo navegador, em vez de contornos
+        with matplotlib.rc_context({'svg.fonttype': 'none'}):
+            self.figura.savefig(imagem, format='svg')
+        grafico = imagem.getvalue()
+        comparacao = relatorio['comparacao']
+        return self.modelo.render(
+            cliente=relatorio['cliente'],
+            valor_imovel=formatar_moeda(relatorio['valor_imovel']),
+            prazo=f"{relatorio['prazo']:g}",
+            grafico=grafico[grafico.index('<svg'):],
+            comparacao=list(comparacao),
+            linhas=list(zip(*comparacao.values())),
+            melhor=relatorio['melhor'],
+            patrimonio_melhor=relatorio['patrimonio_melhor'],
+            riscos=self.riscos,
+            nomes=NOMES_ESTRATEGIAS,
+        )
+
+    def pdf(self, relatorio):
+        self._atualizar_grafico(relatorio)
+        comparacao = relatorio['comparacao']
+        self.eixos_tabela.clear()
+        self.eixos_tabela.set_axis_off()
+        titulo = f"Simulação imobiliária{' - ' + relatorio['cliente'] if relatorio['cliente'] else ''}"
+        self.eixos_tabela.set_title(titulo, loc='left', fontsize=10)
+        tabela = self.eixos_tabela.table(cellText=list(zip(*comparacao.values())),
+                                         colLabels=list(comparacao), loc='upper center',
+                                         cellLoc='right', colLoc='center')
+        tabela.auto_set_font_size(False)
+        tabela.set_fontsize(7.5)
+
+        conclusao = self._quebrar(f"Conclusão: a opção com maior patrimônio final após {relatorio['prazo']:g} "
+                                  f"anos é {relatorio['melhor']}, com {relatorio['patrimonio_melhor']}.")
+        self.texto.set_text(f"{conclusao}\n\n{self._riscos_pdf}")
+
+        documento = io.BytesIO()
+        self.figura.savefig(documento, format='pdf')
+        return documento.getvalue()
+
+    def gravar(self, relatorio):
+        """Desenha o relatório e grava o arquivo no diretório; devolve o caminho."""
+        caminho = os.path.join(self.diretorio, nome_arquivo(relatorio, self.formato))
+        if self.formato == 'pdf':
+            with open(caminho, 'wb') as arquivo:
+                arquivo.write(self.pdf(relatorio))
+        else:
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(self.html(relatorio))
+        return caminho
+
+
+_renderizador = None
+
+
+def _iniciar_processo(diretorio, formato, riscos):
+    global _renderizador
+    _renderizador = Renderizador(diretorio, formato, riscos)
+
+
+def _gravar_tarefa(relatorios):
+    return [_renderizador.gravar(relatorio) for relatorio in relatorios]
+
+
+def gravar_relatorios(relatorios, diretorio, formato='html', riscos=None, processos=None,
+                      relatorios_por_tarefa=RELATORIOS_POR_TAREFA):
+    """Grava um arquivo por relatório de ``preparar_relatorios`` e devolve os caminhos.
+
+    ``riscos`` é o dicionário de ``analisar_riscos_beneficios``. Com mais de
+    um processo, os relatórios são repartidos em tarefas de
+    ``relatorios_por_tarefa``; com um, são gravados no processo atual.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {FORMATOS}.")
+    if riscos is None:
+        from simulador import SimuladorImovel
+        riscos = SimuladorImovel().analisar_riscos_beneficios()
+    os.makedirs(diretorio, exist_ok=True)
+
+    processos = min(processos or os.cpu_count() or 1,
+                    -(-len(relatorios) // relatorios_por_tarefa) or 1)
+    if processos <= 1:
+        renderizador = Renderizador(diretorio, formato, riscos)
+        return [renderizador.gravar(relatorio) for relatorio in relatorios]
+
+    tarefas = [relatorios[inicio:inicio + relatorios_por_tarefa]
+               for inicio in range(0, len(relatorios), relatorios_por_tarefa)]
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo,
+                             initargs=(diretorio, formato, riscos)) as executor:
+        return [caminho for caminhos in executor.map(_gravar_tarefa, tarefas) for caminho in caminhos]
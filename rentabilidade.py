@@ -0,0 +1,212 @@
+"""Fluxos de caixa de cada estratégia, taxa interna de retorno e valor presente líquido.
+
+O "Retorno sobre Investimento" da tabela comparativa compara apenas o
+patrimônio final com o valor do imóvel e ignora quando o dinheiro entra e
+sai. Aqui cada estratégia é descrita pelo seu fluxo de caixa mensal, com a
+moradia paga do bolso mês a mês:
+
+* no mês zero saem o que é pago pelo imóvel (o preço na compra à vista, a
+  entrada na compra financiada), os custos de aquisição e o capital posto
+  na conta de investimentos (o valor do imóvel no aluguel; na compra
+  financiada, conforme ``investimento_inicial``);
+* a cada mês saem aluguel, prestações, IPTU, manutenção e condomínio;
+* no último mês entram o valor do imóvel menos o saldo devedor e o saldo
+  final da conta de investimentos, que rende à taxa líquida sem pagar a
+  moradia, de modo que nada é contado duas vezes.
+
+Saídas são negativas e entradas positivas. A TIR é a taxa que todo o
+dinheiro posto na estratégia rende, e deve ser comparada com a taxa dos
+investimentos; no aluguel fica abaixo dela pelo que foi gasto com aluguel.
+Descontado à taxa líquida dos investimentos, o VPL é o patrimônio final do
+simulador trazido a valor presente menos o capital do mês zero, enquanto o
+investimento da compra financiada não se esgota (ver
+``motor.calcular_compra_financiada_lote``); com o mesmo capital em todas as
+estratégias (``investimento_inicial='financiado'``), ordena as opções como o
+patrimônio final.
+
+``tir`` resolve todos os cenários de um lote ao mesmo tempo: método de
+Newton protegido por bissecção, com um intervalo que contém a raiz mantido
+por cenário e apenas os cenários ainda não convergidos avaliados a cada
+iteração. ``avaliar_lote`` calcula TIR e VPL de lotes de qualquer tamanho em
+blocos de cenários, sem guardar os fluxos do lote inteiro.
+"""
+
+import numpy as np
+
+import motor
+
+# Intervalo de busca da TIR, em log(1 + taxa mensal): de -50% a +100% ao mês
+LOG_TAXA_MINIMA = np.log(0.5)
+LOG_TAXA_MAXIMA = np.log(2.0)
+
+
+def capital_inicial(p, investimento_inicial='entrada'):
+    """Capital de cada estratégia no mês zero: o pago pelo imóvel mais o investido.
+
+    ``p`` são os parâmetros de ``motor.preparar_parametros``. Retorna
+    ``{estrategia: (imovel, investido)}``, arrays de formato (cenários, 1).
+    """
+    valor = p['valor_imovel']
+    financiado = valor * p['percentual_financiamento']
+    investido = financiado if investimento_inicial == 'financiado' else valor - financiado
+    return {
+        'aluguel': (np.zeros_like(valor), valor),
+        'compra_vista': (valor, np.zeros_like(valor)),
+        'compra_financiada': (valor - financiado, investido),
+    }
+
+
+def fluxos_caixa(parametros, prazo_simulacao, investimento_inicial='entrada',
+                 estrategias=motor.ESTRATEGIAS, trajetoria=None):
+    """Fluxo de caixa mensal de cada estratégia.
+
+    Recebe os mesmos parâmetros de ``motor.simular_lote`` e devolve
+    ``{estrategia: array (cenários, meses + 1)}``. Os fluxos do lote inteiro
+    ficam em memória; para muitos cenários, use ``avaliar_lote``.
+    """
+    p = motor.preparar_parametros(parametros)
+    meses = int(round(prazo_simulacao * 12))
+    contexto = motor.criar_contexto(p, meses, trajetoria)
+    crescimento = contexto['crescimento_investimento']
+    capitais = capital_inicial(p, investimento_inicial)
+
+    fluxos = {}
+    for estrategia in estrategias:
+        saidas, colunas = motor.executar_componentes(motor.COMPONENTES[estrategia], contexto)
+        imovel, investido = capitais[estrategia]
+        fluxo = -saidas
+        fluxo[:, 0] -= (imovel + investido)[:, 0]
+        # A conta de investimentos só rende: as saídas já estão no fluxo
+        fluxo[:, -1] += (investido * crescimento[:, -1:])[:, 0]
+        if estrategia != 'aluguel':
+            fluxo[:, -1] += contexto['valor_imovel'][:, -1]
+        if estrategia == 'compra_financiada':
+            fluxo[:, -1] -= colunas['Saldo Devedor'][:, -1]
+        fluxos[estrategia] = fluxo
+    return fluxos
+
+
+def taxa_desconto_padrao(parametros):
+    """Taxa anual líquida de IR dos investimentos, referência padrão para o VPL."""
+    p = motor.preparar_parametros(parametros)
+    return (1 + motor.taxa_investimento_liquida(p)[:, 0]) ** 12 - 1
+
+
+def vpl(fluxos, taxa_desconto):
+    """Valor presente líquido de cada cenário à taxa anual ``taxa_desconto``.
+
+    ``fluxos`` tem formato (cenários, meses + 1); a taxa pode ser um escalar
+    ou um array com uma taxa por cenário.
+    """
+    fluxos = np.atleast_2d(fluxos)
+    taxa = np.asarray(motor.taxa_mensal(taxa_desconto), dtype=float).reshape(-1, 1)
+    meses = np.arange(fluxos.shape[1])
+    return (fluxos * (1 + taxa) ** -meses).sum(axis=1)
+
+
+def _valor_e_derivada(fluxos, meses, logaritmo):
+    """VPL e sua derivada em relação a ``log(1 + taxa mensal)``."""
+    descontados = fluxos * np.exp(-logaritmo[:, None] * meses)
+    return descontados.sum(axis=1), -(descontados * meses).sum(axis=1)
+
+
+def tir(fluxos, tolerancia=1e-10, iteracoes_maximas=100):
+    """Taxa interna de retorno anual de cada cenário, vetorizada.
+
+    A raiz é procurada em ``log(1 + taxa mensal)``, entre
+    ``LOG_TAXA_MINIMA`` e ``LOG_TAXA_MAXIMA``. Cenários cujo VPL não muda de
+    sinal nesse intervalo (por exemplo, fluxos só de saídas) recebem
+    ``NaN``. Com mais de uma troca de sinal no fluxo pode haver mais de uma
+    TIR; a devolvida é uma raiz do intervalo inicial.
+
+    A estimativa inicial trata o fluxo como uma única saída e uma única
+    entrada em suas datas médias; a partir dela, cada iteração dá um passo
+    de Newton, ou bissecta o intervalo quando o passo sairia dele ou não
+    encolheria pelo menos à metade do passo anterior.
+    """
+    fluxos = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    cenarios, colunas = fluxos.shape
+    meses = np.arange(colunas, dtype=float)
+    resultado = np.full(cenarios, np.nan)
+
+    minimo = np.full(cenarios, LOG_TAXA_MINIMA)
+    maximo = np.full(cenarios, LOG_TAXA_MAXIMA)
+    valor_minimo, _ = _valor_e_derivada(fluxos, meses, minimo)
+    valor_maximo, _ = _valor_e_derivada(fluxos, meses, maximo)
+    ativos = np.flatnonzero(np.sign(valor_minimo) * np.sign(valor_maximo) < 0)
+    resultado[valor_minimo == 0] = LOG_TAXA_MINIMA
+    resultado[valor_maximo == 0] = LOG_TAXA_MAXIMA
+
+    entradas = np.maximum(fluxos[ativos], 0)
+    saidas = np.maximum(-fluxos[ativos], 0)
+    soma_entradas, soma_saidas = entradas.sum(axis=1), saidas.sum(axis=1)
+    prazo = entradas @ meses / soma_entradas - saidas @ meses / soma_saidas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimativa = np.log(soma_entradas / soma_saidas) / prazo
+    estimativa = np.where(np.isfinite(estimativa), estimativa,
+                          (minimo[ativos] + maximo[ativos]) / 2)
+
+    # Sinal do VPL na ponta inferior: define de que lado da raiz cada ponto está
+    sinal_minimo = np.sign(valor_minimo[ativos])
+    minimo, maximo = minimo[ativos], maximo[ativos]
+    logaritmo = np.clip(estimativa, minimo, maximo)
+    escala = np.abs(fluxos[ativos]).sum(axis=1)
+
+    passo_anterior = maximo - minimo
+    for _ in range(iteracoes_maximas):
+        if not len(ativos):
+            break
+        valor, derivada = _valor_e_derivada(fluxos[ativos], meses, logaritmo)
+        lado_minimo = np.sign(valor) == sinal_minimo
+        minimo = np.where(lado_minimo, logaritmo, minimo)
+        maximo = np.where(lado_minimo, maximo, logaritmo)
+
+        # Passo de Newton apenas se fica no intervalo e encolhe em relação ao
+        # passo anterior; caso contrário, bissecção
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = logaritmo - valor / derivada
+        dentro = (np.isfinite(newton) & (newton >= minimo) & (newton <= maximo)
+                  & (np.abs(newton - logaritmo) <= passo_anterior / 2))
+        proximo = np.where(dentro, newton, (minimo + maximo) / 2)
+        passo_anterior = np.abs(proximo - logaritmo)
+
+        raiz = np.abs(valor) <= tolerancia * escala
+        convergiu = raiz | (passo_anterior < tolerancia) | (maximo - minimo < tolerancia)
+        resultado[ativos[convergiu]] = np.where(raiz, logaritmo, proximo)[convergiu]
+        continua = ~convergiu
+        ativos, logaritmo, minimo, maximo = (ativos[continua], proximo[continua],
+                                             minimo[continua], maximo[continua])
+        sinal_minimo, escala = sinal_minimo[continua], escala[continua]
+        passo_anterior = passo_anterior[continua]
+
+    resultado[ativos] = logaritmo
+    return np.expm1(12 * resultado)
+
+
+def avaliar_lote(parametros, prazo_simulacao, taxa_desconto=None, investimento_inicial='entrada',
+                 estrategias=motor.ESTRATEGIAS, tamanho_bloco=256):
+    """TIR e VPL de cada estratégia para um lote de qualquer tamanho.
+
+    Os cenários são processados em blocos de ``tamanho_bloco``: só os fluxos
+    de um bloco ficam em memória de cada vez. ``taxa_desconto`` é anual,
+    escalar ou uma por cenário; sem ela, usa ``taxa_desconto_padrao``.
+
+    Returns:
+        ``{estrategia: {'tir': array (cenários,), 'vpl': array (cenários,)}}``.
+    """
+    p = motor.preparar_parametros(parametros)
+    cenarios = len(p['valor_imovel'])
+    if taxa_desconto is None:
+        taxa_desconto = taxa_desconto_padrao(parametros)
+    taxa_desconto = np.broadcast_to(np.asarray(taxa_desconto, dtype=float), (cenarios,))
+
+    resultado = {estrategia: {'tir': np.empty(cenarios), 'vpl': np.empty(cenarios)}
+                 for estrategia in estrategias}
+    for inicio in range(0, cenarios, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, cenarios)
+        bloco = {nome: valor[inicio:fim, 0] for nome, valor in p.items()}
+        fluxos = fluxos_caixa(bloco, prazo_simulacao, investimento_inicial, estrategias)
+        for estrategia, fluxo in fluxos.items():
+            resultado[estrategia]['tir'][inicio:fim] = tir(fluxo)
+            resultado[estrategia]['vpl'][inicio:fim] = vpl(fluxo, taxa_desconto[inicio:fim])
+    return resultado
@@ -0,0 +1,105 @@
+"""Mapa de sensibilidade: qual opção vence em uma grade de dois parâmetros.
+
+O usuário escolhe dois dos parâmetros da barra lateral (``DOMINIOS``); os
+demais ficam fixos nos valores do simulador. Todas as células da grade, em
+toda a faixa dos controles, são avaliadas em um único lote vetorizado de
+patrimônios finais, e cada célula recebe a opção vencedora e a margem sobre
+a segunda.
+"""
+
+import numpy as np
+
+import motor
+from simulador import DOMINIOS
+
+# Rótulos das estratégias, na ordem de motor.ESTRATEGIAS
+NOMES_ESTRATEGIAS = ('Aluguel', 'Compra à Vista', 'Compra Financiada')
+
+
+def valores_dominio(parametro):
+    """Todos os valores permitidos pelo controle do parâmetro, na unidade do simulador."""
+    dominio = DOMINIOS[parametro]
+    quantidade = int(round((dominio['maximo'] - dominio['minimo']) / dominio['passo'])) + 1
+    valores = dominio['minimo'] + dominio['passo'] * np.arange(quantidade)
+    return valores / dominio['escala']
+
+
+def mapa_vencedores(simulador, parametro_x, parametro_y):
+    """Avalia a grade ``parametro_x`` × ``parametro_y`` para o simulador informado.
+
+    Returns:
+        Dicionário com os eixos ``valores_x`` e ``valores_y``, o índice da
+        opção vencedora em cada célula (``vencedora``, formato (len(y),
+        len(x)), índices de ``NOMES_ESTRATEGIAS``), a ``margem`` em reais
+        sobre a segunda colocada, a ``margem_relativa`` em relação ao
+        patrimônio da vencedora (``NaN`` onde esse patrimônio é zero) e os
+        ``patrimonios`` finais das três opções (formato (3, len(y), len(x))).
+    """
+    if parametro_x == parametro_y:
+        raise ValueError("Escolha dois parâmetros diferentes para o mapa.")
+
+    valores_x = valores_dominio(parametro_x)
+    valores_y = valores_dominio(parametro_y)
+    grade_y, grade_x = np.meshgrid(valores_y, valores_x, indexing='ij')
+
+    # O prazo da simulação também pode ser um dos eixos do mapa
+    valores = dict(simulador.obter_parametros(), prazo_simulacao=simulador.prazo_simulacao)
+    valores[parametro_x] = grade_x.ravel()
+    valores[parametro_y] = grade_y.ravel()
+    prazo_simulacao = valores.pop('prazo_simulacao')
+
+    finais = motor.patrimonios_finais(valores, prazo_simulacao,
+                                      simulador.investimento_inicial_financiada)
+    patrimonios = np.stack([finais[estrategia] for estrategia in motor.ESTRATEGIAS])
+    patrimonios = patrimonios.reshape(len(motor.ESTRATEGIAS), *grade_x.shape)
+
+    ordenados = np.sort(patrimonios, axis=0)
+    margem = ordenados[-1] - ordenados[-2]
+    # Sem patrimônio da vencedora a margem relativa não existe (NaN)
+    margem_relativa = np.divide(margem, np.abs(ordenados[-1]), out=np.full_like(margem, np.nan),
+                                where=ordenados[-1] != 0)
+
+    return {
+        'valores_x': valores_x,
+        'valores_y': valores_y,
+        'vencedora': np.argmax(patrimonios, axis=0),
+        'margem': margem,
+        'margem_relativa': margem_relativa,
+        'patrimonios': patrimonios,
+    }
+
+
+def importancia_parametros(simulador):
+    """Efeito de um passo de cada controle contínuo no patrimônio final, por derivadas exatas.
+
+    As derivadas vêm de ``motor.gradientes_finais`` e são multiplicadas pelo
+    passo do controle na interface (``DOMINIOS``). Os prazos, arredondados
+    para meses, ficam de fora.
+
+    Returns:
+        Lista de dicionários, do parâmetro de maior para o de menor efeito
+        em alguma das opções, com o ``'parametro'``, o
+        ``'passo'`` na unidade do simulador, os ``'efeitos'`` em reais nas
+        três opções (ordem de ``NOMES_ESTRATEGIAS``) e o ``'efeito_margem'``,
+        a variação da margem da vencedora sobre a segunda colocada.
+    """
+    gradientes = motor.gradientes_finais(simulador.obter_parametros(), simulador.prazo_simulacao,
+                                         simulador.investimento_inicial_financiada)
+    patrimonios = np.array([gradientes[estrategia]['Patrimônio'][0]
+                            for estrategia in motor.ESTRATEGIAS])
+    segunda, vencedora = np.argsort(patrimonios)[-2:]
+
+    importancia = []
+    for parametro, dominio in DOMINIOS.items():
+        if parametro not in motor.PARAMETROS_CONTINUOS:
+            continue
+        passo = dominio['passo'] / dominio['escala']
+        efeitos = np.array([gradientes[estrategia]['Gradiente'][parametro][0]
+                            for estrategia in motor.ESTRATEGIAS]) * passo
+        importancia.append({
+            'parametro': parametro,
+            'passo': passo,
+            'efeitos': efeitos,
+            'efeito_margem': efeitos[vencedora] - efeitos[segunda],
+        })
+    return sorted(importancia, key=lambda item: np.abs(item['efeitos']).max(), reverse=True)
@@ -0,0 +1,375 @@
+"""Motor de cálculo do Simulador de Opções Imobiliárias.
+
+Este módulo não depende do Streamlit e pode ser importado por ferramentas de
+linha de comando. Os cálculos são feitos pelo motor vetorizado (``motor``),
+importado junto com o NumPy e o pandas apenas na primeira simulação, para não
+pesar na inicialização do processo. O laço mês a mês original está em
+``referencia``.
+"""
+
+import locale
+
+# Configurar localização para formatação de moeda em português brasileiro
+try:
+    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
+except:
+    try:
+        locale.setlocale(locale.LC_ALL, 'Portuguese_Brazil.1252')
+    except:
+        pass  # Fallback para configuração padrão
+
+# Domínio de cada parâmetro nos controles da interface, que são montados a
+# partir daqui. Os limites estão na unidade exibida ao usuário; 'escala'
+# converte para a unidade do simulador (percentuais exibidos de 0 a 100 são
+# usados como frações) e 'formato', opcional, é o do controle.
+DOMINIOS = {
+    'valor_imovel': {
+        'rotulo': 'Valor do Imóvel (R$)',
+        'minimo': 100000.0, 'maximo': 10000000.0, 'passo': 50000.0, 'escala': 1,
+        'formato': '%.2f',
+    },
+    'percentual_aluguel': {
+        'rotulo': 'Aluguel Mensal (% do valor do imóvel)',
+        'minimo': 0.1, 'maximo': 1.0, 'passo': 0.05, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'taxa_valorizacao_imovel': {
+        'rotulo': 'Valorização Anual do Imóvel (%)',
+        'minimo': 0.0, 'maximo': 15.0, 'passo': 0.5, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'taxa_juros_investimento': {
+        'rotulo': 'Rendimento Anual dos Investimentos (% antes do IR)',
+        'minimo': 0.0, 'maximo': 15.0, 'passo': 0.5, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'percentual_financiamento': {
+        'rotulo': 'Percentual Financiado (%)',
+        'minimo': 10.0, 'maximo': 90.0, 'passo': 5.0, 'escala': 100, 'formato': '%.1f%%',
+    },
+    'taxa_juros_financiamento': {
+        'rotulo': 'Taxa de Juros Anual do Financiamento (%)',
+        'minimo': 5.0, 'maximo': 20.0, 'passo': 0.5, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'prazo_financiamento': {
+        'rotulo': 'Prazo do Financiamento (anos)',
+        'minimo': 5, 'maximo': 35, 'passo': 1, 'escala': 1,
+    },
+    'prazo_simulacao': {
+        'rotulo': 'Prazo da Simulação (anos)',
+        'minimo': 5, 'maximo': 50, 'passo': 5, 'escala': 1,
+    },
+    'taxa_iptu': {
+        'rotulo': 'IPTU Anual (% do valor do imóvel)',
+        'minimo': 0.0, 'maximo': 3.0, 'passo': 0.1, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'taxa_manutencao': {
+        'rotulo': 'Manutenção Anual (% do valor do imóvel)',
+        'minimo': 0.0, 'maximo': 3.0, 'passo': 0.1, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'percentual_condominio': {
+        'rotulo': 'Condomínio Mensal (% do valor do imóvel)',
+        'minimo': 0.0, 'maximo': 0.5, 'passo': 0.01, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'percentual_custos_aquisicao': {
+        'rotulo': 'ITBI e Custos de Aquisição (% do valor do imóvel)',
+        'minimo': 0.0, 'maximo': 10.0, 'passo': 0.5, 'escala': 100, 'formato': '%.2f%%',
+    },
+    'aliquota_ir': {
+        'rotulo': 'IR sobre Rendimentos (%)',
+        'minimo': 0.0, 'maximo': 27.5, 'passo': 2.5, 'escala': 100, 'formato': '%.1f%%',
+    },
+}
+
+# Classe SimuladorImovel
+class SimuladorImovel:
+    """Classe principal do simulador de opções imobiliárias."""
+    
+    # Capital inicial investido na compra financiada: 'entrada' (app.py) ou
+    # 'financiado' (app_corrigido.py, que investe o valor não desembolsado)
+    investimento_inicial_financiada = 'entrada'
+    
+    def __init__(self):
+        """Inicializa o simulador com valores padrão."""
+        # Parâmetros padrão
+        self.valor_imovel = 500000.0
+        self.percentual_aluguel = 0.004  # 0.4% do valor do imóvel por mês
+        self.taxa_juros_investimento = 0.08  # 8% ao ano
+        self.taxa_juros_financiamento = 0.10  # 10% ao ano
+        self.taxa_valorizacao_imovel = 0.05  # 5% ao ano
+        self.percentual_financiamento = 0.50  # 50% financiado
+        self.prazo_financiamento = 20  # 20 anos
+        self.prazo_simulacao = 30  # 30 anos para simulação completa
+        
+        # Custos e impostos (zero reproduz o modelo sem custos)
+        self.taxa_iptu = 0.0  # % do valor do imóvel por ano
+        self.taxa_manutencao = 0.0  # % do valor do imóvel por ano
+        self.percentual_condominio = 0.0  # % do valor do imóvel por mês
+        self.percentual_custos_aquisicao = 0.0  # ITBI, escritura e registro
+        self.aliquota_ir = 0.0  # IR sobre os rendimentos dos investimentos
+        
+        # Resultados
+        self.resultados = {}
+        
+        # Meses já calculados de cada opção, reaproveitados quando só o prazo muda
+        self.horizontes = {}
+        
+    def definir_parametros(self, valor_imovel=None, percentual_aluguel=None, 
+                          taxa_juros_investimento=None, taxa_juros_financiamento=None,
+                          taxa_valorizacao_imovel=None, percentual_financiamento=None,
+                          prazo_financiamento=None, prazo_simulacao=None,
+                          taxa_iptu=None, taxa_manutencao=None, percentual_condominio=None,
+                          percentual_custos_aquisicao=None, aliquota_ir=None):
+        """Define os parâmetros da simulação."""
+        if valor_imovel is not None:
+            self.valor_imovel = valor_imovel
+        if percentual_aluguel is not None:
+            self.percentual_aluguel = percentual_aluguel
+        if taxa_juros_investimento is not None:
+            self.taxa_juros_investimento = taxa_juros_investimento
+        if taxa_juros_financiamento is not None:
+            self.taxa_juros_financiamento = taxa_juros_financiamento
+        if taxa_valorizacao_imovel is not None:
+            self.taxa_valorizacao_imovel = taxa_valorizacao_imovel
+        if percentual_financiamento is not None:
+            self.percentual_financiamento = percentual_financiamento
+        if prazo_financiamento is not None:
+            self.prazo_financiamento = prazo_financiamento
+        if prazo_simulacao is not None:
+            self.prazo_simulacao = prazo_simulacao
+        if taxa_iptu is not None:
+            self.taxa_iptu = taxa_iptu
+        if taxa_manutencao is not None:
+            self.taxa_manutencao = taxa_manutencao
+        if percentual_condominio is not None:
+            self.percentual_condominio = percentual_condominio
+        if percentual_custos_aquisicao is not None:
+            self.percentual_custos_aquisicao = percentual_custos_aquisicao
+        if aliquota_ir is not None:
+            self.aliquota_ir = aliquota_ir
+
+    def obter_parametros(self):
+        """Retorna os parâmetros atuais no formato aceito por motor.simular_lote."""
+        return {
+            'valor_imovel': self.valor_imovel,
+            'percentual_aluguel': self.percentual_aluguel,
+            'taxa_juros_investimento': self.taxa_juros_investimento,
+            'taxa_juros_financiamento': self.taxa_juros_financiamento,
+            'taxa_valorizacao_imovel': self.taxa_valorizacao_imovel,
+            'percentual_financiamento': self.percentual_financiamento,
+            'prazo_financiamento': self.prazo_financiamento,
+            'taxa_iptu': self.taxa_iptu,
+            'taxa_manutencao': self.taxa_manutencao,
+            'percentual_condominio': self.percentual_condominio,
+            'percentual_custos_aquisicao': self.percentual_custos_aquisicao,
+            'aliquota_ir': self.aliquota_ir,
+        }
+
+    def _horizonte(self, estrategia):
+        """Meses já calculados de uma opção com os parâmetros atuais.
+
+        O horizonte guarda os parâmetros que o geraram (``'chave'``), o lote
+        calculado até o maior prazo já pedido (``'lote'``, ``None`` antes do
+        primeiro cálculo) e os estados da recorrência no último mês desse lote
+        (ver ``motor.novos_estados``). Se algum parâmetro mudou, começa vazio.
+        """
+        import motor
+        
+        chave = (tuple(self.obter_parametros().items()), self.investimento_inicial_financiada)
+        horizonte = self.horizontes.get(estrategia)
+        if horizonte is None or horizonte['chave'] != chave:
+            horizonte = {'chave': chave, 'lote': None, 'estados': motor.novos_estados((estrategia,))}
+            self.horizontes[estrategia] = horizonte
+        return horizonte
+
+    def _calcular_estrategia(self, estrategia):
+        """Calcula uma opção com o motor vetorizado e guarda o DataFrame.
+        
+        Se só o prazo mudou desde o último cálculo, um prazo maior calcula
+        apenas os meses novos, a partir do estado do último mês calculado, e
+        um prazo menor apenas recorta os meses já calculados.
+        """
+        import motor
+        
+        horizonte = self._horizonte(estrategia)
+        parametros = self.obter_parametros()
+        if horizonte['lote'] is None:
+            horizonte['lote'] = motor.simular_lote(
+                parametros,
+                self.prazo_simulacao,
+                investimento_inicial=self.investimento_inicial_financiada,
+                estrategias=(estrategia,),
+                estados=horizonte['estados']
+            )
+        else:
+            horizonte['lote'] = motor.estender_lote(
+                horizonte['lote'],
+                horizonte['estados'],
+                parametros,
+                self.prazo_simulacao,
+                investimento_inicial=self.investimento_inicial_financiada
+            )
+        lote = motor.recortar_lote(horizonte['lote'], self.prazo_simulacao)
+        df = motor.para_dataframe(lote[estrategia])
+        self.resultados[estrategia] = df
+        return df
+    
+    def calcular_aluguel(self):
+        """Calcula a evolução patrimonial na opção de aluguel."""
+        return self._calcular_estrategia('aluguel')
+    
+    def calcular_compra_vista(self):
+        """Calcula a evolução patrimonial na opção de compra à vista."""
+        return self._calcular_estrategia('compra_vista')
+    
+    def calcular_compra_financiada(self):
+        """Calcula a evolução patrimonial na opção de compra financiada."""
+        return self._calcular_estrategia('compra_financiada')
+    
+    def executar_simulacao(self):
+        """Executa a simulação completa para as três opções."""
+        self.calcular_aluguel()
+        self.calcular_compra_vista()
+        self.calcular_compra_financiada()
+        return self.resultados
+
+    def iterar_simulacao(self, meses_por_bloco=12):
+        """Gera a simulação das três opções em blocos de meses, à medida que são calculados.
+
+        Cada bloco é um dicionário ``{estrategia: DataFrame}`` com as linhas
+        daquele bloco (ver ``motor.iterar_lote``). Os blocos não são guardados
+        em ``self.resultados``: quem precisa da série completa concatena os
+        blocos, e quem os grava em disco não precisa mantê-los em memória.
+
+        Os meses já calculados com os mesmos parâmetros (ver
+        ``_calcular_estrategia``) vêm de uma vez no primeiro bloco, e só os
+        meses seguintes são simulados.
+        """
+        import motor
+
+        horizontes = {estrategia: self._horizonte(estrategia) for estrategia in motor.ESTRATEGIAS}
+        calculados = {horizonte['estados'][estrategia]['inicio']
+                      for estrategia, horizonte in horizontes.items()}
+        if len(calculados) > 1:
+            # Opções calculadas até prazos diferentes recomeçam juntas
+            self.horizontes = {}
+            horizontes = {estrategia: self._horizonte(estrategia) for estrategia in motor.ESTRATEGIAS}
+            calculados = {0}
+
+        calculado = calculados.pop()
+        if calculado:
+            meses = min(int(round(self.prazo_simulacao * 12)), calculado - 1)
+            yield {estrategia: motor.para_dataframe(
+                       motor.recortar_lote(horizonte['lote'], meses / 12)[estrategia])
+                   for estrategia, horizonte in horizontes.items()}
+
+        estados = {estrategia: horizonte['estados'][estrategia]
+                   for estrategia, horizonte in horizontes.items()}
+        for bloco in motor.iterar_lote(
+            self.obter_parametros(),
+            self.prazo_simulacao,
+            investimento_inicial=self.investimento_inicial_financiada,
+            meses_por_bloco=meses_por_bloco,
+            estados=estados
+        ):
+            for estrategia, horizonte in horizontes.items():
+                novo = {estrategia: bloco[estrategia]}
+                horizonte['lote'] = novo if horizonte['lote'] is None else motor.concatenar_lotes(
+                    horizonte['lote'], novo, horizonte['estados'])
+            yield {estrategia: motor.para_dataframe(colunas) for estrategia, colunas in bloco.items()}
+
+    def para_arrow(self, formato='longo'):
+        """Simulação das três opções como record batch do Arrow (ver ``exportacao``).
+
+        No formato ``'longo'`` há uma linha por mês, com uma coluna struct por
+        opção; em ``'lista'``, uma única linha com as séries mensais.
+        """
+        import exportacao
+        import motor
+
+        parametros = self.obter_parametros()
+        lote = motor.simular_lote(parametros, self.prazo_simulacao,
+                                  investimento_inicial=self.investimento_inicial_financiada)
+        return exportacao.lote_para_arrow(lote, parametros, formato)
+
+    def formatar_moeda(self, valor):
+        """Formata um valor como moeda brasileira."""
+        try:
+            return locale.currency(valor, grouping=True)
+        except:
+            return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    
+    def analisar_riscos_beneficios(self):
+        """Analisa os riscos e benefícios de cada opção."""
+        analise = {
+            'aluguel': {
+                'beneficios': [
+                    'Maior liquidez do patrimônio',
+                    'Flexibilidade para mudança de localização',
+                    'Sem custos de manutenção e IPTU',
+                    'Sem risco de desvalorização do imóvel',
+                    'Sem necessidade de grande capital inicial'
+                ],
+                'riscos': [
+                    'Aumento do valor do aluguel acima da inflação',
+                    'Rendimento dos investimentos pode cair',
+                    'Insegurança quanto à renovação do contrato',
+                    'Limitações para personalização do imóvel',
+                    'Não formação de patrimônio imobiliário'
+                ]
+            },
+            'compra_vista': {
+                'beneficios': [
+                    'Ausência de juros e encargos financeiros',
+                    'Segurança da propriedade imediata',
+                    'Potencial de valorização do imóvel',
+                    'Liberdade para personalização do imóvel',
+                    'Redução de despesas mensais fixas'
+                ],
+                'riscos': [
+                    'Imobilização de capital significativo',
+                    'Baixa liquidez do patrimônio',
+                    'Risco de desvalorização do imóvel',
+                    'Custos de manutenção, IPTU e condomínio',
+                    'Custo de oportunidade do capital não investido'
+                ]
+            },
+            'compra_financiada': {
+                'beneficios': [
+                    'Preservação de parte do capital para investimentos',
+                    'Seguro patrimonial e de vida incluído no financiamento',
+                    'Possibilidade de renegociação da dívida com queda nos juros',
+                    'Opção de quitação antecipada',
+                    'Juros pagos elevam o valor de aquisição, reduzindo IR sobre ganho de capital',
+                    'Valorização do imóvel com queda nos juros'
+                ],
+                'riscos': [
+                    'Custo total elevado devido aos juros do financiamento',
+                    'Comprometimento da renda por longo período',
+                    'Risco de inadimplência em caso de perda de renda',
+                    'Possível desvalorização do imóvel',
+                    'Rendimento dos investimentos pode ficar abaixo do custo do financiamento'
+                ]
+            }
+        }
+        
+        return analise
+
+# Variante corrigida
+class SimuladorImovelCorrigido(SimuladorImovel):
+    """Variante em que a compra financiada investe o valor financiado.
+    
+    Correção: o valor investido deve ser igual ao valor financiado, não ao
+    valor da entrada, pois o capital inicial é o mesmo nas três opções.
+    """
+    
+    investimento_inicial_financiada = 'financiado'
+
+# Função para formatar moeda
+def formatar_moeda(valor):
+    try:
+        return locale.currency(valor, grouping=True)
+    except:
+        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+# Função para formatar percentual
+def formatar_percentual(valor):
+    return f"{valor*100:.2f}%"
+
@@ -0,0 +1,31 @@
+"""Caminhos rápidos contra o laço de referência (``ferramentas.fuzz_diferencial``)."""
+
+import numpy as np
+import pytest
+
+from ferramentas import fuzz_diferencial as fuzz
+
+CASOS = 300
+# Casos só com valores dos controles e sem custos, os únicos que o cubo cobre
+CASOS_CUBO = 100
+
+
+@pytest.fixture(scope='module')
+def casos():
+    rng = np.random.default_rng(0)
+    sorteados = [fuzz.sortear_caso(rng) for _ in range(CASOS)]
+    sorteados += [fuzz.sortear_caso(rng, proporcao_grade=1.0, proporcao_sem_custos=1.0)
+                  for _ in range(CASOS_CUBO)]
+    return [(caso, fuzz.executar_referencia(caso)) for caso in sorteados]
+
+
+@pytest.mark.parametrize('caminho', list(fuzz.CAMINHOS))
+def test_caminho_igual_a_referencia(casos, caminho):
+    verificados = 0
+    for caso, referencia in casos:
+        rapido = fuzz.CAMINHOS[caminho](caso)
+        if rapido is None:
+            continue
+        verificados += 1
+        assert fuzz.comparar(referencia, rapido, 1e-9) is None, caso
+    assert verificados >= CASOS_CUBO // 2
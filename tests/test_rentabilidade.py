@@ -0,0 +1,55 @@
+"""TIR e VPL das estratégias (``rentabilidade``)."""
+
+import numpy as np
+
+import motor
+import rentabilidade
+from simulador import SimuladorImovel
+
+
+def test_aluguel_com_investimento_tem_tir_finita():
+    # Aluguel baixo e investimento rendendo: o patrimônio final é positivo
+    parametros = dict(SimuladorImovel().obter_parametros(), percentual_aluguel=0.003,
+                      taxa_juros_investimento=0.10)
+    resultado = rentabilidade.avaliar_lote(parametros, 20)
+
+    taxa = resultado['aluguel']['tir'][0]
+    assert np.isfinite(taxa)
+    # O aluguel consome parte do rendimento: a TIR fica abaixo da taxa líquida
+    assert -1 < taxa < rentabilidade.taxa_desconto_padrao(parametros)[0]
+
+
+def test_fluxos_mensais_sao_os_da_simulacao():
+    parametros = dict(SimuladorImovel().obter_parametros(), taxa_iptu=0.01, taxa_manutencao=0.005,
+                      percentual_condominio=0.001, percentual_custos_aquisicao=0.04)
+    fluxos = rentabilidade.fluxos_caixa(parametros, 30)
+    lote = motor.simular_lote(parametros, 30)
+
+    aluguel = lote['aluguel']
+    np.testing.assert_allclose(-fluxos['aluguel'][0, 1:-1],
+                               (aluguel['Aluguel Mensal'] + aluguel['Custos Mensais'])[0, 1:-1])
+    financiada = lote['compra_financiada']
+    np.testing.assert_allclose(-fluxos['compra_financiada'][0, 1:-1],
+                               (financiada['Prestação'] + financiada['Custos Mensais'])[0, 1:-1])
+    vista = lote['compra_vista']
+    np.testing.assert_allclose(-fluxos['compra_vista'][0, 1:-1], vista['Custos Mensais'][0, 1:-1])
+
+    # Mês zero: preço do imóvel mais custos de aquisição na compra à vista
+    valor = parametros['valor_imovel']
+    np.testing.assert_allclose(-fluxos['compra_vista'][0, 0], valor * 1.04)
+    # Último mês: imóvel menos saldo devedor mais a conta de investimentos, sem a moradia
+    np.testing.assert_allclose(fluxos['compra_vista'][0, -1] + vista['Custos Mensais'][0, -1],
+                               vista['Valor Imóvel'][0, -1])
+
+
+def test_blocos_iguais_ao_lote_inteiro():
+    rng = np.random.default_rng(0)
+    base = SimuladorImovel().obter_parametros()
+    parametros = {nome: valor * rng.uniform(0.5, 1.5, 300) for nome, valor in base.items()}
+
+    resultado = rentabilidade.avaliar_lote(parametros, 15, tamanho_bloco=64)
+    fluxos = rentabilidade.fluxos_caixa(parametros, 15)
+    taxa_desconto = rentabilidade.taxa_desconto_padrao(parametros)
+    for estrategia, fluxo in fluxos.items():
+        np.testing.assert_allclose(resultado[estrategia]['tir'], rentabilidade.tir(fluxo), equal_nan=True)
+        np.testing.assert_allclose(resultado[estrategia]['vpl'], rentabilidade.vpl(fluxo, taxa_desconto))